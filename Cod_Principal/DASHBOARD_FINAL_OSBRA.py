@@ -1,31 +1,48 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.patches import Rectangle
 from datetime import datetime
+from instrumentacion import traza
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configuración de visualización
-plt.style.use('default')
-sns.set_palette("Set2")
+def agregados_dashboard_final(cubo):
+    """Conteos que necesita el dashboard final (valores simples, serializables en JSON)"""
+    categoria_counts = cubo.conteo('Categoría del problema')
+    urgencia_counts = cubo.conteo('Nivel de urgencia')
+    top_ciudades = cubo.conteo('Ciudad').head(8)
+    internet_por_zona = cubo.tabla_cruzada('Es_Zona_Rural', 'Tiene_Internet')
+    return {
+        'total': cubo.total,
+        'urgentes': int(urgencia_counts.get('Urgente', 0)),
+        'n_ciudades': cubo.n_unicos('Ciudad'),
+        'categorias': {'etiquetas': categoria_counts.index.tolist(), 'valores': categoria_counts.tolist()},
+        'urgencia': {'etiquetas': urgencia_counts.index.tolist(), 'valores': urgencia_counts.tolist()},
+        'top_ciudades': {'etiquetas': top_ciudades.index.tolist(), 'valores': top_ciudades.tolist()},
+        'internet_por_zona': {'indice': internet_por_zona.index.tolist(),
+                              'columnas': internet_por_zona.columns.tolist(),
+                              'valores': internet_por_zona.values.tolist()}
+    }
 
-def crear_dashboard_final_osbra():
+@traza.medir('dashboard_final')
+def crear_dashboard_final_osbra(ruta='DASHBOARD_FINAL_OSBRA.png', dpi=300):
     """Crea el dashboard final profesional de OSBRA"""
-    
-    # Cargar datos
-    df = pd.read_csv('dataset.csv', sep=',', encoding='utf-8')
-    
-    # Limpiar datos
-    df_clean = df.copy()
-    df_clean['Edad'].fillna(df_clean['Edad'].median(), inplace=True)
-    df_clean['Comentario'].fillna('Sin comentario', inplace=True)
-    df_clean['Género'] = df_clean['Género'].replace({'M': 'Masculino', 'F': 'Femenino', 'Otro': 'Otro'})
-    df_clean['Fecha del reporte'] = pd.to_datetime(df_clean['Fecha del reporte'], format='%Y-%m-%d', errors='coerce')
-    df_clean['Tiene_Internet'] = df_clean['Acceso a internet'].map({0: 'No', 1: 'Si'})
-    df_clean['Atencion_Gobierno'] = df_clean['Atención previa del gobierno'].map({0: 'No', 1: 'Si'})
-    df_clean['Es_Zona_Rural'] = df_clean['Zona rural'].map({0: 'No', 1: 'Si'})
+    # Import diferido: los trabajadores de render_dashboards importan este módulo solo para dibujar
+    from cubo_agregados import cargar_cubo
+
+    # Cubo de agregados (cache compartida con osbra_final_perfecto.py)
+    cubo, _ = cargar_cubo('dataset.csv')
+    dibujar_dashboard_final(agregados_dashboard_final(cubo), ruta, dpi)
+
+def dibujar_dashboard_final(agregados, ruta='DASHBOARD_FINAL_OSBRA.png', dpi=300):
+    """Dibuja el dashboard final a partir de los agregados precalculados"""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+    from matplotlib.patches import Rectangle
+
+    # Configuración de visualización
+    plt.style.use('default')
+    sns.set_palette("Set2")
+
+    por_categoria = dict(zip(agregados['categorias']['etiquetas'], agregados['categorias']['valores']))
     
     # Crear figura principal
     fig = plt.figure(figsize=(24, 18))
@@ -48,13 +65,13 @@ def crear_dashboard_final_osbra():
     
     # Métricas principales
     metricas = [
-        f"📊 Total de Reportes: {len(df_clean):,} comentarios ciudadanos",
-        f"🏥 Salud: {len(df_clean[df_clean['Categoría del problema'] == 'Salud']):,} reportes",
-        f"🎓 Educación: {len(df_clean[df_clean['Categoría del problema'] == 'Educación']):,} reportes",
-        f"🛡️ Seguridad: {len(df_clean[df_clean['Categoría del problema'] == 'Seguridad']):,} reportes",
-        f"🌱 Medio Ambiente: {len(df_clean[df_clean['Categoría del problema'] == 'Medio Ambiente']):,} reportes",
-        f"⚡ Urgentes: {len(df_clean[df_clean['Nivel de urgencia'] == 'Urgente']):,} reportes",
-        f"🏙️ Ciudades: {df_clean['Ciudad'].nunique()} ciudades principales",
+        f"📊 Total de Reportes: {agregados['total']:,} comentarios ciudadanos",
+        f"🏥 Salud: {por_categoria.get('Salud', 0):,} reportes",
+        f"🎓 Educación: {por_categoria.get('Educación', 0):,} reportes",
+        f"🛡️ Seguridad: {por_categoria.get('Seguridad', 0):,} reportes",
+        f"🌱 Medio Ambiente: {por_categoria.get('Medio Ambiente', 0):,} reportes",
+        f"⚡ Urgentes: {agregados['urgentes']:,} reportes",
+        f"🏙️ Ciudades: {agregados['n_ciudades']} ciudades principales",
         f"🤖 IA Generativa: Clasificación y resumen automático implementado"
     ]
     
@@ -66,7 +83,7 @@ def crear_dashboard_final_osbra():
     # ============================================
     ax2 = fig.add_subplot(gs[1, :2])
     
-    categoria_counts = df_clean['Categoría del problema'].value_counts()
+    categoria_counts = pd.Series(agregados['categorias']['valores'], index=agregados['categorias']['etiquetas'])
     colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
     
     bars = ax2.bar(range(len(categoria_counts)), categoria_counts.values, 
@@ -90,7 +107,7 @@ def crear_dashboard_final_osbra():
     # ============================================
     ax3 = fig.add_subplot(gs[1, 2:])
     
-    urgencia_counts = df_clean['Nivel de urgencia'].value_counts()
+    urgencia_counts = pd.Series(agregados['urgencia']['valores'], index=agregados['urgencia']['etiquetas'])
     colors_pie = ['#FF9999', '#66B2FF']
     
     wedges, texts, autotexts = ax3.pie(urgencia_counts.values, 
@@ -106,7 +123,7 @@ def crear_dashboard_final_osbra():
     # ============================================
     ax4 = fig.add_subplot(gs[2, :2])
     
-    top_ciudades = df_clean['Ciudad'].value_counts().head(8)
+    top_ciudades = pd.Series(agregados['top_ciudades']['valores'], index=agregados['top_ciudades']['etiquetas'])
     bars = ax4.barh(range(len(top_ciudades)), top_ciudades.values, 
                     color='#FFD93D', alpha=0.8, edgecolor='black', linewidth=1)
     ax4.set_title('TOP 8 CIUDADES CON MÁS REPORTES', fontsize=16, fontweight='bold', pad=20)
@@ -127,7 +144,9 @@ def crear_dashboard_final_osbra():
     ax5 = fig.add_subplot(gs[2, 2:])
     
     # Crear subplot para análisis de acceso
-    internet_por_zona = pd.crosstab(df_clean['Es_Zona_Rural'], df_clean['Tiene_Internet'])
+    internet_por_zona = pd.DataFrame(agregados['internet_por_zona']['valores'],
+                                     index=pd.Index(agregados['internet_por_zona']['indice'], name='Es_Zona_Rural'),
+                                     columns=pd.Index(agregados['internet_por_zona']['columnas'], name='Tiene_Internet'))
     internet_por_zona.plot(kind='bar', ax=ax5, color=['#FFB6C1', '#98FB98'], alpha=0.8)
     ax5.set_title('ACCESO A INTERNET POR ZONA', fontsize=16, fontweight='bold', pad=20)
     ax5.set_xlabel('Zona Rural', fontsize=14, fontweight='bold')
@@ -239,8 +258,9 @@ def crear_dashboard_final_osbra():
              ha='center', va='center', fontsize=14, fontweight='bold', color='#2E8B57')
     
     # Guardar dashboard
-    plt.savefig('DASHBOARD_FINAL_OSBRA.png', dpi=300, bbox_inches='tight')
-    print("[OK] Dashboard final OSBRA guardado: DASHBOARD_FINAL_OSBRA.png")
+    plt.savefig(ruta, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"[OK] Dashboard final OSBRA guardado: {ruta}")
 
 def crear_resumen_ejecutivo():
     """Crea un resumen ejecutivo del proyecto"""
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+# ============================================
+# PAQUETES VERSIONADOS DE MODELOS ENTRENADOS
+# ============================================
+
+# Incrementar cuando cambie la estructura del paquete
+VERSION_FORMATO = 1
+DIRECTORIO_MODELOS = 'modelos_osbra'
+ARCHIVO_ACTUAL = 'ACTUAL'
+ARCHIVO_MANIFIESTO = 'manifiesto.json'
+
+
+def guardar_artefactos(vectorizer, modelos, metricas=None, modelo_principal=None,
+                       directorio=DIRECTORIO_MODELOS):
+    """Guarda el vectorizador y los modelos como un paquete versionado; retorna su ruta"""
+    import joblib
+    import sklearn
+
+    version = time.strftime('%Y%m%d-%H%M%S')
+    ruta = os.path.join(directorio, version)
+    sufijo = 1
+    while os.path.exists(ruta):
+        sufijo += 1
+        ruta = os.path.join(directorio, f"{version}-{sufijo}")
+    os.makedirs(ruta)
+
+    joblib.dump(vectorizer, os.path.join(ruta, 'vectorizer.joblib'))
+    for nombre, modelo in modelos.items():
+        joblib.dump(modelo, os.path.join(ruta, f"{nombre}.joblib"))
+
+    manifiesto = {
+        'version_formato': VERSION_FORMATO,
+        'version': os.path.basename(ruta),
+        'creado': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'sklearn': sklearn.__version__,
+        'modelos': list(modelos),
+        'modelo_principal': modelo_principal or next(iter(modelos)),
+        'clases': [str(c) for c in next(iter(modelos.values())).classes_],
+        'metricas': metricas or {}
+    }
+    with open(os.path.join(ruta, ARCHIVO_MANIFIESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+
+    # El puntero al paquete actual se reemplaza de forma atómica al final,
+    # así un lector nunca ve un paquete a medio escribir
+    temporal = os.path.join(directorio, ARCHIVO_ACTUAL + '.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(manifiesto['version'])
+    os.replace(temporal, os.path.join(directorio, ARCHIVO_ACTUAL))
+    return ruta
+
+
+def listar_versiones(directorio=DIRECTORIO_MODELOS):
+    """Versiones de paquetes disponibles, de la más antigua a la más reciente"""
+    if not os.path.isdir(directorio):
+        return []
+    return sorted((v for v in os.listdir(directorio)
+                   if os.path.exists(os.path.join(directorio, v, ARCHIVO_MANIFIESTO))), key=_orden_version)
+
+
+def _orden_version(version):
+    """Clave de orden de 'AAAAMMDD-HHMMSS[-n]': el sufijo de colisión se compara como número"""
+    fecha, _, sufijo = version.partition('-')
+    hora, _, sufijo = sufijo.partition('-')
+    return fecha, hora, int(sufijo) if sufijo.isdigit() else 0, sufijo
+
+
+def ruta_paquete(directorio=DIRECTORIO_MODELOS, version=None):
+    """Ruta del paquete pedido o del marcado como actual"""
+    if version is None:
+        puntero = os.path.join(directorio, ARCHIVO_ACTUAL)
+        if not os.path.exists(puntero):
+            raise FileNotFoundError(f"No hay modelos guardados en '{directorio}'; ejecute primero el entrenamiento")
+        with open(puntero, encoding='utf-8') as f:
+            version = f.read().strip()
+    return os.path.join(directorio, version)
+
+
+def cargar_artefactos(directorio=DIRECTORIO_MODELOS, version=None, modelos=None):
+    """Carga un paquete sin reentrenar; retorna vectorizador, modelos y manifiesto
+
+    modelos puede ser una lista de nombres, 'principal' o None (todos).
+    """
+    # joblib y scikit-learn solo se importan al cargar un paquete, no al importar el módulo
+    import joblib
+    import sklearn
+
+    ruta = ruta_paquete(directorio, version)
+    with open(os.path.join(ruta, ARCHIVO_MANIFIESTO), encoding='utf-8') as f:
+        manifiesto = json.load(f)
+    if manifiesto['version_formato'] != VERSION_FORMATO:
+        raise ValueError(f"Formato de paquete {manifiesto['version_formato']} no soportado "
+                         f"(se esperaba {VERSION_FORMATO})")
+    if manifiesto['sklearn'] != sklearn.__version__:
+        print(f"[AVISO] Paquete creado con scikit-learn {manifiesto['sklearn']}, "
+              f"instalado {sklearn.__version__}")
+
+    if modelos == 'principal':
+        nombres = [manifiesto['modelo_principal']]
+    else:
+        nombres = modelos or manifiesto['modelos']
+    return {
+        'vectorizer': joblib.load(os.path.join(ruta, 'vectorizer.joblib')),
+        'modelos': {nombre: joblib.load(os.path.join(ruta, f"{nombre}.joblib")) for nombre in nombres},
+        'manifiesto': manifiesto
+    }
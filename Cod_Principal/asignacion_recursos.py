@@ -0,0 +1,147 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+
+from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+from rollups_presupuesto import tabla_costos
+
+# ============================================
+# ASIGNACIÓN DE PRESUPUESTO Y PERSONAL ENTRE CIUDADES
+# ============================================
+
+# Cobertura mínima garantizada a cada ciudad y categoría con demanda
+PISO_COBERTURA = 0.1
+# Escenario por defecto: recursos disponibles como fracción de la necesidad total
+FRACCION_DISPONIBLE = 0.3
+
+
+def demanda(tabla, generador=None, col_peso=None):
+    """Problemas, demanda ponderada por prioridad y necesidad de recursos por (Ciudad, Categoría)
+
+    tabla trae Ciudad, Categoría del problema y Nivel de urgencia, una fila por reporte o,
+    con col_peso, una fila por combinación con su conteo (p. ej. la tabla del cubo de agregados).
+    """
+    generador = generador or OSBRASolutionsGenerator()
+    score, nivel = generador.niveles_lote(tabla)
+    peso = np.ones(len(tabla)) if col_peso is None else tabla[col_peso].to_numpy(dtype=np.float64)
+    costos = tabla_costos(generador)
+    personal = costos.filter(like='personal_').sum(axis=1)
+    por_problema = pd.DataFrame({'presupuesto': costos['presupuesto'], 'personal': personal}).reindex(
+        pd.MultiIndex.from_arrays([tabla['Categoría del problema'].astype(object), nivel])).fillna(0).to_numpy()
+
+    filas = pd.DataFrame({
+        'Ciudad': tabla['Ciudad'].astype(object).to_numpy(),
+        'Categoría del problema': tabla['Categoría del problema'].astype(object).to_numpy(),
+        'problemas': peso,
+        'demanda_ponderada': peso * score,
+        'presupuesto_necesario': peso * por_problema[:, 0],
+        'personal_necesario': peso * por_problema[:, 1]
+    })
+    resultado = filas.dropna(subset=['Ciudad']).groupby(['Ciudad', 'Categoría del problema'], sort=True).sum()
+    resultado['score_promedio'] = resultado['demanda_ponderada'] / resultado['problemas']
+    return resultado[resultado['problemas'] > 0].reset_index()
+
+
+def asignar(demandas, presupuesto, personal, piso=PISO_COBERTURA):
+    """Reparto óptimo de un presupuesto y un personal limitados (programa lineal, HiGHS)
+
+    Se elige la cobertura c de cada (ciudad, categoría), entre piso y 1, para maximizar la
+    demanda ponderada atendida Σ c·demanda_ponderada sujeta a Σ c·presupuesto_necesario <= presupuesto
+    y Σ c·personal_necesario <= personal. Retorna (asignación, info) con los precios sombra:
+    cuánta demanda ponderada adicional se atiende por cada peso y por cada persona extra.
+    """
+    necesidad = demandas[['presupuesto_necesario', 'personal_necesario']].to_numpy(dtype=np.float64)
+    limites = np.array([presupuesto, personal], dtype=np.float64)
+    minimo = piso * necesidad.sum(axis=0)
+    if (minimo > limites).any():
+        raise ValueError(f"Los recursos no alcanzan para la cobertura mínima de {piso:.0%} "
+                         f"(se requieren ${minimo[0]:,.0f} COP y {minimo[1]:,.0f} personas)")
+
+    # Columnas escaladas a [0, 1] para que el solver trabaje con magnitudes comparables
+    escala = np.where(limites > 0, limites, 1.0)
+    resultado = linprog(-demandas['demanda_ponderada'].to_numpy(dtype=np.float64),
+                        A_ub=(necesidad / escala).T, b_ub=limites / escala,
+                        bounds=(piso, 1.0), method='highs')
+    if resultado.status != 0:
+        raise ValueError(f"No se encontró una asignación: {resultado.message}")
+
+    cobertura = np.clip(resultado.x, piso, 1.0)
+    asignacion = demandas.copy()
+    asignacion['cobertura'] = cobertura
+    asignacion['presupuesto_asignado'] = cobertura * demandas['presupuesto_necesario']
+    # Personas enteras: redondear hacia abajo nunca excede el personal disponible
+    asignacion['personal_asignado'] = np.floor(cobertura * demandas['personal_necesario'] + 1e-9).astype(np.int64)
+    info = {
+        'demanda_atendida': float(cobertura @ demandas['demanda_ponderada'].to_numpy()),
+        'demanda_total': float(demandas['demanda_ponderada'].sum()),
+        'presupuesto_usado': float(asignacion['presupuesto_asignado'].sum()),
+        'personal_usado': int(asignacion['personal_asignado'].sum()),
+        'valor_peso_adicional': float(-resultado.ineqlin.marginals[0] / escala[0]),
+        'valor_persona_adicional': float(-resultado.ineqlin.marginals[1] / escala[1])
+    }
+    return asignacion, info
+
+
+def demanda_sintetica(municipios=1100, categorias=None, semilla=42):
+    """Demanda aleatoria con el esquema de dataset.csv para probar escenarios a escala nacional"""
+    from benchmark_osbra import CATEGORIAS
+
+    rng = np.random.default_rng(semilla)
+    categorias = categorias or CATEGORIAS
+    ciudades = np.array([f"Municipio {i:04d}" for i in range(municipios)], dtype=object)
+    # Una fila por combinación con su conteo de reportes, como la tabla del cubo
+    tabla = pd.DataFrame({
+        'Ciudad': np.repeat(ciudades, len(categorias) * 2),
+        'Categoría del problema': np.tile(np.repeat(np.array(categorias, dtype=object), 2), municipios),
+        'Nivel de urgencia': np.tile(np.array(['Urgente', 'No urgente'], dtype=object), municipios * len(categorias)),
+        'conteo': rng.poisson(rng.gamma(1.5, 20, municipios * len(categorias) * 2))
+    })
+    return tabla
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reparte presupuesto y personal entre ciudades según la demanda')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--sintetico', type=int, default=0, metavar='MUNICIPIOS',
+                        help='Usar demanda aleatoria de N municipios en lugar del archivo')
+    parser.add_argument('--presupuesto', type=float, default=None, help='Presupuesto disponible (COP)')
+    parser.add_argument('--personal', type=float, default=None, help='Personas disponibles')
+    parser.add_argument('--fraccion', type=float, default=FRACCION_DISPONIBLE,
+                        help='Si no se indican recursos: fracción de la necesidad total')
+    parser.add_argument('--piso', type=float, default=PISO_COBERTURA)
+    parser.add_argument('--salida', default=None, help='CSV con la asignación')
+    args = parser.parse_args()
+
+    if args.sintetico:
+        tabla, peso = demanda_sintetica(args.sintetico), 'conteo'
+    else:
+        from cubo_agregados import cargar_cubo
+        tabla, peso = cargar_cubo(args.archivo)[0].tabla, 'conteo'
+
+    generador = OSBRASolutionsGenerator()
+    inicio = time.perf_counter()
+    demandas = demanda(tabla, generador, peso)
+    presupuesto = args.presupuesto or args.fraccion * demandas['presupuesto_necesario'].sum()
+    personal = args.personal or args.fraccion * demandas['personal_necesario'].sum()
+    try:
+        asignacion, info = asignar(demandas, presupuesto, personal, args.piso)
+    except ValueError as error:
+        sys.exit(f"[ERROR] {error}")
+    segundos = time.perf_counter() - inicio
+
+    print(f"[OK] {len(asignacion):,} combinaciones ciudad x categoría asignadas en {segundos*1000:.0f} ms")
+    print(f"[OK] Presupuesto: ${info['presupuesto_usado']:,.0f} de ${presupuesto:,.0f} COP; "
+          f"personal: {info['personal_usado']:,} de {personal:,.0f}")
+    print(f"[OK] Demanda ponderada atendida: {info['demanda_atendida'] / info['demanda_total']:.1%}")
+    print(f"[OK] Valor marginal: {info['valor_peso_adicional'] * 1e9:.4f} por cada mil millones COP, "
+          f"{info['valor_persona_adicional']:.4f} por persona adicional")
+    print("\nCobertura promedio por categoría:")
+    print(asignacion.groupby('Categoría del problema')['cobertura'].mean().round(3))
+
+    if args.salida:
+        asignacion.to_csv(args.salida, index=False, encoding='utf-8')
+        print(f"[OK] Asignación guardada: {args.salida}")
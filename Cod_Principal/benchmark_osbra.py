@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# BENCHMARK POR ETAPAS CON UMBRALES DE REGRESIÓN
+# ============================================
+
+TAMANOS = [1_000, 10_000, 50_000]
+TOLERANCIA = 0.25
+
+COMENTARIOS_BASE = [
+    'las basuras no se recogen a tiempo.',
+    'necesitamos más acceso a internet en la zona.',
+    'faltan médicos en el centro de salud.',
+    'las calles están muy oscuras y peligrosas.',
+    'queremos más presencia policial.',
+    'la contaminación del río está aumentando.',
+    'no hay suficientes escuelas públicas.',
+    'hay problemas con la recolección de basura.',
+    'falta agua potable en varias casas.',
+    'no tenemos centros culturales ni bibliotecas.'
+]
+CIUDADES = ['Manizales', 'Santa Marta', 'Medellín', 'Bogotá', 'Cartagena', 'Cali',
+            'Barranquilla', 'Pereira', 'Cúcuta', 'Bucaramanga']
+NOMBRES = ['Jorge', 'Camilo', 'Pedro', 'Ana', 'María', 'Carlos', 'Laura', 'Sofía', 'Valentina', 'Juan']
+CATEGORIAS = ['Salud', 'Educación', 'Seguridad', 'Medio Ambiente']
+
+
+def generar_dataset_sintetico(n, semilla=42):
+    """Dataset con el esquema de dataset.csv y tasas de faltantes similares"""
+    rng = np.random.default_rng(semilla)
+    comentarios = np.asarray(COMENTARIOS_BASE, dtype=object)
+    # La mitad de los comentarios combina dos frases para ampliar el vocabulario
+    texto = comentarios[rng.integers(0, len(comentarios), n)]
+    segundo = comentarios[rng.integers(0, len(comentarios), n)]
+    combinar = rng.random(n) < 0.5
+    texto[combinar] = texto[combinar] + ' ' + segundo[combinar]
+
+    fechas = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D')
+    df = pd.DataFrame({
+        'ID': np.arange(1, n + 1),
+        'Nombre': rng.choice(NOMBRES, n),
+        'Edad': rng.integers(15, 81, n).astype(float),
+        'Género': rng.choice(['M', 'F', 'Otro'], n),
+        'Ciudad': rng.choice(CIUDADES, n).astype(object),
+        'Comentario': texto,
+        'Categoría del problema': rng.choice(CATEGORIAS, n),
+        'Nivel de urgencia': rng.choice(['Urgente', 'No urgente'], n),
+        'Fecha del reporte': fechas.strftime('%Y-%m-%d'),
+        'Acceso a internet': rng.integers(0, 2, n),
+        'Atención previa del gobierno': rng.integers(0, 2, n),
+        'Zona rural': rng.integers(0, 2, n)
+    })
+    for columna, tasa in [('Edad', 0.07), ('Género', 0.05), ('Ciudad', 0.014), ('Comentario', 0.064)]:
+        df.loc[rng.random(n) < tasa, columna] = np.nan
+    return df
+
+
+def _medir(funcion, repeticiones):
+    """Mejor tiempo de varias repeticiones (segundos) y el último resultado"""
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def ejecutar_benchmark(tamanos=TAMANOS, repeticiones=3, etapas=None, directorio=None):
+    """Ejecuta todas las etapas para cada tamaño; retorna {tamaño: {etapa: segundos}}"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+
+    from cubo_agregados import CuboAgregados
+    from gemini_simulado import GeminiSimulation
+    from limpieza import limpiar_datos
+    from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+
+    gemini_ai = GeminiSimulation()
+    generador = OSBRASolutionsGenerator()
+    resultados = {}
+
+    for n in tamanos:
+        print(f"\n[BENCHMARK] {n:,} reportes")
+        tiempos = {}
+        with tempfile.TemporaryDirectory(dir=directorio) as tmp:
+            ruta = os.path.join(tmp, 'dataset.csv')
+            generar_dataset_sintetico(n).to_csv(ruta, index=False, encoding='utf-8')
+            estado = {}
+
+            def etapa(nombre, funcion, reps=repeticiones):
+                if etapas and nombre not in etapas:
+                    return None
+                segundos, valor = _medir(funcion, reps)
+                tiempos[nombre] = segundos
+                print(f"  {nombre:<28} {segundos*1000:10.1f} ms  ({n / segundos:,.0f} filas/s)")
+                return valor
+
+            # Algunas etapas necesitan la salida de la anterior aunque no se midan
+            df = etapa('carga_csv', lambda: pd.read_csv(ruta, sep=',', encoding='utf-8'))
+            if df is None:
+                df = pd.read_csv(ruta, sep=',', encoding='utf-8')
+            df_clean = etapa('limpieza', lambda: limpiar_datos(df)[0])
+            if df_clean is None:
+                df_clean = limpiar_datos(df)[0]
+
+            def eda():
+                for columna in ['Categoría del problema', 'Nivel de urgencia', 'Ciudad', 'Tiene_Internet',
+                                'Atencion_Gobierno', 'Es_Zona_Rural', 'Género']:
+                    df_clean[columna].value_counts()
+                df_clean.groupby('Categoría del problema')['Edad'].mean()
+                pd.crosstab(df_clean['Es_Zona_Rural'], df_clean['Tiene_Internet'], normalize='index')
+                pd.crosstab(df_clean['Es_Zona_Rural'], df_clean['Atencion_Gobierno'], normalize='index')
+            etapa('eda', eda)
+
+            cubo = etapa('cubo_construccion', lambda: CuboAgregados.construir(df_clean))
+            if cubo is None:
+                cubo = CuboAgregados.construir(df_clean)
+
+            def eda_cubo():
+                for columna in ['Categoría del problema', 'Nivel de urgencia', 'Ciudad', 'Tiene_Internet',
+                                'Atencion_Gobierno', 'Es_Zona_Rural', 'Género']:
+                    cubo.conteo(columna)
+                cubo.edad_promedio('Categoría del problema')
+                cubo.tabla_cruzada('Es_Zona_Rural', 'Tiene_Internet', normalize='index')
+                cubo.tabla_cruzada('Es_Zona_Rural', 'Atencion_Gobierno', normalize='index')
+            etapa('eda_cubo', eda_cubo)
+
+            df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario']
+            textos, y = df_ml['Comentario'], df_ml['Categoría del problema']
+            vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))
+            etapa('tfidf_fit', lambda: vectorizer.fit(textos))
+            if not hasattr(vectorizer, 'vocabulary_'):
+                vectorizer.fit(textos)
+            X = etapa('tfidf_transform', lambda: vectorizer.transform(textos))
+            if X is None:
+                X = vectorizer.transform(textos)
+
+            estado['nb'] = MultinomialNB().fit(X, y)
+            etapa('nb_train', lambda: MultinomialNB().fit(X, y))
+            etapa('nb_predict', lambda: estado['nb'].predict(X))
+
+            def entrenar_rf():
+                return RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1).fit(X, y)
+            estado['rf'] = etapa('rf_train', entrenar_rf, reps=1)
+            if estado['rf'] is None and 'rf_predict' in etapas:
+                estado['rf'] = entrenar_rf()
+            etapa('rf_predict', lambda: estado['rf'].predict(X))
+
+            etapa('classify_with_gemini', lambda: textos.apply(gemini_ai.classify_with_gemini))
+            etapa('classify_batch', lambda: gemini_ai.classify_batch(textos))
+            etapa('summarize_with_gemini', lambda: textos.apply(gemini_ai.summarize_with_gemini))
+            etapa('summarize_batch', lambda: list(gemini_ai.summarize_batch(textos)))
+
+            def analizar_uno_a_uno():
+                for categoria, urgencia, ciudad in zip(df_clean['Categoría del problema'],
+                                                       df_clean['Nivel de urgencia'], df_clean['Ciudad']):
+                    generador.analizar_problema('', categoria, urgencia, ciudad, mostrar=False)
+            etapa('analizar_problema', analizar_uno_a_uno)
+            etapa('analizar_lote', lambda: generador.analizar_lote(df_clean))
+
+            def dashboard():
+                from DASHBOARD_FINAL_OSBRA import crear_dashboard_final_osbra
+                import matplotlib.pyplot as plt
+                anterior = os.getcwd()
+                os.chdir(tmp)
+                try:
+                    crear_dashboard_final_osbra()
+                finally:
+                    plt.close('all')
+                    os.chdir(anterior)
+            etapa('dashboard', dashboard, reps=1)
+
+        resultados[str(n)] = tiempos
+    return resultados
+
+
+def comparar_con_base(resultados, base, tolerancia=TOLERANCIA):
+    """Lista de regresiones: etapas más lentas que la base por encima de la tolerancia"""
+    regresiones = []
+    for tamano, tiempos in resultados.items():
+        for etapa, segundos in tiempos.items():
+            referencia = base.get('resultados', {}).get(tamano, {}).get(etapa)
+            if referencia and segundos > referencia * (1 + tolerancia):
+                regresiones.append({'tamano': int(tamano), 'etapa': etapa, 'base_s': referencia,
+                                    'actual_s': segundos, 'variacion': segundos / referencia - 1})
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de las etapas de OSBRA')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--etapas', nargs='+', default=None, help='Solo estas etapas')
+    parser.add_argument('--salida', default='benchmark_resultados.json')
+    parser.add_argument('--base', default=None, help='JSON de referencia para detectar regresiones')
+    parser.add_argument('--guardar-base', action='store_true', help='Guardar estos resultados como referencia en --base')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA, help='Lentitud relativa admitida (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BENCHMARK DE ETAPAS OSBRA")
+    print("="*60)
+    informe = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticiones': args.repeticiones,
+        'resultados': ejecutar_benchmark(args.tamanos, args.repeticiones, args.etapas)
+    }
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\n[OK] Resultados guardados: {args.salida}")
+
+    if args.base and args.guardar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"[OK] Referencia guardada: {args.base}")
+    elif args.base:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        regresiones = comparar_con_base(informe['resultados'], base, args.tolerancia)
+        if regresiones:
+            print(f"\n[REGRESION] {len(regresiones)} etapas superan la tolerancia de {args.tolerancia:.0%}:")
+            for r in regresiones:
+                print(f"  {r['tamano']:>8,} {r['etapa']:<28} {r['base_s']*1000:9.1f} ms -> "
+                      f"{r['actual_s']*1000:9.1f} ms (+{r['variacion']:.0%})")
+            sys.exit(1)
+        print(f"[OK] Sin regresiones respecto a {args.base} (tolerancia {args.tolerancia:.0%})")
@@ -0,0 +1,105 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from deduplicacion import factorizar
+from gemini_simulado import GeminiSimulation
+
+# ============================================
+# CLASIFICACIÓN Y RESUMEN DEL CORPUS EN PARALELO
+# ============================================
+
+TAMANO_BLOQUE = 20_000
+
+# Una instancia por proceso: los autómatas se construyen una sola vez por trabajador
+_gemini_trabajador = None
+
+
+def _iniciar_trabajador():
+    global _gemini_trabajador
+    _gemini_trabajador = GeminiSimulation()
+
+
+def _procesar_bloque(comentarios, max_length=100, gemini_ai=None):
+    """Etiquetas y resúmenes de un bloque de comentarios (lista de textos)"""
+    gemini_ai = gemini_ai or _gemini_trabajador or GeminiSimulation()
+    serie = pd.Series(comentarios, dtype=object)
+    etiquetas, _ = gemini_ai.classify_batch(serie)
+    return etiquetas.to_numpy(), list(gemini_ai.summarize_batch(comentarios, max_length))
+
+
+def _bloques(valores, tamano_bloque):
+    for inicio in range(0, len(valores), tamano_bloque):
+        yield valores[inicio:inicio + tamano_bloque]
+
+
+def procesar_corpus(comentarios, n_procesos=None, tamano_bloque=TAMANO_BLOQUE, max_length=100, deduplicar=True,
+                    gemini_ai=None):
+    """Clasifica y resume todo el corpus; retorna (etiquetas, resúmenes, estadísticas)
+
+    Los resultados conservan el índice y el orden de la Serie recibida. Con deduplicar=True
+    cada texto distinto se procesa una sola vez y el resultado se copia a sus filas.
+    gemini_ai (opcional) se usa cuando el corpus se procesa en este proceso; los
+    trabajadores de un pool construyen la suya.
+    """
+    n_procesos = n_procesos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    if deduplicar:
+        codigos, unicos = factorizar(comentarios, normalizar=False)
+        valores = unicos.tolist()
+    else:
+        codigos, valores = np.arange(len(comentarios)), comentarios.tolist()
+    if n_procesos == 1 or len(valores) <= tamano_bloque:
+        # Corpus pequeño: crear procesos cuesta más de lo que ahorra
+        n_procesos = 1
+        partes = [_procesar_bloque(valores, max_length, gemini_ai)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_procesos, initializer=_iniciar_trabajador) as ejecutor:
+            # map entrega los bloques en el orden de envío, no en el de finalización
+            partes = list(ejecutor.map(partial(_procesar_bloque, max_length=max_length),
+                                       _bloques(valores, tamano_bloque)))
+    duracion = time.perf_counter() - inicio
+
+    etiquetas = np.concatenate([p[0] for p in partes])
+    resumenes = np.asarray([r for p in partes for r in p[1]], dtype=object)
+    etiquetas = pd.Series(etiquetas[codigos], index=comentarios.index, name='Categoria_Gemini')
+    resumenes = pd.Series(resumenes[codigos], index=comentarios.index, name='Resumen_Gemini', dtype=object)
+    estadisticas = {
+        'filas': len(comentarios),
+        'textos_procesados': len(valores),
+        'procesos': n_procesos,
+        'bloques': len(partes),
+        'segundos': duracion,
+        'filas_por_segundo': len(comentarios) / duracion if duracion > 0 else float('inf')
+    }
+    return etiquetas, resumenes, estadisticas
+
+
+if __name__ == "__main__":
+    from limpieza import cargar_datos_limpios
+
+    parser = argparse.ArgumentParser(description='Etiqueta y resume todos los comentarios con Gemini simulado')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE)
+    parser.add_argument('--salida', default=None, help='CSV con las columnas Categoria_Gemini y Resumen_Gemini')
+    parser.add_argument('--sin-deduplicar', action='store_true', help='Procesar cada fila aunque el texto se repita')
+    args = parser.parse_args()
+
+    df_clean, _ = cargar_datos_limpios(args.archivo)
+    df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario'].copy()
+    df_ml['Categoria_Gemini'], df_ml['Resumen_Gemini'], estadisticas = procesar_corpus(
+        df_ml['Comentario'], args.procesos, args.tamano_bloque, deduplicar=not args.sin_deduplicar)
+    print(f"[OK] {estadisticas['filas']:,} comentarios en {estadisticas['segundos']:.2f} s "
+          f"({estadisticas['filas_por_segundo']:,.0f} filas/s, {estadisticas['procesos']} procesos, "
+          f"{estadisticas['bloques']} bloques, {estadisticas['textos_procesados']:,} textos procesados)")
+    precision = (df_ml['Categoria_Gemini'] == df_ml['Categoría del problema']).mean()
+    print(f"     Precisión de Gemini simulado sobre el corpus: {precision*100:.2f}%")
+    if args.salida:
+        df_ml.to_csv(args.salida, index=False, encoding='utf-8')
+        print(f"[OK] Corpus etiquetado guardado: {args.salida}")
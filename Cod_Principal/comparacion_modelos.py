@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy import sparse
+
+# ============================================
+# COMPARACIÓN DE MODELOS EN PARALELO
+# ============================================
+
+# Componentes de una matriz CSR que se escriben como .npy independientes
+COMPONENTES_CSR = ('data', 'indices', 'indptr')
+
+
+def compartir_matriz(X, directorio, nombre):
+    """Escribe la matriz dispersa una sola vez para que los procesos la lean por memmap"""
+    X = sparse.csr_matrix(X)
+    rutas = {'shape': X.shape}
+    for componente in COMPONENTES_CSR:
+        ruta = os.path.join(directorio, f"{nombre}_{componente}.npy")
+        np.save(ruta, getattr(X, componente))
+        rutas[componente] = ruta
+    return rutas
+
+
+def abrir_matriz(rutas):
+    """Reconstruye la matriz CSR sobre los arreglos mapeados en memoria (solo lectura)"""
+    componentes = [np.load(rutas[c], mmap_mode='r') for c in COMPONENTES_CSR]
+    return sparse.csr_matrix(tuple(componentes), shape=rutas['shape'], copy=False)
+
+
+def _entrenar_y_evaluar(nombre, modelo, rutas_train, y_train, rutas_test, y_test):
+    """Trabajo de cada proceso: solo viajan las rutas, no la matriz"""
+    inicio = time.perf_counter()
+    X_train = abrir_matriz(rutas_train)
+    X_test = abrir_matriz(rutas_test)
+    modelo.fit(X_train, y_train)
+    prediccion = modelo.predict(X_test)
+    return {
+        'nombre': nombre,
+        'modelo': modelo,
+        'prediccion': prediccion,
+        'precision': float((prediccion == np.asarray(y_test)).mean()),
+        'segundos': time.perf_counter() - inicio
+    }
+
+
+def comparar_modelos(modelos, X_train, y_train, X_test, y_test, max_procesos=None, directorio=None):
+    """Entrena todos los modelos a la vez; retorna {nombre: resultado} en el orden recibido"""
+    max_procesos = max_procesos or min(len(modelos), os.cpu_count() or 1)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+    tmp = tempfile.mkdtemp(prefix='osbra_modelos_', dir=directorio)
+    try:
+        rutas_train = compartir_matriz(X_train, tmp, 'train')
+        rutas_test = compartir_matriz(X_test, tmp, 'test')
+        resultados = {}
+        with ProcessPoolExecutor(max_workers=max_procesos) as ejecutor:
+            futuros = [ejecutor.submit(_entrenar_y_evaluar, nombre, modelo, rutas_train, y_train, rutas_test, y_test)
+                       for nombre, modelo in modelos.items()]
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                resultados[resultado['nombre']] = resultado
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {nombre: resultados[nombre] for nombre in modelos}
+
+
+if __name__ == "__main__":
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.model_selection import train_test_split
+    from sklearn.naive_bayes import MultinomialNB
+
+    from limpieza import cargar_datos_limpios
+
+    df_clean, _ = cargar_datos_limpios('dataset.csv')
+    df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario']
+    X = TfidfVectorizer(max_features=1000, ngram_range=(1, 2)).fit_transform(df_ml['Comentario'])
+    y = df_ml['Categoría del problema']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    candidatos = {
+        'naive_bayes': MultinomialNB(),
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    }
+    inicio = time.perf_counter()
+    resultados = comparar_modelos(candidatos, X_train, y_train, X_test, y_test)
+    total = time.perf_counter() - inicio
+    for nombre, resultado in resultados.items():
+        print(f"{nombre:<16} precisión {resultado['precision']*100:6.2f}%  {resultado['segundos']:6.2f} s")
+    suma = sum(r['segundos'] for r in resultados.values())
+    print(f"[OK] Comparación en paralelo: {total:.2f} s (secuencial ≈ {suma:.2f} s)")
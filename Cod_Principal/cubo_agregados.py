@@ -0,0 +1,235 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from limpieza import (COLUMNAS_SI_NO, DIRECTORIO_CACHE, MAPA_SI_NO, _guardar_tabla, _leer_tabla,
+                      cargar_datos_limpios, limpiar_datos, mediana_frecuencias)
+
+# ============================================
+# CUBO DE AGREGADOS MATERIALIZADO
+# ============================================
+
+# Incrementar cuando cambien las dimensiones o las medidas: invalida los cubos guardados
+VERSION_CUBO = 2
+
+DIMENSIONES = ['Ciudad', 'Categoría del problema', 'Nivel de urgencia', 'Es_Zona_Rural',
+               'Tiene_Internet', 'Atencion_Gobierno', 'Género', 'Año', 'Mes']
+# faltantes_edad: reportes sin edad, rellenados con la mediana del archivo (ver limpieza.py)
+MEDIDAS = ['conteo', 'suma_edad', 'faltantes_edad']
+
+
+def _agregar_filas(df_clean, faltantes=None):
+    """Una sola pasada de groupby: conteo, suma de edad y edades rellenadas por celda del cubo
+
+    faltantes marca (por posición) las filas cuya edad se rellenó con la mediana; sin él
+    el cubo no puede corregir esas edades si la mediana cambia al agregar reportes.
+    """
+    # Las tablas compactas (esquema_compacto.py) no traen las etiquetas "Si"/"No": se agrupa
+    # por los indicadores y las etiquetas se ponen sobre el cubo, mucho más pequeño
+    derivadas = {columna: origen for columna, origen in COLUMNAS_SI_NO.items() if columna not in df_clean}
+    claves = [derivadas.get(dimension, dimension) for dimension in DIMENSIONES]
+    # dropna=False conserva las filas con ciudad o género faltante en el total
+    medidas = {'conteo': ('Edad', 'size'), 'suma_edad': ('Edad', 'sum')}
+    if faltantes is not None:
+        df_clean = df_clean[list(dict.fromkeys(claves + ['Edad']))].assign(_faltante=np.asarray(faltantes, dtype=int))
+        medidas['faltantes_edad'] = ('_faltante', 'sum')
+    tabla = (df_clean.groupby(claves, dropna=False, sort=False, observed=True)
+             .agg(**medidas)
+             .reset_index())
+    if faltantes is None:
+        tabla['faltantes_edad'] = 0
+    for columna, origen in derivadas.items():
+        # Indicador faltante (boolean nulable): la etiqueta queda faltante, como en limpiar_datos
+        tabla[origen] = tabla[origen].astype('Int8').astype(object).map(MAPA_SI_NO)
+    tabla = tabla.rename(columns={origen: columna for columna, origen in derivadas.items()})
+    for dimension in DIMENSIONES:
+        if isinstance(tabla[dimension].dtype, pd.CategoricalDtype):
+            tabla[dimension] = tabla[dimension].astype(object)
+    tabla['suma_edad'] = tabla['suma_edad'].astype('float64')
+    tabla['faltantes_edad'] = tabla['faltantes_edad'].astype('int64')
+    return tabla
+
+
+class CuboAgregados:
+    """Conteos y sumas por combinación de dimensiones; reemplaza value_counts/crosstab sobre las filas"""
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+
+    @classmethod
+    def construir(cls, df_clean, faltantes=None):
+        return cls(_agregar_filas(df_clean, faltantes))
+
+    def agregar(self, df_nuevos, faltantes=None):
+        """Suma al cubo los reportes nuevos sin recalcular los anteriores"""
+        combinado = pd.concat([self.tabla, _agregar_filas(df_nuevos, faltantes)], ignore_index=True)
+        self.tabla = combinado.groupby(DIMENSIONES, dropna=False, sort=False)[MEDIDAS].sum().reset_index()
+        return self
+
+    def cambiar_mediana(self, anterior, nueva):
+        """Vuelve a rellenar las edades faltantes ya sumadas con otra mediana"""
+        self.tabla['suma_edad'] += self.tabla['faltantes_edad'] * (nueva - anterior)
+        return self
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    @property
+    def total(self):
+        return int(self.tabla['conteo'].sum())
+
+    def conteo(self, dimension, normalize=False):
+        """Equivalente a df[dimension].value_counts(normalize=...)"""
+        conteos = self.tabla.groupby(dimension)['conteo'].sum()
+        conteos = conteos[conteos > 0].sort_values(ascending=False, kind='stable')
+        if normalize:
+            return (conteos / conteos.sum()).rename('proportion')
+        return conteos.rename('count')
+
+    def n_unicos(self, dimension):
+        return int((self.tabla.groupby(dimension)['conteo'].sum() > 0).sum())
+
+    def tabla_cruzada(self, filas, columnas, normalize=None):
+        """Equivalente a pd.crosstab(df[filas], df[columnas], normalize=...)"""
+        cruzada = self.tabla.pivot_table(index=filas, columns=columnas, values='conteo',
+                                         aggfunc='sum', fill_value=0)
+        if normalize == 'index':
+            return cruzada.div(cruzada.sum(axis=1), axis=0)
+        return cruzada
+
+    def edad_promedio(self, por):
+        """Equivalente a df.groupby(por)['Edad'].mean()"""
+        sumas = self.tabla.groupby(por)[MEDIDAS].sum()
+        return (sumas['suma_edad'] / sumas['conteo']).rename('Edad')
+
+    # ------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------
+
+    def guardar(self, prefijo, metadatos):
+        os.makedirs(os.path.dirname(prefijo) or '.', exist_ok=True)
+        metadatos = {**metadatos, 'version': VERSION_CUBO, 'archivo_cubo': _guardar_tabla(self.tabla, prefijo)}
+        # Los metadatos se escriben al final: marcan el cubo como completo
+        with open(prefijo + '.json', 'w', encoding='utf-8') as f:
+            json.dump(metadatos, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def leer(cls, prefijo):
+        """Cubo y metadatos guardados, o (None, None) si no existen o son de otra versión"""
+        if not os.path.exists(prefijo + '.json'):
+            return None, None
+        with open(prefijo + '.json', encoding='utf-8') as f:
+            metadatos = json.load(f)
+        tabla = _leer_tabla(prefijo) if metadatos.get('version') == VERSION_CUBO else None
+        if tabla is None:
+            return None, None
+        return cls(tabla), metadatos
+
+
+def _huella_prefijo(ruta, n_bytes, tamano_bloque=1 << 20):
+    """Hash de los primeros n_bytes del archivo (detecta si solo se agregaron filas al final)"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        restante = n_bytes
+        while restante > 0:
+            bloque = f.read(min(tamano_bloque, restante))
+            if not bloque:
+                break
+            h.update(bloque)
+            restante -= len(bloque)
+    return h.hexdigest()[:16]
+
+
+def _histograma_edades(edades, histograma=None):
+    """Suma al histograma (Serie edad -> reportes) las edades observadas, sin faltantes"""
+    conteos = pd.Series(edades, dtype='float64').value_counts()
+    return conteos if histograma is None else histograma.add(conteos, fill_value=0)
+
+
+def _escribir_histograma(histograma):
+    """Histograma como pares [edad, reportes] (JSON no admite claves numéricas)"""
+    return [[float(edad), int(n)] for edad, n in histograma.sort_index().items()]
+
+
+def _leer_histograma(metadatos):
+    return pd.Series({float(edad): n for edad, n in metadatos['edades']}, dtype='float64')
+
+
+def _leer_filas_nuevas(ruta, desde_byte):
+    """Lee solo las filas agregadas después de desde_byte, con el encabezado original"""
+    with open(ruta, 'rb') as f:
+        encabezado = f.readline()
+        f.seek(desde_byte)
+        cola = f.read()
+    return pd.read_csv(io.BytesIO(encabezado + cola), sep=',', encoding='utf-8')
+
+
+def cargar_cubo(ruta='dataset.csv', df_clean=None, directorio_cache=None):
+    """Cubo del archivo: lo reutiliza, lo actualiza con las filas agregadas o lo construye
+
+    df_clean evita volver a cargar el dataset limpio cuando el llamador ya lo tiene.
+    Retorna (cubo, info) con info['origen'] en {'cache', 'incremental', 'completo'}.
+    """
+    if directorio_cache is None:
+        directorio_cache = os.path.join(os.path.dirname(ruta) or '.', DIRECTORIO_CACHE)
+    prefijo = os.path.join(directorio_cache, os.path.splitext(os.path.basename(ruta))[0] + '_cubo')
+    tamano = os.path.getsize(ruta)
+
+    cubo, metadatos = CuboAgregados.leer(prefijo)
+    if cubo is not None and metadatos['bytes'] <= tamano and \
+            metadatos['huella_prefijo'] == _huella_prefijo(ruta, metadatos['bytes']):
+        if metadatos['bytes'] == tamano:
+            return cubo, {**metadatos, 'origen': 'cache', 'filas_nuevas': 0}
+        # Solo se agregaron reportes al final. limpieza rellena las edades con la mediana de
+        # todo el archivo: se recalcula con el histograma y, si cambió, se corrigen las edades
+        # rellenadas que ya estaban en el cubo antes de sumar las nuevas
+        df_nuevos = _leer_filas_nuevas(ruta, metadatos['bytes'])
+        # Las edades no numéricas cuentan como faltantes, igual que en limpiar_datos
+        df_nuevos['Edad'] = pd.to_numeric(df_nuevos['Edad'], errors='coerce')
+        histograma = _histograma_edades(df_nuevos['Edad'], _leer_histograma(metadatos))
+        anterior, edad_mediana = metadatos['edad_mediana'], mediana_frecuencias(histograma)
+        if not (np.isnan(anterior) or np.isnan(edad_mediana)):
+            if edad_mediana != anterior:
+                cubo.cambiar_mediana(anterior, edad_mediana)
+            faltantes = df_nuevos['Edad'].isna().to_numpy()
+            df_nuevos, _ = limpiar_datos(df_nuevos, edad_mediana)
+            cubo.agregar(df_nuevos, faltantes)
+            metadatos.update({'bytes': tamano, 'huella_prefijo': _huella_prefijo(ruta, tamano),
+                              'filas': metadatos['filas'] + len(df_nuevos), 'edad_mediana': edad_mediana,
+                              'edades': _escribir_histograma(histograma)})
+            cubo.guardar(prefijo, metadatos)
+            return cubo, {**metadatos, 'origen': 'incremental', 'filas_nuevas': len(df_nuevos),
+                          'mediana_anterior': anterior}
+
+    if df_clean is None:
+        df_clean, _ = cargar_datos_limpios(ruta, directorio_cache)
+    # Las edades crudas dan el histograma y las filas rellenadas (limpieza no elimina filas)
+    edades = pd.to_numeric(pd.read_csv(ruta, sep=',', encoding='utf-8', usecols=['Edad'])['Edad'], errors='coerce')
+    histograma = _histograma_edades(edades)
+    faltantes = edades.isna().to_numpy() if len(edades) == len(df_clean) else None
+    cubo = CuboAgregados.construir(df_clean, faltantes)
+    metadatos = {'bytes': tamano, 'huella_prefijo': _huella_prefijo(ruta, tamano),
+                 'edad_mediana': mediana_frecuencias(histograma), 'filas': len(df_clean),
+                 'edades': _escribir_histograma(histograma)}
+    cubo.guardar(prefijo, metadatos)
+    return cubo, {**metadatos, 'origen': 'completo', 'filas_nuevas': len(df_clean)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Construye o actualiza el cubo de agregados de OSBRA')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    cubo, info = cargar_cubo(args.archivo)
+    print(f"[OK] Cubo {info['origen']}: {len(cubo.tabla):,} celdas, {cubo.total:,} reportes "
+          f"({info['filas_nuevas']:,} nuevos) en {(time.perf_counter() - inicio)*1000:.0f} ms")
+    print("\nDistribución por Categoría del Problema:")
+    print(cubo.conteo('Categoría del problema'))
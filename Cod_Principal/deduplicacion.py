@@ -0,0 +1,150 @@
+import argparse
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# DEDUPLICACIÓN Y DIFUSIÓN DE RESULTADOS POR TEXTO ÚNICO
+# ============================================
+
+CAPACIDAD_LRU = 100_000
+
+
+def normalizar_comentarios(comentarios):
+    """Clave de deduplicación: minúsculas y sin espacios en los extremos
+
+    Las etapas que se deduplican con esta clave ya ignoran esas diferencias (Gemini simulado
+    compara en minúsculas y TF-IDF tokeniza en minúsculas), así que el resultado no cambia.
+    No se colapsan espacios internos: cambiaría qué frases detecta el autómata.
+    """
+    return pd.Series(comentarios, dtype=object).fillna('').astype(str).str.strip().str.lower()
+
+
+def factorizar(comentarios, normalizar=True):
+    """Códigos por fila y textos únicos (en orden de aparición)"""
+    claves = normalizar_comentarios(comentarios) if normalizar else pd.Series(comentarios, dtype=object)
+    codigos, unicos = pd.factorize(claves, use_na_sentinel=False)
+    return codigos, pd.Series(unicos, dtype=object)
+
+
+def clasificar_deduplicado(gemini_ai, comentarios):
+    """classify_batch una vez por texto único; retorna la Serie de etiquetas con el índice original"""
+    codigos, unicos = factorizar(comentarios)
+    etiquetas, _ = gemini_ai.classify_batch(unicos)
+    return pd.Series(etiquetas.to_numpy()[codigos], index=comentarios.index, name='Categoria_Gemini')
+
+
+def resumir_deduplicado(gemini_ai, comentarios, max_length=100):
+    """summarize_batch una vez por texto exacto (el resumen copia las oraciones originales)"""
+    codigos, unicos = factorizar(comentarios, normalizar=False)
+    resumenes = np.asarray(list(gemini_ai.summarize_batch(unicos, max_length)), dtype=object)
+    return pd.Series(resumenes[codigos], index=comentarios.index, name='Resumen_Gemini')
+
+
+def transformar_deduplicado(vectorizer, comentarios):
+    """vectorizer.transform una vez por texto único; las filas repetidas comparten su vector"""
+    codigos, unicos = factorizar(comentarios)
+    return vectorizer.transform(unicos)[codigos]
+
+
+class CacheLRU:
+    """Diccionario acotado que descarta la entrada usada hace más tiempo"""
+
+    def __init__(self, capacidad=CAPACIDAD_LRU):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, defecto=None):
+        if clave in self._datos:
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return self._datos[clave]
+        self.fallos += 1
+        return defecto
+
+    def guardar(self, clave, valor):
+        self._datos[clave] = valor
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class MemoizadorTexto:
+    """Aplica una función por lotes a flujos de comentarios, calculando solo los textos no vistos
+
+    funcion_lote recibe una lista de textos únicos y retorna un resultado por texto.
+    """
+
+    def __init__(self, funcion_lote, capacidad=CAPACIDAD_LRU, normalizar=True):
+        self.funcion_lote = funcion_lote
+        self.normalizar = normalizar
+        self.cache = CacheLRU(capacidad)
+
+    def procesar(self, comentarios):
+        """Resultados por fila (arreglo object) para un bloque de comentarios"""
+        codigos, unicos = factorizar(comentarios, self.normalizar)
+        resultados = np.empty(len(unicos), dtype=object)
+        faltantes = []
+        for i, texto in enumerate(unicos):
+            if texto in self.cache:
+                resultados[i] = self.cache.obtener(texto)
+            else:
+                self.cache.fallos += 1
+                faltantes.append(i)
+        if faltantes:
+            calculados = self.funcion_lote([unicos.iat[i] for i in faltantes])
+            for i, valor in zip(faltantes, calculados):
+                resultados[i] = valor
+                self.cache.guardar(unicos.iat[i], valor)
+        return resultados[codigos]
+
+    def tasa_aciertos(self):
+        consultas = self.cache.aciertos + self.cache.fallos
+        return self.cache.aciertos / consultas if consultas else 0.0
+
+
+def memoizar_clasificacion(gemini_ai, capacidad=CAPACIDAD_LRU):
+    """Memoizador de classify_batch para bloques de un flujo de reportes"""
+    return MemoizadorTexto(lambda textos: gemini_ai.classify_batch(pd.Series(textos, dtype=object))[0].tolist(),
+                           capacidad)
+
+
+if __name__ == "__main__":
+    from gemini_simulado import GeminiSimulation
+    from limpieza import cargar_datos_limpios
+
+    parser = argparse.ArgumentParser(description='Compara el procesamiento de texto por fila y por texto único')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    args = parser.parse_args()
+
+    df_clean, _ = cargar_datos_limpios(args.archivo)
+    comentarios = df_clean['Comentario']
+    gemini_ai = GeminiSimulation()
+    _, unicos = factorizar(comentarios)
+    print(f"[OK] {len(comentarios):,} comentarios, {len(unicos):,} textos únicos")
+
+    for nombre, por_fila, deduplicado in [
+        ('clasificación', lambda: gemini_ai.classify_batch(comentarios)[0],
+         lambda: clasificar_deduplicado(gemini_ai, comentarios)),
+        ('resumen', lambda: pd.Series(list(gemini_ai.summarize_batch(comentarios)), index=comentarios.index),
+         lambda: resumir_deduplicado(gemini_ai, comentarios))
+    ]:
+        inicio = time.perf_counter()
+        esperado = por_fila()
+        t_fila = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        obtenido = deduplicado()
+        t_unicos = time.perf_counter() - inicio
+        iguales = (esperado.to_numpy() == obtenido.to_numpy()).all()
+        print(f"  {nombre:<14} por fila {t_fila*1000:8.1f} ms  por texto único {t_unicos*1000:8.1f} ms  "
+              f"(x{t_fila / t_unicos:,.0f}, resultados iguales: {iguales})")
@@ -0,0 +1,239 @@
+import argparse
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+
+from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+
+# ============================================
+# DESPACHO DE PROBLEMAS ABIERTOS POR PLAZO Y PRIORIDAD
+# ============================================
+
+# Horas de cada tiempo_respuesta de _definir_prioridades
+PLAZOS_HORAS = {'24 horas': 24, '48 horas': 48, '1 semana': 168, '2 semanas': 336}
+# Posición del identificador en cada entrada; None marca una entrada eliminada (borrado perezoso)
+ID = 3
+
+
+def plazo_segundos(tiempo_respuesta):
+    """Segundos disponibles para atender un problema según su tiempo_respuesta"""
+    return PLAZOS_HORAS[tiempo_respuesta] * 3600
+
+
+class Despachador:
+    """Colas de prioridad de problemas abiertos, una por (ciudad, categoría) y una global
+
+    Cada entrada es [vencimiento, -score, secuencia, id, ciudad, categoría, nivel]: sale primero
+    el plazo más próximo y, a igual plazo, el score más alto. La misma entrada vive en su cola y
+    en la global; completar o escalar solo la marca como eliminada (O(1)) y el heap la descarta
+    al llegar a la cima, así que insertar, escalar, completar y despachar cuestan O(log n).
+    """
+
+    def __init__(self, generador=None):
+        self.generador = generador or OSBRASolutionsGenerator()
+        self._colas = {}
+        self._global = []
+        self._entradas = {}
+        self._abiertos_por_cola = Counter()
+        self._secuencia = itertools.count()
+        # Entradas eliminadas que siguen dentro de algún heap
+        self._basura = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _nueva_entrada(self, id_reporte, ciudad, categoria, prioridad, vencimiento):
+        return [vencimiento, -prioridad['score'], next(self._secuencia), id_reporte, ciudad, categoria,
+                prioridad['nivel']]
+
+    def _empujar(self, entrada):
+        self._entradas[entrada[ID]] = entrada
+        self._abiertos_por_cola[(entrada[4], entrada[5])] += 1
+        heapq.heappush(self._colas.setdefault((entrada[4], entrada[5]), []), entrada)
+        heapq.heappush(self._global, entrada)
+
+    def _descartar(self, entrada):
+        """Saca la entrada de las colas marcándola; sigue ocupando lugar en sus dos heaps"""
+        del self._entradas[entrada[ID]]
+        self._abiertos_por_cola[(entrada[4], entrada[5])] -= 1
+        entrada[ID] = None
+        self._basura += 2
+        if self._basura > 2 * len(self._entradas) + 1024:
+            self._compactar()
+
+    def _compactar(self):
+        """Reconstruye los heaps sin las entradas eliminadas (O(n), amortizado en las eliminaciones)"""
+        self._global = [e for e in self._global if e[ID] is not None]
+        heapq.heapify(self._global)
+        for clave in list(self._colas):
+            cola = [e for e in self._colas[clave] if e[ID] is not None]
+            if cola:
+                heapq.heapify(cola)
+                self._colas[clave] = cola
+            else:
+                del self._colas[clave]
+        self._basura = 0
+
+    # ------------------------------------------------------------
+    # Operaciones
+    # ------------------------------------------------------------
+
+    def insertar(self, id_reporte, categoria, urgencia, ciudad, creado=None):
+        """Abre un problema; su plazo sale del tiempo_respuesta de _calcular_prioridad"""
+        if id_reporte in self._entradas:
+            raise KeyError(f"El problema {id_reporte} ya está abierto")
+        creado = time.time() if creado is None else creado
+        prioridad = self.generador._calcular_prioridad(categoria, urgencia, ciudad)
+        entrada = self._nueva_entrada(id_reporte, ciudad, categoria, prioridad,
+                                      creado + plazo_segundos(prioridad['tiempo_respuesta']))
+        self._empujar(entrada)
+        return entrada
+
+    def escalar(self, id_reporte, urgencia='Urgente', ahora=None):
+        """Recalcula la prioridad con la nueva urgencia; el plazo nunca se alarga"""
+        anterior = self._entradas[id_reporte]
+        ahora = time.time() if ahora is None else ahora
+        prioridad = self.generador._calcular_prioridad(anterior[5], urgencia, anterior[4])
+        vencimiento = min(anterior[0], ahora + plazo_segundos(prioridad['tiempo_respuesta']))
+        self._descartar(anterior)
+        entrada = self._nueva_entrada(id_reporte, anterior[4], anterior[5], prioridad, vencimiento)
+        self._empujar(entrada)
+        return entrada
+
+    def completar(self, id_reporte):
+        """Cierra un problema abierto"""
+        self._descartar(self._entradas[id_reporte])
+
+    def _cima(self, heap):
+        while heap and heap[0][ID] is None:
+            heapq.heappop(heap)
+            self._basura -= 1
+        return heap[0] if heap else None
+
+    def siguiente(self, ciudad=None, categoria=None, retirar=True):
+        """Problema más urgente: global, o de la cola (ciudad, categoría) si se indican; None si no hay"""
+        heap = self._global if ciudad is None and categoria is None else self._colas.get((ciudad, categoria), [])
+        entrada = self._cima(heap)
+        if entrada is None:
+            return None
+        resultado = {'id': entrada[ID], 'vencimiento': entrada[0], 'score': -entrada[1],
+                     'ciudad': entrada[4], 'categoria': entrada[5], 'nivel': entrada[6]}
+        if retirar:
+            self._descartar(entrada)
+        return resultado
+
+    def pendientes(self, ciudad, categoria):
+        """Problemas abiertos en la cola de una ciudad y categoría"""
+        return self._abiertos_por_cola[(ciudad, categoria)]
+
+    # ------------------------------------------------------------
+    # Carga masiva
+    # ------------------------------------------------------------
+
+    def cargar_abiertos(self, df, col_id='ID', col_categoria='Categoría del problema',
+                        col_urgencia='Nivel de urgencia', col_ciudad='Ciudad', col_fecha='Fecha del reporte'):
+        """Abre todos los problemas de un DataFrame con analizar_lote y heapify (O(n), no n inserciones)"""
+        import numpy as np
+        import pandas as pd
+
+        ids = df[col_id].tolist()
+        if len(set(ids)) != len(ids) or not self._entradas.keys().isdisjoint(ids):
+            raise KeyError("Hay problemas repetidos o ya abiertos en el lote")
+        planes = self.generador.analizar_lote(df, col_categoria, col_urgencia, col_ciudad)
+        creado = pd.to_datetime(df[col_fecha]).to_numpy().astype('datetime64[s]').astype(np.int64)
+        vencimiento = creado + planes['tiempo_respuesta'].map(plazo_segundos).to_numpy(dtype=np.int64)
+        inicio = next(self._secuencia)
+        self._secuencia = itertools.count(inicio + len(df) + 1)
+
+        nuevas = list(map(list, zip(vencimiento.astype(float).tolist(), (-planes['prioridad_score']).tolist(),
+                                    range(inicio, inicio + len(df)), ids,
+                                    df[col_ciudad].tolist(), df[col_categoria].astype(object).tolist(),
+                                    planes['prioridad_nivel'].astype(str).tolist())))
+        for entrada in nuevas:
+            self._entradas[entrada[ID]] = entrada
+            self._abiertos_por_cola[(entrada[4], entrada[5])] += 1
+            self._colas.setdefault((entrada[4], entrada[5]), []).append(entrada)
+        self._global.extend(nuevas)
+        heapq.heapify(self._global)
+        for cola in self._colas.values():
+            heapq.heapify(cola)
+        return len(nuevas)
+
+
+def benchmark(abiertos=1_000_000, segundos=5.0, semilla=42):
+    """Operaciones sostenidas por segundo con una mezcla de inserciones, escaladas, cierres y despachos"""
+    import numpy as np
+    import pandas as pd
+
+    from benchmark_osbra import CATEGORIAS, CIUDADES
+
+    rng = np.random.default_rng(semilla)
+    despachador = Despachador()
+    base = pd.DataFrame({
+        'ID': np.arange(abiertos),
+        'Categoría del problema': rng.choice(CATEGORIAS, abiertos).astype(object),
+        'Nivel de urgencia': rng.choice(['Urgente', 'No urgente'], abiertos).astype(object),
+        'Ciudad': rng.choice(CIUDADES, abiertos).astype(object),
+        'Fecha del reporte': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 30 * 86400, abiertos), unit='s')
+    })
+    inicio = time.perf_counter()
+    despachador.cargar_abiertos(base)
+    carga = time.perf_counter() - inicio
+
+    aleatorio = random.Random(semilla)
+    abiertos_ids = list(range(abiertos))
+    siguiente_id = abiertos
+    ahora = pd.Timestamp('2024-02-01').timestamp()
+    conteo = dict.fromkeys(['insertar', 'escalar', 'completar', 'siguiente'], 0)
+    fin = time.perf_counter() + segundos
+    operaciones = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() < fin:
+        # Lotes de 1000 operaciones entre lecturas del reloj
+        for _ in range(1000):
+            r = aleatorio.random()
+            if r < 0.4 or not abiertos_ids:
+                despachador.insertar(siguiente_id, aleatorio.choice(CATEGORIAS),
+                                     aleatorio.choice(['Urgente', 'No urgente']), aleatorio.choice(CIUDADES), ahora)
+                abiertos_ids.append(siguiente_id)
+                siguiente_id += 1
+                conteo['insertar'] += 1
+                continue
+            # Elegir un abierto al azar; los ya cerrados se retiran de la lista al encontrarlos
+            posicion = aleatorio.randrange(len(abiertos_ids))
+            id_reporte = abiertos_ids[posicion]
+            if id_reporte not in despachador._entradas:
+                abiertos_ids[posicion] = abiertos_ids[-1]
+                abiertos_ids.pop()
+                continue
+            if r < 0.6:
+                despachador.escalar(id_reporte, 'Urgente', ahora)
+                conteo['escalar'] += 1
+            elif r < 0.8:
+                despachador.completar(id_reporte)
+                abiertos_ids[posicion] = abiertos_ids[-1]
+                abiertos_ids.pop()
+                conteo['completar'] += 1
+            else:
+                despachador.siguiente(aleatorio.choice(CIUDADES), aleatorio.choice(CATEGORIAS))
+                conteo['siguiente'] += 1
+        operaciones = sum(conteo.values())
+    duracion = time.perf_counter() - inicio
+    return {'abiertos_iniciales': abiertos, 'carga_s': carga, 'operaciones': operaciones,
+            'operaciones_por_segundo': operaciones / duracion, 'abiertos_finales': len(despachador), **conteo}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del despachador de problemas abiertos')
+    parser.add_argument('--abiertos', type=int, default=1_000_000)
+    parser.add_argument('--segundos', type=float, default=5.0)
+    args = parser.parse_args()
+
+    resultado = benchmark(args.abiertos, args.segundos)
+    print(f"[OK] {resultado['abiertos_iniciales']:,} problemas abiertos cargados en {resultado['carga_s']:.2f} s")
+    print(f"[OK] {resultado['operaciones']:,} operaciones: {resultado['operaciones_por_segundo']:,.0f} ops/s "
+          f"({resultado['abiertos_finales']:,} abiertos al final)")
+    for operacion in ('insertar', 'escalar', 'completar', 'siguiente'):
+        print(f"  {operacion:<10} {resultado[operacion]:,}")
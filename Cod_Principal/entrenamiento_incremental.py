@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+
+from gemini_simulado import CATEGORIAS
+from limpieza import cargar_datos_limpios
+
+# ============================================
+# ENTRENAMIENTO INCREMENTAL POR LOTES DIARIOS
+# ============================================
+
+DIRECTORIO_SNAPSHOTS = 'snapshots_incremental'
+ARCHIVO_HISTORIAL = 'historial.json'
+
+
+def crear_vectorizador(n_caracteristicas=2**18):
+    """Vectorizador sin estado: no requiere ajustar vocabulario con el historial"""
+    # alternate_sign=False mantiene las características no negativas (necesario para NB)
+    return HashingVectorizer(n_features=n_caracteristicas, ngram_range=(1, 2),
+                             alternate_sign=False, norm='l2')
+
+
+class ModeloIncremental:
+    """Clasificador de categoría actualizable con partial_fit y snapshots para rollback"""
+
+    def __init__(self, directorio=DIRECTORIO_SNAPSHOTS, tipo='naive_bayes', clases=CATEGORIAS):
+        self.directorio = directorio
+        self.tipo = tipo
+        self.clases = np.asarray(clases, dtype=object)
+        self.vectorizador = crear_vectorizador()
+        self.modelo = self._crear_modelo(tipo)
+        self.historial = []
+        self.reportes_vistos = 0
+
+    @staticmethod
+    def _crear_modelo(tipo):
+        if tipo == 'naive_bayes':
+            return MultinomialNB(alpha=0.1)
+        if tipo == 'sgd':
+            return SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)
+        raise ValueError(f"Tipo de modelo no soportado: {tipo}")
+
+    def actualizar(self, df_lote, col_texto='Comentario', col_categoria='Categoría del problema',
+                   etiqueta=None):
+        """Actualiza el modelo con un lote nuevo y guarda un snapshot; retorna su id"""
+        validos = df_lote[(df_lote[col_texto] != 'Sin comentario') & df_lote[col_categoria].isin(self.clases)]
+        if len(validos):
+            X = self.vectorizador.transform(validos[col_texto].astype(str))
+            self.modelo.partial_fit(X, validos[col_categoria].astype(object).to_numpy(), classes=self.clases)
+            self.reportes_vistos += len(validos)
+        return self.guardar_snapshot(etiqueta, len(validos))
+
+    def predecir(self, comentarios):
+        return self.modelo.predict(self.vectorizador.transform(comentarios))
+
+    def precision(self, df, col_texto='Comentario', col_categoria='Categoría del problema'):
+        validos = df[df[col_texto] != 'Sin comentario']
+        return float((self.predecir(validos[col_texto].astype(str)) == validos[col_categoria].astype(object).to_numpy()).mean())
+
+    # ------------------------------------------------------------
+    # Snapshots y rollback
+    # ------------------------------------------------------------
+
+    def guardar_snapshot(self, etiqueta=None, reportes_lote=0):
+        """Guarda el estado actual del modelo (el vectorizador no tiene estado)"""
+        os.makedirs(self.directorio, exist_ok=True)
+        self.historial = self._leer_historial()
+        numero = self.historial[-1]['id'] + 1 if self.historial else 1
+        archivo = f"snapshot_{numero:05d}.joblib"
+        joblib.dump({'tipo': self.tipo, 'modelo': self.modelo, 'clases': self.clases,
+                     'reportes_vistos': self.reportes_vistos},
+                    os.path.join(self.directorio, archivo), compress=3)
+        self.historial.append({
+            'id': numero,
+            'archivo': archivo,
+            'etiqueta': etiqueta,
+            'creado': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'reportes_lote': int(reportes_lote),
+            'reportes_vistos': int(self.reportes_vistos)
+        })
+        self._escribir_historial()
+        return numero
+
+    def rollback(self, snapshot_id):
+        """Restaura el modelo a un snapshot anterior; los snapshots posteriores se conservan"""
+        entrada = next((h for h in self._leer_historial() if h['id'] == snapshot_id), None)
+        if entrada is None:
+            raise KeyError(f"Snapshot {snapshot_id} no encontrado en '{self.directorio}'")
+        estado = joblib.load(os.path.join(self.directorio, entrada['archivo']))
+        self.tipo = estado['tipo']
+        self.modelo = estado['modelo']
+        self.clases = estado['clases']
+        self.reportes_vistos = estado['reportes_vistos']
+        return entrada
+
+    @classmethod
+    def cargar(cls, directorio=DIRECTORIO_SNAPSHOTS, snapshot_id=None):
+        """Carga el último snapshot (o el indicado) para seguir actualizando"""
+        modelo = cls(directorio)
+        historial = modelo._leer_historial()
+        if not historial:
+            raise FileNotFoundError(f"No hay snapshots en '{directorio}'")
+        modelo.rollback(snapshot_id if snapshot_id is not None else historial[-1]['id'])
+        modelo.historial = historial
+        return modelo
+
+    def _leer_historial(self):
+        ruta = os.path.join(self.directorio, ARCHIVO_HISTORIAL)
+        if not os.path.exists(ruta):
+            return []
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _escribir_historial(self):
+        ruta = os.path.join(self.directorio, ARCHIVO_HISTORIAL)
+        with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.historial, f, ensure_ascii=False, indent=2)
+        os.replace(ruta + '.tmp', ruta)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Actualiza el modelo de categoría con archivos de reportes nuevos')
+    parser.add_argument('archivos', nargs='*', default=['dataset.csv'], help='Archivos CSV de reportes diarios')
+    parser.add_argument('--snapshots', default=DIRECTORIO_SNAPSHOTS)
+    parser.add_argument('--tipo', choices=['naive_bayes', 'sgd'], default='naive_bayes')
+    parser.add_argument('--rollback', type=int, default=None, help='Restaurar el snapshot indicado y salir')
+    args = parser.parse_args()
+
+    try:
+        modelo = ModeloIncremental.cargar(args.snapshots)
+        print(f"[OK] Modelo restaurado del snapshot {modelo.historial[-1]['id']} "
+              f"({modelo.reportes_vistos:,} reportes vistos)")
+    except FileNotFoundError:
+        modelo = ModeloIncremental(args.snapshots, tipo=args.tipo)
+        print("[OK] Modelo incremental nuevo")
+
+    if args.rollback is not None:
+        entrada = modelo.rollback(args.rollback)
+        nuevo = modelo.guardar_snapshot(f"rollback a {args.rollback}")
+        print(f"[OK] Rollback al snapshot {entrada['id']} ({entrada['creado']}); nuevo snapshot {nuevo}")
+    else:
+        for archivo in args.archivos:
+            inicio = time.perf_counter()
+            df_lote, _ = cargar_datos_limpios(archivo)
+            # Evaluación antes de actualizar: precisión sobre datos no vistos
+            if modelo.reportes_vistos:
+                print(f"     Precisión sobre {archivo} antes de actualizar: {modelo.precision(df_lote)*100:.2f}%")
+            snapshot = modelo.actualizar(df_lote, etiqueta=os.path.basename(archivo))
+            duracion = time.perf_counter() - inicio
+            print(f"[OK] {archivo}: {len(df_lote):,} reportes en {duracion:.2f} s -> snapshot {snapshot}")
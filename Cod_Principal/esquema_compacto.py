@@ -0,0 +1,114 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from limpieza import COLUMNAS_SI_NO, MAPA_SI_NO
+
+# ============================================
+# ESQUEMA COMPACTO DE LA TABLA DE REPORTES
+# ============================================
+
+# Pocas categorías distintas: se guardan como códigos enteros sobre un diccionario
+COLUMNAS_CATEGORICAS = ['Nombre', 'Género', 'Ciudad', 'Categoría del problema', 'Nivel de urgencia']
+# Indicadores 0/1 de origen; las etiquetas "Si"/"No" solo se generan para mostrar
+COLUMNAS_BANDERA = list(COLUMNAS_SI_NO.values())
+# Rango de Edad representable en UInt8; fuera de él la edad se considera faltante
+EDAD_MAXIMA = np.iinfo(np.uint8).max
+
+
+def compactar(df_clean):
+    """Tabla limpia con tipos compactos y sin las columnas "Si"/"No" derivadas
+
+    - Columnas de texto repetitivo: category (códigos int8/int16 sobre un diccionario)
+    - Comentario: category, es decir, códigos sobre un pool compartido de textos únicos
+    - Indicadores 0/1: boolean (1 byte + máscara de faltantes)
+    - Edad: UInt8 en años enteros (la mediana de relleno se redondea); fuera de 0..255, faltante
+    - Año: Int16, Mes: Int8 (nulables: limpieza deja NaT en las fechas inválidas), ID: uint32
+    """
+    columnas = {}
+    for columna in df_clean.columns:
+        serie = df_clean[columna]
+        if columna in COLUMNAS_SI_NO:
+            continue
+        if columna in COLUMNAS_CATEGORICAS or columna == 'Comentario':
+            serie = serie.astype('category')
+        elif columna in COLUMNAS_BANDERA:
+            # Un indicador inválido queda faltante (astype(bool) lo convertiría en True)
+            serie = serie.astype('boolean')
+        elif columna == 'Edad':
+            # Los valores fuera de rango se marcan faltantes en lugar de dar la vuelta al convertir
+            edad = serie.round()
+            serie = edad.where(edad.between(0, EDAD_MAXIMA)).astype('UInt8')
+        elif columna == 'ID':
+            serie = serie.astype(np.uint32)
+        elif columna == 'Año':
+            serie = serie.astype('Int16')
+        elif columna == 'Mes':
+            serie = serie.astype('Int8')
+        columnas[columna] = serie
+    return pd.DataFrame(columnas, index=df_clean.index)
+
+
+def etiquetas_si_no(df_compacto):
+    """Copia para mostrar: agrega Tiene_Internet, Atencion_Gobierno y Es_Zona_Rural como "Si"/"No" """
+    vista = df_compacto.copy()
+    tipo = pd.CategoricalDtype(list(MAPA_SI_NO.values()))
+    for columna, origen in COLUMNAS_SI_NO.items():
+        codigos = vista[origen].astype('Int8').fillna(-1).to_numpy(dtype=np.int8)
+        vista[columna] = pd.Categorical.from_codes(codigos, dtype=tipo)
+    return vista
+
+
+def concatenar_compactos(bloques):
+    """Une bloques compactos conservando las columnas category (pd.concat las volvería object)"""
+    bloques = list(bloques)
+    if not bloques:
+        return pd.DataFrame()
+    columnas = {}
+    for columna in bloques[0].columns:
+        if isinstance(bloques[0][columna].dtype, pd.CategoricalDtype):
+            columnas[columna] = union_categoricals([b[columna] for b in bloques])
+        else:
+            # pd.concat conserva los tipos nulables (to_numpy los volvería object)
+            columnas[columna] = pd.concat([b[columna] for b in bloques], ignore_index=True)
+    return pd.DataFrame(columnas)
+
+
+def leer_compacto(ruta='dataset.csv', tamano_bloque=None):
+    """Lee, limpia y compacta el archivo por bloques: la tabla ancha nunca está completa en memoria"""
+    from ingesta_streaming import TAMANO_BLOQUE, leer_bloques_limpios
+    return concatenar_compactos(compactar(bloque)
+                                for bloque in leer_bloques_limpios(ruta, tamano_bloque or TAMANO_BLOQUE))
+
+
+def reporte_memoria(df_antes, df_despues):
+    """Bytes por columna antes y después de compactar (memoria profunda, incluye los textos)"""
+    antes = df_antes.memory_usage(deep=True, index=False)
+    despues = df_despues.memory_usage(deep=True, index=False)
+    reporte = pd.DataFrame({'antes_bytes': antes, 'despues_bytes': despues}).fillna(0).astype(np.int64)
+    reporte.loc['TOTAL'] = reporte.sum()
+    reporte['reduccion'] = 1 - reporte['despues_bytes'] / reporte['antes_bytes']
+    return reporte
+
+
+if __name__ == "__main__":
+    from limpieza import cargar_datos_limpios
+
+    parser = argparse.ArgumentParser(description='Memoria de la tabla de reportes con el esquema compacto')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--reportes-objetivo', type=int, default=50_000_000)
+    args = parser.parse_args()
+
+    df_clean, _ = cargar_datos_limpios(args.archivo)
+    compacto = compactar(df_clean)
+    reporte = reporte_memoria(df_clean, compacto)
+    print(reporte.to_string(formatters={'reduccion': '{:.1%}'.format}))
+
+    # El pool de comentarios se paga una vez; el resto crece con cada reporte
+    pool = compacto['Comentario'].cat.categories.to_series().memory_usage(deep=True)
+    por_reporte = (reporte.loc['TOTAL', 'despues_bytes'] - pool) / len(compacto)
+    print(f"\n[OK] {por_reporte:.1f} bytes por reporte (antes {reporte.loc['TOTAL', 'antes_bytes'] / len(df_clean):.1f})")
+    print(f"[OK] Estimado para {args.reportes_objetivo:,} reportes: "
+          f"{(por_reporte * args.reportes_objetivo + pool) / 2**30:.2f} GiB")
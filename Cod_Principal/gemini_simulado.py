@@ -0,0 +1,226 @@
+import heapq
+from collections import deque
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# SIMULACIÓN AVANZADA DE GEMINI
+# ============================================
+
+# Orden fijo de categorías: define las columnas de las matrices de puntuación
+CATEGORIAS = ['Salud', 'Educación', 'Seguridad', 'Medio Ambiente']
+CATEGORIA_POR_DEFECTO = 'Seguridad'
+
+# Palabras clave más específicas y contextuales
+PALABRAS_CLAVE = {
+    'Salud': ['médico', 'hospital', 'salud', 'enfermo', 'medicina', 'clínica', 'doctor', 'paciente', 'ambulancia', 'emergencia médica', 'farmacia', 'medicamento'],
+    'Educación': ['escuela', 'profesor', 'estudiante', 'educación', 'colegio', 'universidad', 'maestro', 'aprender', 'aula', 'clase', 'estudio', 'académico'],
+    'Seguridad': ['delincuencia', 'robo', 'policía', 'seguridad', 'crimen', 'violencia', 'peligroso', 'inseguro', 'asalto', 'hurto', 'patrullaje', 'vigilancia'],
+    'Medio Ambiente': ['basura', 'contaminación', 'río', 'aire', 'limpio', 'reciclaje', 'verde', 'ecológico', 'residuos', 'desechos', 'polución', 'sostenible']
+}
+
+# Peso diferente según la importancia de la palabra
+PALABRAS_PESO_ALTO = ['médico', 'hospital', 'escuela', 'profesor', 'delincuencia', 'policía', 'basura', 'contaminación']
+PALABRAS_PESO_MEDIO = ['salud', 'educación', 'seguridad', 'medio ambiente']
+
+# Frases específicas (+5 cada una)
+FRASES = {
+    'Salud': ['falta de médicos', 'centro de salud', 'atención médica', 'servicio de salud'],
+    'Educación': ['falta de profesores', 'centro educativo', 'infraestructura educativa', 'servicio educativo'],
+    'Seguridad': ['falta de seguridad', 'patrullaje', 'vigilancia', 'servicio de seguridad'],
+    'Medio Ambiente': ['recolección de basura', 'limpieza', 'gestión de residuos', 'servicio ambiental']
+}
+PESO_FRASE = 5
+
+# Palabras que marcan las oraciones importantes en los resúmenes
+PALABRAS_RESUMEN = ['problema', 'falta', 'necesitamos', 'requerimos', 'urgente', 'importante']
+N_ORACIONES_RESUMEN = 2
+
+
+class AutomataPalabrasClave:
+    """Autómata Aho-Corasick que encuentra todos los patrones en una sola pasada"""
+
+    def __init__(self, pesos_por_patron, n_columnas):
+        # pesos_por_patron: {patron: {columna: peso}}
+        self.patrones = list(pesos_por_patron)
+        self.pesos = np.zeros((len(self.patrones), n_columnas), dtype=np.int32)
+        for i, patron in enumerate(self.patrones):
+            for columna, peso in pesos_por_patron[patron].items():
+                self.pesos[i, columna] += peso
+        self._transiciones, self._salidas = self._compilar(self.patrones)
+
+    @staticmethod
+    def _compilar(patrones):
+        """Construye el trie, los enlaces de fallo y la tabla de transiciones completa"""
+        transiciones = [{}]
+        salidas = [()]
+        for id_patron, patron in enumerate(patrones):
+            estado = 0
+            for caracter in patron:
+                siguiente = transiciones[estado].get(caracter)
+                if siguiente is None:
+                    siguiente = len(transiciones)
+                    transiciones[estado][caracter] = siguiente
+                    transiciones.append({})
+                    salidas.append(())
+                estado = siguiente
+            salidas[estado] = salidas[estado] + (id_patron,)
+
+        # Recorrido en anchura: cada estado hereda las transiciones y salidas
+        # de su enlace de fallo, así el escaneo nunca retrocede
+        trie = [dict(t) for t in transiciones]
+        fallo = [0] * len(transiciones)
+        cola = deque(trie[0].values())
+        for estado in cola:
+            transiciones[estado] = {**transiciones[0], **trie[estado]}
+        while cola:
+            estado = cola.popleft()
+            for caracter, hijo in trie[estado].items():
+                fallo[hijo] = transiciones[fallo[estado]].get(caracter, 0)
+                salidas[hijo] = salidas[hijo] + salidas[fallo[hijo]]
+                transiciones[hijo] = {**transiciones[fallo[hijo]], **trie[hijo]}
+                cola.append(hijo)
+        return transiciones, salidas
+
+    def buscar(self, texto):
+        """Devuelve el conjunto de índices de patrones presentes en el texto"""
+        transiciones = self._transiciones
+        salidas = self._salidas
+        encontrados = set()
+        estado = 0
+        for caracter in texto:
+            estado = transiciones[estado].get(caracter, 0)
+            if salidas[estado]:
+                encontrados.update(salidas[estado])
+        return encontrados
+
+    def puntuar(self, texto):
+        """Suma los pesos de cada patrón encontrado (una vez por patrón)"""
+        encontrados = self.buscar(texto)
+        if not encontrados:
+            return np.zeros(self.pesos.shape[1], dtype=np.int32)
+        return self.pesos[list(encontrados)].sum(axis=0)
+
+    def puntuar_lote(self, textos):
+        """Matriz (n_textos, n_columnas) de puntuaciones para un iterable de textos"""
+        filas, columnas = [], []
+        n = 0
+        for n, texto in enumerate(textos, 1):
+            encontrados = self.buscar(texto)
+            filas.extend([n - 1] * len(encontrados))
+            columnas.extend(encontrados)
+        puntajes = np.zeros((n, self.pesos.shape[1]), dtype=np.int32)
+        if filas:
+            np.add.at(puntajes, np.asarray(filas), self.pesos[np.asarray(columnas)])
+        return puntajes
+
+
+def _pesos_clasificacion():
+    """Tabla patrón -> {categoría: peso} equivalente a las reglas de palabras y frases"""
+    pesos = {}
+    for i, categoria in enumerate(CATEGORIAS):
+        for palabra in PALABRAS_CLAVE[categoria]:
+            if palabra in PALABRAS_PESO_ALTO:
+                peso = 3
+            elif palabra in PALABRAS_PESO_MEDIO:
+                peso = 2
+            else:
+                peso = 1
+            pesos.setdefault(palabra, {}).setdefault(i, 0)
+            pesos[palabra][i] += peso
+        for frase in FRASES[categoria]:
+            pesos.setdefault(frase, {}).setdefault(i, 0)
+            pesos[frase][i] += PESO_FRASE
+    return pesos
+
+
+class SegmentadorOraciones:
+    """Divide textos en oraciones sin construir listas intermedias"""
+
+    def __init__(self, separador='.', longitud_minima=10):
+        self.separador = separador
+        self.longitud_minima = longitud_minima
+
+    def oraciones(self, texto):
+        """Genera las oraciones (ya recortadas) más largas que la longitud mínima"""
+        inicio = 0
+        while inicio <= len(texto):
+            fin = texto.find(self.separador, inicio)
+            if fin == -1:
+                fin = len(texto)
+            oracion = texto[inicio:fin].strip()
+            if len(oracion) > self.longitud_minima:  # Filtrar oraciones muy cortas
+                yield oracion
+            inicio = fin + len(self.separador)
+
+
+class GeminiSimulation:
+    _automata = None
+    _automata_resumen = None
+
+    def __init__(self):
+        self.name = "Google Gemini (Simulado)"
+        # Los autómatas se compilan una sola vez y se comparten entre instancias
+        if GeminiSimulation._automata is None:
+            GeminiSimulation._automata = AutomataPalabrasClave(_pesos_clasificacion(), len(CATEGORIAS))
+            GeminiSimulation._automata_resumen = AutomataPalabrasClave(
+                {palabra: {0: 1} for palabra in PALABRAS_RESUMEN}, 1
+            )
+        self._segmentador = SegmentadorOraciones()
+        print("[OK] Gemini Simulation configurado correctamente")
+
+    def classify_with_gemini(self, text, categories=None):
+        """Simula clasificación con Gemini usando análisis semántico avanzado"""
+        puntajes = self._automata.puntuar(text.lower())
+        # Retornar la categoría con mayor puntuación
+        if puntajes.max() > 0:
+            return CATEGORIAS[int(puntajes.argmax())]
+        return CATEGORIA_POR_DEFECTO
+
+    def classify_batch(self, comentarios):
+        """Clasifica una Serie de comentarios; retorna (etiquetas, puntajes por categoría)"""
+        textos = (t.lower() if isinstance(t, str) else '' for t in comentarios)
+        puntajes = self._automata.puntuar_lote(textos)
+        etiquetas = np.asarray(CATEGORIAS, dtype=object)[puntajes.argmax(axis=1)]
+        etiquetas[puntajes.max(axis=1) == 0] = CATEGORIA_POR_DEFECTO
+        return pd.Series(etiquetas, index=comentarios.index, name='Categoria_Gemini'), puntajes
+
+    def summarize_with_gemini(self, text, max_length=100):
+        """Simula resumen con Gemini usando extracción inteligente"""
+        return self._resumir(text, max_length, N_ORACIONES_RESUMEN)
+
+    def summarize_batch(self, comentarios, max_length=100, n_oraciones=N_ORACIONES_RESUMEN):
+        """Genera resúmenes de forma perezosa para cualquier iterable de comentarios"""
+        for texto in comentarios:
+            yield self._resumir(texto, max_length, n_oraciones) if isinstance(texto, str) else ''
+
+    def _resumir(self, text, max_length, n_oraciones):
+        """Selecciona las oraciones más importantes sin ordenar todo el texto"""
+        automata = self._automata_resumen
+        # Puntuación basada en palabras clave (una vez por palabra); nlargest
+        # conserva el orden original en los empates, igual que un sort estable
+        mejores = heapq.nlargest(
+            n_oraciones,
+            ((len(automata.buscar(oracion.lower())), oracion)
+             for oracion in self._segmentador.oraciones(text)),
+            key=itemgetter(0)
+        )
+
+        # Construir resumen
+        summary = ""
+        for _, sentence in mejores:
+            if len(summary + sentence) < max_length:
+                if summary:
+                    summary += ". " + sentence
+                else:
+                    summary = sentence
+            else:
+                break
+
+        # Si no hay resumen, tomar el inicio del texto
+        if not summary:
+            summary = text[:max_length]
+
+        return summary
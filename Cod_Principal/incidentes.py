@@ -0,0 +1,190 @@
+import argparse
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from deduplicacion import factorizar
+
+# ============================================
+# AGRUPACIÓN DE REPORTES CASI DUPLICADOS EN INCIDENTES
+# ============================================
+
+# Primo de Mersenne 2^31 - 1: (a * h + b) cabe en uint64 sin desbordarse
+PRIMO_MINHASH = (1 << 31) - 1
+NUM_PERMUTACIONES = 64
+# 16 bandas de 4 filas: los pares con Jaccard ~0.5 o más coinciden en alguna banda
+BANDAS = 16
+LONGITUD_SHINGLE = 5
+DIAS_VENTANA = 7
+UMBRAL_SIMILITUD = 0.6
+# Textos distintos de una cubeta contra los que se compara cada texto nuevo (acota el trabajo cuadrático)
+TOPE_CUBETA = 200
+
+
+def shingles(texto, k=LONGITUD_SHINGLE):
+    """Hashes de los k-gramas de caracteres del texto (espacios internos colapsados)"""
+    texto = ' '.join(texto.split())
+    if len(texto) <= k:
+        fragmentos = {texto}
+    else:
+        fragmentos = {texto[i:i + k] for i in range(len(texto) - k + 1)}
+    return np.fromiter((zlib.crc32(f.encode('utf-8')) for f in fragmentos), dtype=np.uint64)
+
+
+def firmas_minhash(textos, num_permutaciones=NUM_PERMUTACIONES, k=LONGITUD_SHINGLE, semilla=42):
+    """Firma MinHash (textos x num_permutaciones) con permutaciones (a * h + b) mod primo"""
+    generador = np.random.default_rng(semilla)
+    a = generador.integers(1, PRIMO_MINHASH, num_permutaciones, dtype=np.uint64)
+    b = generador.integers(0, PRIMO_MINHASH, num_permutaciones, dtype=np.uint64)
+    firmas = np.empty((len(textos), num_permutaciones), dtype=np.uint32)
+    for i, texto in enumerate(textos):
+        hashes = shingles(texto, k) % np.uint64(PRIMO_MINHASH)
+        firmas[i] = ((hashes[:, None] * a + b) % np.uint64(PRIMO_MINHASH)).min(axis=0)
+    return firmas
+
+
+def _hashes_bandas(firmas, bandas):
+    """Un hash uint64 por texto y banda (textos x bandas)"""
+    filas = firmas.shape[1] // bandas
+    return np.column_stack([
+        pd.util.hash_pandas_object(pd.DataFrame(firmas[:, i * filas:(i + 1) * filas]), index=False).to_numpy()
+        for i in range(bandas)
+    ])
+
+
+def _pares_cubetas(llave, tope_cubeta):
+    """Posiciones (anterior, posterior) de los pares candidatos en filas ordenadas por cubeta
+
+    Cada fila se empareja con todas las anteriores de su cubeta, o solo con las primeras
+    tope_cubeta si la cubeta es más grande (esas hacen de representantes).
+    """
+    if len(llave) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    nueva = np.ones(len(llave), dtype=bool)
+    nueva[1:] = (llave[1:] != llave[:-1]).any(axis=1)
+    inicio = np.maximum.accumulate(np.where(nueva, np.arange(len(llave)), 0))
+    anteriores = np.minimum(np.arange(len(llave)) - inicio, tope_cubeta)
+    posterior = np.repeat(np.arange(len(llave)), anteriores)
+    # Desplazamiento 0..anteriores-1 de cada par dentro de su cubeta
+    desplazamiento = np.arange(len(posterior)) - np.repeat(np.cumsum(anteriores) - anteriores, anteriores)
+    return inicio[posterior] + desplazamiento, posterior
+
+
+def agrupar_incidentes(df, dias_ventana=DIAS_VENTANA, umbral=UMBRAL_SIMILITUD,
+                       num_permutaciones=NUM_PERMUTACIONES, bandas=BANDAS, tope_cubeta=TOPE_CUBETA,
+                       col_comentario='Comentario', col_ciudad='Ciudad', col_fecha='Fecha del reporte'):
+    """Identificador de incidente por reporte (Serie 'incidente' con el índice de df)
+
+    Dos reportes son del mismo incidente si son de la misma ciudad, caen en la misma ventana
+    de dias_ventana días y sus comentarios son iguales o casi iguales (Jaccard estimado por
+    MinHash >= umbral). Las ventanas son fijas: reportes a ambos lados de un corte quedan en
+    incidentes distintos. Los reportes sin comentario, ciudad o fecha son incidentes propios.
+
+    MinHash se calcula una vez por texto único y LSH solo compara textos distintos que
+    comparten ciudad, ventana y banda, nunca todos los pares de reportes. Dentro de una
+    cubeta se verifican todos los pares; en cubetas de más de tope_cubeta textos, cada
+    texto se compara con los primeros tope_cubeta.
+    """
+    codigos, unicos = factorizar(df[col_comentario])
+    firmas = firmas_minhash(unicos, num_permutaciones)
+    ciudad, _ = pd.factorize(df[col_ciudad])
+    fechas = pd.to_datetime(df[col_fecha])
+    ventana = fechas.to_numpy().astype('datetime64[D]').astype(np.int64) // dias_ventana
+    validos = ((ciudad >= 0) & fechas.notna().to_numpy()
+               & (df[col_comentario].to_numpy() != 'Sin comentario'))
+
+    # Nodo = (ciudad, ventana, texto): los reportes idénticos quedan unidos sin compararse
+    claves = pd.DataFrame({'ciudad': ciudad[validos], 'ventana': ventana[validos],
+                           'codigo': codigos[validos]})
+    nodo_por_fila = claves.groupby(['ciudad', 'ventana', 'codigo'], sort=False).ngroup().to_numpy()
+    # ngroup(sort=False) numera en orden de aparición, el mismo orden de drop_duplicates
+    nodos = claves.drop_duplicates(ignore_index=True)
+
+    # LSH: cubetas (ciudad, ventana, banda, hash de banda); cada nodo se compara con los anteriores de su cubeta
+    hashes = _hashes_bandas(firmas, bandas)
+    cubetas = pd.DataFrame({
+        'ciudad': np.tile(nodos['ciudad'].to_numpy(), bandas),
+        'ventana': np.tile(nodos['ventana'].to_numpy(), bandas),
+        'banda': np.repeat(np.arange(bandas), len(nodos)),
+        'hash': hashes[np.tile(nodos['codigo'].to_numpy(), bandas), np.repeat(np.arange(bandas), len(nodos))],
+        'nodo': np.tile(np.arange(len(nodos)), bandas)
+    }).sort_values(['ciudad', 'ventana', 'banda', 'hash', 'nodo'], kind='stable')
+    llave = cubetas[['ciudad', 'ventana', 'banda', 'hash']].to_numpy()
+    nodo = cubetas['nodo'].to_numpy()
+    origen, destino = _pares_cubetas(llave, tope_cubeta)
+    origen, destino = nodo[origen], nodo[destino]
+
+    # Verificación de candidatos con la similitud estimada, una vez por par de textos
+    codigo_nodo = nodos['codigo'].to_numpy(dtype=np.int64)
+    menor = np.minimum(codigo_nodo[origen], codigo_nodo[destino])
+    mayor = np.maximum(codigo_nodo[origen], codigo_nodo[destino])
+    par, pares_unicos = pd.factorize(menor * len(unicos) + mayor)
+    similitud = (firmas[pares_unicos // len(unicos)] == firmas[pares_unicos % len(unicos)]).mean(axis=1)
+    enlace = similitud[par] >= umbral
+
+    grafo = coo_matrix((np.ones(enlace.sum(), dtype=np.int8), (origen[enlace], destino[enlace])),
+                       shape=(len(nodos), len(nodos)))
+    n_componentes, componente = connected_components(grafo, directed=False)
+
+    etiquetas = np.empty(len(df), dtype=np.int64)
+    etiquetas[validos] = componente[nodo_por_fila]
+    etiquetas[~validos] = n_componentes + np.arange((~validos).sum())
+    # Numeración por orden de aparición del primer reporte de cada incidente
+    return pd.Series(pd.factorize(etiquetas)[0], index=df.index, name='incidente')
+
+
+def resumen_incidentes(df, incidentes):
+    """Una fila por incidente: ciudad, comentario y categoría del primer reporte, urgencia y fechas"""
+    grupos = df.assign(incidente=incidentes.to_numpy()).groupby('incidente', sort=True)
+    resumen = grupos.agg(**{
+        'reportes': ('Comentario', 'size'),
+        'Ciudad': ('Ciudad', 'first'),
+        'Comentario': ('Comentario', 'first'),
+        'Categoría del problema': ('Categoría del problema', 'first'),
+        'fecha_inicio': ('Fecha del reporte', 'min'),
+        'fecha_fin': ('Fecha del reporte', 'max')
+    })
+    # Un incidente es urgente si alguno de sus reportes lo es
+    urgente = (df['Nivel de urgencia'] == 'Urgente').groupby(incidentes.to_numpy()).any()
+    resumen['Nivel de urgencia'] = np.where(urgente.reindex(resumen.index).to_numpy(), 'Urgente', 'No urgente')
+    return resumen
+
+
+def planificar_incidentes(df, incidentes, generador=None):
+    """Prioridad, recursos y presupuesto una vez por incidente en lugar de por reporte"""
+    if generador is None:
+        from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+        generador = OSBRASolutionsGenerator()
+    resumen = resumen_incidentes(df, incidentes)
+    return resumen.join(generador.analizar_lote(resumen))
+
+
+if __name__ == "__main__":
+    from limpieza import cargar_datos_limpios
+
+    parser = argparse.ArgumentParser(description='Agrupa reportes casi duplicados en incidentes')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--dias-ventana', type=int, default=DIAS_VENTANA)
+    parser.add_argument('--umbral', type=float, default=UMBRAL_SIMILITUD)
+    parser.add_argument('--salida', default=None, help='CSV con el incidente de cada reporte')
+    args = parser.parse_args()
+
+    df_clean, _ = cargar_datos_limpios(args.archivo)
+    inicio = time.perf_counter()
+    incidentes = agrupar_incidentes(df_clean, args.dias_ventana, args.umbral)
+    segundos = time.perf_counter() - inicio
+    print(f"[OK] {len(df_clean):,} reportes agrupados en {incidentes.nunique():,} incidentes "
+          f"en {segundos*1000:.0f} ms")
+
+    planes = planificar_incidentes(df_clean, incidentes)
+    print("\nIncidentes con más reportes:")
+    print(planes.nlargest(5, 'reportes')[['reportes', 'Ciudad', 'Comentario', 'fecha_inicio', 'prioridad_nivel']])
+    print(f"\n[OK] Presupuesto por incidente: ${planes['presupuesto'].sum():,.0f} COP")
+
+    if args.salida:
+        df_clean.assign(incidente=incidentes).to_csv(args.salida, index=False, encoding='utf-8')
+        print(f"[OK] Incidentes guardados: {args.salida}")
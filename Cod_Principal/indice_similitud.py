@@ -0,0 +1,384 @@
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from deduplicacion import factorizar
+
+# ============================================
+# ÍNDICE DE REPORTES SIMILARES (LISTAS INVERTIDAS TF-IDF)
+# ============================================
+
+# Incrementar cuando cambien los arreglos guardados: invalida los índices anteriores
+VERSION_INDICE = 2
+DIRECTORIO_INDICE = 'indice_similitud'
+ARCHIVO_METADATOS = 'indice.json'
+# Fecha faltante: queda fuera de cualquier filtro de fechas
+SIN_FECHA = np.iinfo(np.int32).min
+# Entradas leídas de cada lista invertida en la primera pasada de una consulta (se cuadruplica si no alcanza)
+PREFIJO_LISTAS = 64
+# Presupuesto por lista de una consulta no exacta: más allá solo quedan pesos bajos del término
+MAXIMO_LISTA = 256
+
+# Listas invertidas (CSC sobre los vectores TF-IDF distintos, cada lista de mayor a menor peso),
+# vectores (CSR) y columnas por fila, ordenadas por vector
+ARREGLOS = ('datos', 'vectores_indice', 'terminos_ptr', 'vector_datos', 'vector_terminos', 'vector_ptr',
+            'filas_ptr', 'ids', 'ciudad', 'categoria', 'fecha', 'texto', 'textos_bytes', 'textos_ptr')
+
+
+def _dias(fechas):
+    """Días desde 1970 como int32; SIN_FECHA para las fechas faltantes"""
+    fechas = pd.to_datetime(pd.Series(fechas))
+    dias = fechas.to_numpy().astype('datetime64[D]').astype(np.int64)
+    return np.where(fechas.isna().to_numpy(), SIN_FECHA, dias).astype(np.int32)
+
+
+def _rangos(inicios, largos):
+    """Concatenación de los rangos [inicio, inicio + largo), sin recorrerlos uno por uno"""
+    largos = np.asarray(largos, dtype=np.int64)
+    return np.repeat(np.asarray(inicios, dtype=np.int64) - np.cumsum(largos) + largos, largos) + np.arange(largos.sum())
+
+
+class IndiceSimilitud:
+    """Reportes pasados más parecidos a un comentario nuevo, con filtros por ciudad, categoría y fecha
+
+    Cada texto único se vectoriza una vez (TF-IDF normalizado L2, como en la sección 6) y cada
+    vector distinto se guarda una vez en listas invertidas ordenadas por peso. Una consulta lee
+    solo el comienzo de la lista de cada término, puntúa esos candidatos con su vector completo y
+    poda con MaxScore: las listas cuyo resto no puede alcanzar el k-ésimo resultado no se leen.
+    Los términos comunes ("de", "la") tienen pesos bajos, así que casi nunca se recorren.
+    """
+
+    def __init__(self, vectorizer, arreglos, metadatos):
+        self.vectorizer = vectorizer
+        self.arreglos = arreglos
+        self.metadatos = metadatos
+        self._codigo_ciudad = {c: i for i, c in enumerate(metadatos['ciudades'])}
+        self._codigo_categoria = {c: i for i, c in enumerate(metadatos['categorias'])}
+        # vectorizer.transform cuesta casi 1 ms por llamada; una consulta solo necesita el analizador y el IDF
+        self._analizador = vectorizer.build_analyzer()
+        self._idf = vectorizer.idf_ if vectorizer.use_idf else None
+
+    @classmethod
+    def construir(cls, df, vectorizer, col_comentario='Comentario', col_ciudad='Ciudad',
+                  col_categoria='Categoría del problema', col_fecha='Fecha del reporte', col_id='ID'):
+        codigos, unicos = factorizar(df[col_comentario])
+        X = vectorizer.transform(unicos).tocsr()
+        X.sort_indices()
+        # Textos distintos con el mismo vector TF-IDF (difieren en palabras fuera del vocabulario,
+        # como números de calle) comparten una sola entrada en las listas
+        firmas = [X.indices[a:b].tobytes() + X.data[a:b].tobytes() for a, b in zip(X.indptr[:-1], X.indptr[1:])]
+        vector_de_texto = pd.factorize(pd.Series(firmas, dtype=object))[0]
+        _, primeros = np.unique(vector_de_texto, return_index=True)
+        vectores = X[primeros]
+        listas = vectores.tocsc()
+        # Cada lista invertida de mayor a menor peso (a igual peso, por número de vector)
+        termino = np.repeat(np.arange(listas.shape[1]), np.diff(listas.indptr))
+        orden_listas = np.lexsort((listas.indices, -listas.data, termino))
+
+        # Texto original de la primera fila de cada texto único, en un solo buffer UTF-8
+        _, primeras = np.unique(codigos, return_index=True)
+        codificados = [str(t).encode('utf-8') for t in df[col_comentario].to_numpy()[primeras]]
+        textos_ptr = np.zeros(len(codificados) + 1, dtype=np.int64)
+        textos_ptr[1:] = np.cumsum([len(t) for t in codificados])
+
+        ciudad, ciudades = pd.factorize(df[col_ciudad])
+        categoria, categorias = pd.factorize(df[col_categoria])
+        fecha = _dias(df[col_fecha])
+        # Filas agrupadas por vector y, dentro de cada vector, de la más reciente a la más antigua
+        vector = vector_de_texto[codigos]
+        orden = np.lexsort((-fecha.astype(np.int64), vector))
+        filas_ptr = np.zeros(len(primeros) + 1, dtype=np.int64)
+        filas_ptr[1:] = np.cumsum(np.bincount(vector, minlength=len(primeros)))
+
+        arreglos = {
+            'datos': listas.data[orden_listas].astype(np.float32),
+            'vectores_indice': listas.indices[orden_listas].astype(np.int32),
+            'terminos_ptr': listas.indptr.astype(np.int64),
+            'vector_datos': vectores.data.astype(np.float32),
+            'vector_terminos': vectores.indices.astype(np.int32),
+            'vector_ptr': vectores.indptr.astype(np.int64),
+            'filas_ptr': filas_ptr,
+            'ids': df[col_id].to_numpy(dtype=np.int64)[orden],
+            'ciudad': ciudad.astype(np.int32)[orden],
+            'categoria': categoria.astype(np.int32)[orden],
+            'fecha': fecha[orden],
+            'texto': codigos.astype(np.int32)[orden],
+            'textos_bytes': np.frombuffer(b''.join(codificados), dtype=np.uint8),
+            'textos_ptr': textos_ptr
+        }
+        metadatos = {'filas': len(df), 'textos': len(unicos), 'vectores': len(primeros), 'terminos': X.shape[1],
+                     'ciudades': [str(c) for c in ciudades], 'categorias': [str(c) for c in categorias]}
+        return cls(vectorizer, arreglos, metadatos)
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+
+    def _vectorizar(self, comentario):
+        """Términos y pesos del comentario, igual que vectorizer.transform([comentario])"""
+        vocabulario = self.vectorizer.vocabulary_
+        indices = np.fromiter((vocabulario[t] for t in self._analizador(comentario) if t in vocabulario),
+                              dtype=np.int64)
+        terminos, conteos = np.unique(indices, return_counts=True)
+        pesos = conteos.astype(np.float64)
+        if self.vectorizer.binary:
+            pesos[:] = 1.0
+        elif self.vectorizer.sublinear_tf:
+            pesos = np.log(pesos) + 1
+        if self._idf is not None:
+            pesos *= self._idf[terminos]
+        if self.vectorizer.norm == 'l2' and len(pesos):
+            pesos /= np.sqrt((pesos ** 2).sum())
+        elif self.vectorizer.norm == 'l1' and len(pesos):
+            pesos /= np.abs(pesos).sum()
+        return terminos, pesos
+
+    def _leer_listas(self, inicios, fines):
+        """Vectores (sin repetir) de los tramos [inicio, fin) de las listas invertidas"""
+        return np.unique(self.arreglos['vectores_indice'][_rangos(inicios, fines - inicios)])
+
+    def _puntajes(self, vectores, terminos, pesos_consulta):
+        """Similitud coseno exacta de cada vector con la consulta"""
+        ptr = self.arreglos['vector_ptr']
+        largo = ptr[vectores + 1] - ptr[vectores]
+        posiciones = _rangos(ptr[vectores], largo)
+        consulta = np.zeros(self.metadatos['terminos'])
+        consulta[terminos] = pesos_consulta
+        pesos = self.arreglos['vector_datos'][posiciones] * consulta[self.arreglos['vector_terminos'][posiciones]]
+        return np.bincount(np.repeat(np.arange(len(vectores)), largo), weights=pesos, minlength=len(vectores))
+
+    def _mascara_filtros(self, posiciones, filtros):
+        """Cuáles de las filas en posiciones cumplen los filtros (None si no hay filtros)"""
+        mascara = None
+        for clave, columna, comparar in (('ciudad', 'ciudad', np.equal), ('categoria', 'categoria', np.equal),
+                                         ('desde', 'fecha', np.greater_equal), ('hasta', 'fecha', np.less_equal)):
+            if filtros.get(clave) is None:
+                continue
+            parcial = comparar(self.arreglos[columna][posiciones], filtros[clave])
+            if columna == 'fecha':
+                # SIN_FECHA es el menor int32: sin esta máscara pasaría cualquier filtro 'hasta'
+                parcial &= self.arreglos['fecha'][posiciones] != SIN_FECHA
+            mascara = parcial if mascara is None else mascara & parcial
+        return mascara
+
+    def top_k(self, comentario, k=5, filtros=None, exacto=False):
+        """Los k reportes más parecidos al comentario
+
+        filtros admite 'ciudad', 'categoria', 'desde' y 'hasta' (fechas inclusivas).
+        Entre reportes con el mismo vector TF-IDF se devuelven primero los más recientes.
+        Si la poda no alcanza a garantizar el resultado leyendo MAXIMO_LISTA entradas por
+        término, se devuelve el mejor encontrado entre ellas; con exacto=True se leen las
+        listas que hagan falta. resultado.attrs['exacto'] indica si el top k está garantizado.
+        """
+        filtros = dict(filtros or {})
+        for clave, codigos in (('ciudad', self._codigo_ciudad), ('categoria', self._codigo_categoria)):
+            if filtros.get(clave) is not None:
+                if filtros[clave] not in codigos:
+                    return self._resultado(np.empty(0, dtype=np.int64), np.empty(0))
+                filtros[clave] = codigos[filtros[clave]]
+        for clave in ('desde', 'hasta'):
+            if filtros.get(clave) is not None:
+                filtros[clave] = _dias([filtros[clave]])[0]
+
+        terminos, pesos_consulta = self._vectorizar(comentario)
+        if len(terminos) == 0:
+            return self._resultado(np.empty(0, dtype=np.int64), np.empty(0))
+        limite = None if exacto else MAXIMO_LISTA
+        datos, ptr = self.arreglos['datos'], self.arreglos['terminos_ptr']
+        inicio, fin = ptr[terminos], ptr[terminos + 1]
+        largo = PREFIJO_LISTAS
+        vectores, puntajes = np.empty(0, dtype=np.int32), np.empty(0)
+        while True:
+            leidos = np.minimum(fin, inicio + largo)
+            # Solo se puntúan los vectores que no se habían leído en la pasada anterior
+            nuevos = np.setdiff1d(self._leer_listas(inicio, leidos), vectores, assume_unique=True)
+            vectores = np.concatenate([vectores, nuevos])
+            puntajes = np.concatenate([puntajes, self._puntajes(nuevos, terminos, pesos_consulta)])
+            posiciones, similitudes, umbral = self._mejores(vectores, puntajes, k, filtros)
+            # MaxScore: un vector no leído pesa en cada término a lo sumo lo que la siguiente entrada de su lista.
+            # Los términos de menor cota cuya suma no llega al umbral no pueden, solos, meter un vector nuevo
+            # en el top k: basta terminar de leer las listas de los demás (los esenciales)
+            cotas = np.where(leidos < fin, pesos_consulta * datos[np.minimum(leidos, len(datos) - 1)], 0.0)
+            orden = np.argsort(cotas, kind='stable')
+            esenciales = orden[np.cumsum(cotas[orden]) >= umbral]
+            esenciales = esenciales[leidos[esenciales] < fin[esenciales]]
+            pendientes = int((fin - leidos)[esenciales].sum())
+            if pendientes == 0:
+                return self._resultado(posiciones, similitudes)
+            if pendientes <= 4 * largo * len(terminos):
+                nuevos = np.setdiff1d(self._leer_listas(leidos[esenciales], fin[esenciales]), vectores,
+                                      assume_unique=True)
+                vectores = np.concatenate([vectores, nuevos])
+                puntajes = np.concatenate([puntajes, self._puntajes(nuevos, terminos, pesos_consulta)])
+                posiciones, similitudes, _ = self._mejores(vectores, puntajes, k, filtros)
+                return self._resultado(posiciones, similitudes)
+            if limite is not None and largo >= limite:
+                return self._resultado(posiciones, similitudes, exacto=False)
+            largo *= 4
+
+    def _mejores(self, vectores, puntajes, k, filtros, bloque=256):
+        """Las k mejores filas de los vectores que cumplen los filtros, y el puntaje de la k-ésima (0 si no hay k)"""
+        # De mayor a menor puntaje; a igual puntaje, por número de vector
+        orden = np.lexsort((vectores, -puntajes))
+        vectores, puntajes = vectores[orden], puntajes[orden]
+        filas_ptr = self.arreglos['filas_ptr']
+        posiciones, similitudes, faltan = [], [], k
+        # Por bloques de vectores: uno muy repetido no obliga a revisar todas sus filas
+        for desde in range(0, len(vectores), bloque):
+            grupo = vectores[desde:desde + bloque]
+            largo = filas_ptr[grupo + 1] - filas_ptr[grupo]
+            if all(v is None for v in filtros.values()):
+                # Sin filtros basta con las primeras filas de cada vector
+                largo = np.minimum(largo, faltan)
+            filas = _rangos(filas_ptr[grupo], largo)
+            puntaje_filas = np.repeat(puntajes[desde:desde + bloque], largo)
+            mascara = self._mascara_filtros(filas, filtros)
+            if mascara is not None:
+                filas, puntaje_filas = filas[mascara], puntaje_filas[mascara]
+            posiciones.append(filas[:faltan])
+            similitudes.append(puntaje_filas[:faltan])
+            faltan -= len(posiciones[-1])
+            if faltan == 0:
+                break
+        if not posiciones:
+            return np.empty(0, dtype=np.int64), np.empty(0), 0.0
+        posiciones, similitudes = np.concatenate(posiciones), np.concatenate(similitudes)
+        return posiciones, similitudes, (similitudes[-1] if faltan == 0 else 0.0)
+
+    def _texto(self, texto):
+        ptr = self.arreglos['textos_ptr']
+        return bytes(self.arreglos['textos_bytes'][ptr[texto]:ptr[texto + 1]]).decode('utf-8')
+
+    def _resultado(self, posiciones, similitudes, exacto=True):
+        textos = self.arreglos['texto'][posiciones]
+        ciudades = np.array(self.metadatos['ciudades'] + [None], dtype=object)
+        categorias = np.array(self.metadatos['categorias'] + [None], dtype=object)
+        fechas = self.arreglos['fecha'][posiciones]
+        resultado = pd.DataFrame({
+            'ID': self.arreglos['ids'][posiciones],
+            'Comentario': [self._texto(t) for t in textos],
+            'Ciudad': ciudades[self.arreglos['ciudad'][posiciones]],
+            'Categoría del problema': categorias[self.arreglos['categoria'][posiciones]],
+            'Fecha del reporte': np.where(fechas == SIN_FECHA, np.datetime64('NaT'), fechas.astype('datetime64[D]')),
+            'similitud': similitudes
+        })
+        resultado.attrs['exacto'] = exacto
+        return resultado
+
+    # ------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------
+
+    def guardar(self, directorio=DIRECTORIO_INDICE):
+        """Escribe los arreglos en una subcarpeta nueva y después apunta indice.json a ella
+
+        El reemplazo de indice.json es atómico: un corte a mitad de la escritura deja el índice
+        anterior intacto, y quien tenga abiertos (mmap) los arreglos anteriores los sigue leyendo.
+        """
+        import joblib
+
+        os.makedirs(directorio, exist_ok=True)
+        subcarpeta = f"datos-{uuid.uuid4().hex[:12]}"
+        destino = os.path.join(directorio, subcarpeta)
+        os.makedirs(destino)
+        for nombre in ARREGLOS:
+            np.save(os.path.join(destino, f"{nombre}.npy"), self.arreglos[nombre])
+        joblib.dump(self.vectorizer, os.path.join(destino, 'vectorizer.joblib'))
+        temporal = os.path.join(directorio, ARCHIVO_METADATOS + '.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({**self.metadatos, 'version': VERSION_INDICE, 'datos': subcarpeta}, f,
+                      ensure_ascii=False, indent=2)
+        os.replace(temporal, os.path.join(directorio, ARCHIVO_METADATOS))
+        # Las versiones anteriores se borran (incluidos los archivos sueltos de la versión 1);
+        # en POSIX los mmap abiertos siguen siendo válidos
+        for nombre in os.listdir(directorio):
+            ruta = os.path.join(directorio, nombre)
+            if nombre.startswith('datos-') and nombre != subcarpeta:
+                shutil.rmtree(ruta, ignore_errors=True)
+            elif nombre.endswith('.npy') or nombre == 'vectorizer.joblib':
+                os.remove(ruta)
+        return directorio
+
+    @classmethod
+    def cargar(cls, directorio=DIRECTORIO_INDICE, mmap=True):
+        """Abre un índice guardado; con mmap=True los arreglos se leen del disco bajo demanda"""
+        import joblib
+
+        ruta = os.path.join(directorio, ARCHIVO_METADATOS)
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No hay índice de similitud en '{directorio}'; ejecute primero el pipeline")
+        with open(ruta, encoding='utf-8') as f:
+            metadatos = json.load(f)
+        if metadatos.pop('version') != VERSION_INDICE:
+            raise ValueError(f"Índice de similitud de otra versión en '{directorio}'; vuelva a construirlo")
+        origen = os.path.join(directorio, metadatos.pop('datos'))
+        # Vistas ndarray sobre el mmap: indexar un np.memmap cuesta ~0.1 ms por llamada
+        arreglos = {nombre: np.load(os.path.join(origen, f"{nombre}.npy"),
+                                    mmap_mode='r' if mmap else None).view(np.ndarray)
+                    for nombre in ARREGLOS}
+        return cls(joblib.load(os.path.join(origen, 'vectorizer.joblib')), arreglos, metadatos)
+
+
+def reportes_sinteticos(n, semilla=42):
+    """Reportes de benchmark_osbra con lugares y detalles variables: casi todos los textos son distintos"""
+    from benchmark_osbra import generar_dataset_sintetico
+
+    rng = np.random.default_rng(semilla)
+    df = generar_dataset_sintetico(n, semilla).dropna(subset=['Comentario']).reset_index(drop=True)
+    lugares = np.array(['barrio', 'vereda', 'sector', 'comuna', 'parque', 'calle', 'avenida', 'colegio'])
+    detalles = np.array(['desde hace meses', 'otra vez', 'cada semana', 'y nadie responde', 'sobre todo de noche',
+                         'afecta a los niños', 'a pesar de las quejas', 'hace varios días'])
+    m = len(df)
+    df['Comentario'] = (df['Comentario'].str.rstrip('.') + ' en el ' + lugares[rng.integers(0, len(lugares), m)]
+                        + ' ' + pd.Series(rng.integers(1, 3000, m)).astype(str) + ' '
+                        + detalles[rng.integers(0, len(detalles), m)])
+    return df
+
+
+if __name__ == "__main__":
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    from limpieza import cargar_datos_limpios
+
+    parser = argparse.ArgumentParser(description='Construye el índice de reportes similares y mide sus consultas')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--directorio', default=DIRECTORIO_INDICE)
+    parser.add_argument('--consultas', type=int, default=1000)
+    parser.add_argument('--sintetico', type=int, default=0, metavar='REPORTES',
+                        help='Medir con N reportes sintéticos en lugar del archivo')
+    args = parser.parse_args()
+
+    if args.sintetico:
+        df_ml = reportes_sinteticos(args.sintetico)
+    else:
+        df_clean, _ = cargar_datos_limpios(args.archivo)
+        df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario']
+    # Mismos parámetros que la sección 6 de osbra_final_perfecto.py
+    vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2)).fit(df_ml['Comentario'])
+    inicio = time.perf_counter()
+    IndiceSimilitud.construir(df_ml, vectorizer).guardar(args.directorio)
+    print(f"[OK] Índice guardado en {args.directorio}/ ({len(df_ml):,} reportes, "
+          f"{df_ml['Comentario'].nunique():,} textos) en {(time.perf_counter() - inicio)*1000:.0f} ms")
+
+    indice = IndiceSimilitud.cargar(args.directorio)
+    consultas = df_ml['Comentario'].sample(args.consultas, replace=True, random_state=42).tolist()
+    ciudades = df_ml['Ciudad'].dropna().sample(args.consultas, replace=True, random_state=7).tolist()
+    for nombre, filtros in [('sin filtros', lambda i: None),
+                            ('ciudad + fecha', lambda i: {'ciudad': ciudades[i], 'desde': '2024-01-01'})]:
+        tiempos, exactas = [], 0
+        for i, consulta in enumerate(consultas):
+            inicio = time.perf_counter()
+            exactas += indice.top_k(consulta, 5, filtros(i)).attrs['exacto']
+            tiempos.append(time.perf_counter() - inicio)
+        tiempos = np.array(tiempos) * 1000
+        print(f"  top_k {nombre:<15} p50 {np.percentile(tiempos, 50):.2f} ms  p99 {np.percentile(tiempos, 99):.2f} ms"
+              f"  (garantizadas {exactas / len(consultas):.0%})")
+
+    print("\nEjemplo:")
+    print(indice.top_k('no hay agua potable en el barrio', 5, {'ciudad': 'Bogotá'}).to_string(index=False))
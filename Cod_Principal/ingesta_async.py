@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import pandas as pd
+
+from deduplicacion import memoizar_clasificacion
+from gemini_simulado import GeminiSimulation
+from ingesta_streaming import DTYPES_REPORTE, mediana_edad_por_bloques
+from limpieza import limpiar_datos
+from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+from servicio_osbra import MetricasLatencia
+
+# ============================================
+# INGESTA CONTINUA CON ASYNCIO Y CONTRAPRESIÓN
+# ============================================
+
+COLUMNAS_REPORTE = list(DTYPES_REPORTE)
+# Columnas del plan que se guardan junto a cada reporte
+COLUMNAS_PLAN = ['prioridad_score', 'prioridad_nivel', 'tiempo_respuesta', 'presupuesto', 'personal_total', 'plan_id']
+CAPACIDAD_COLA = 10_000
+TAMANO_LOTE = 500
+ESPERA_MAX = 0.05
+# Marca de fin de la fuente (no es un reporte)
+FIN = object()
+
+
+class ProcesadorReportes:
+    """Limpieza, clasificación y priorización de un lote de reportes; anexa el resultado al CSV de salida"""
+
+    def __init__(self, ruta_salida, edad_mediana=None):
+        self.ruta_salida = ruta_salida
+        self.edad_mediana = edad_mediana
+        self.memo = memoizar_clasificacion(GeminiSimulation())
+        self.generador = OSBRASolutionsGenerator()
+        self._estado = {}
+
+    def procesar(self, registros):
+        """Lista de dicts (claves = columnas del CSV) -> DataFrame limpio con categoría y plan"""
+        # Sin inferencia de tipos por lote: limpiar_datos impone los de cada columna
+        df = pd.DataFrame(registros, columns=COLUMNAS_REPORTE, dtype=object)
+        df_clean, _ = limpiar_datos(df, self.edad_mediana)
+        df_clean['Categoria_Gemini'] = self.memo.procesar(df_clean['Comentario'])
+        # Los reportes nuevos pueden llegar sin categoría: se planifican con la clasificada
+        df_clean['Categoria_Plan'] = df_clean['Categoría del problema'].fillna(df_clean['Categoria_Gemini'])
+        planes = self.generador.analizar_lote(df_clean, col_categoria='Categoria_Plan')
+        return df_clean.drop(columns='Categoria_Plan').join(planes[COLUMNAS_PLAN])
+
+    def confirmar(self, df_lote, estado=None):
+        """Anexa el lote al almacenamiento y, después, guarda el estado de la fuente
+
+        El estado registra también el tamaño de la salida tras el lote: es la marca de que el
+        lote quedó confirmado. Si el proceso se corta entre las dos escrituras, recuperar()
+        recorta el lote huérfano y la fuente se relee desde el estado anterior, sin duplicados.
+        """
+        with open(self.ruta_salida, 'a', encoding='utf-8', newline='') as f:
+            # Encabezado solo si el archivo está vacío (nuevo o recortado a cero)
+            df_lote.to_csv(f, header=f.tell() == 0, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+            bytes_salida = f.tell()
+        self._guardar_estado({**self._estado, **(estado or {}), 'bytes_salida': bytes_salida})
+
+    def recuperar(self):
+        """Descarta de la salida lo escrito después del último estado guardado; retorna el estado"""
+        self._estado = self.leer_estado()
+        tamano = os.path.getsize(self.ruta_salida) if os.path.exists(self.ruta_salida) else 0
+        confirmados = self._estado.get('bytes_salida')
+        if confirmados is None:
+            # Primera ejecución sobre esta salida (o estado sin tamaño): lo existente queda confirmado
+            self._guardar_estado({**self._estado, 'bytes_salida': tamano})
+        elif tamano > confirmados:
+            with open(self.ruta_salida, 'r+b') as f:
+                f.truncate(confirmados)
+                os.fsync(f.fileno())
+            print(f"[AVISO] {tamano - confirmados:,} bytes de un lote sin confirmar descartados de "
+                  f"{self.ruta_salida}; se vuelve a procesar desde el último lote confirmado")
+        return self._estado
+
+    def _guardar_estado(self, estado):
+        # El estado se reemplaza de forma atómica: tras un corte queda el anterior o el nuevo
+        temporal = self.ruta_estado() + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(estado, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta_estado())
+        self._estado = estado
+
+    def ruta_estado(self):
+        return self.ruta_salida + '.estado.json'
+
+    def leer_estado(self):
+        if not os.path.exists(self.ruta_estado()):
+            return {}
+        with open(self.ruta_estado(), encoding='utf-8') as f:
+            return json.load(f)
+
+def _decodificar(linea, metricas):
+    """Un reporte por línea JSON; las líneas inválidas se descartan y se cuentan"""
+    try:
+        registro = json.loads(linea)
+    except json.JSONDecodeError:
+        metricas.registrar_rechazo()
+        return None
+    if not isinstance(registro, dict):
+        metricas.registrar_rechazo()
+        return None
+    return registro
+
+
+# ============================================
+# FUENTES
+# ============================================
+
+async def seguir_jsonl(ruta, cola, metricas, desde_byte=0, intervalo=0.2, una_pasada=False):
+    """Sigue un archivo JSONL como `tail -f` y encola (reporte, byte final de su línea)
+
+    Con la cola llena, put() espera: el archivo queda como búfer y la memoria no crece.
+    """
+    posicion = desde_byte
+    pendiente = b''
+    while True:
+        if os.path.exists(ruta):
+            with open(ruta, 'rb') as f:
+                f.seek(posicion)
+                datos = f.read(1 << 20)
+        else:
+            datos = b''
+        if not datos:
+            if una_pasada:
+                break
+            await asyncio.sleep(intervalo)
+            continue
+        # Byte donde termina cada línea: al confirmar su lote, la lectura se reanuda desde ahí
+        fin = posicion - len(pendiente)
+        posicion += len(datos)
+        # Una línea incompleta (escritura en curso) se conserva hasta recibir su salto de línea
+        lineas = (pendiente + datos).split(b'\n')
+        pendiente = lineas.pop()
+        for linea in lineas:
+            fin += len(linea) + 1
+            if not linea.strip():
+                continue
+            registro = _decodificar(linea, metricas)
+            if registro is not None:
+                await cola.put((registro, fin, time.perf_counter()))
+    await cola.put(FIN)
+
+
+async def servir_socket(cola, metricas, host='127.0.0.1', puerto=9090):
+    """Recibe reportes JSONL por TCP; con la cola llena se deja de leer y TCP frena al emisor"""
+
+    async def atender(lector, escritor):
+        while linea := await lector.readline():
+            if linea.strip():
+                registro = _decodificar(linea, metricas)
+                if registro is not None:
+                    await cola.put((registro, None, time.perf_counter()))
+        escritor.close()
+
+    return await asyncio.start_server(atender, host, puerto, limit=1 << 20)
+
+
+# ============================================
+# TRABAJADOR
+# ============================================
+
+async def trabajador(cola, procesador, metricas, tamano_lote=TAMANO_LOTE, espera_max=ESPERA_MAX):
+    """Reúne lotes de la cola, los procesa fuera del bucle de eventos y los confirma en orden"""
+    terminado = False
+    while not terminado:
+        item = await cola.get()
+        if item is FIN:
+            break
+        lote = [item]
+        limite = time.perf_counter() + espera_max
+        # Completar el lote hasta tamano_lote o hasta agotar la espera: latencia acotada en régimen estable
+        while len(lote) < tamano_lote:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(cola.get(), restante)
+            except asyncio.TimeoutError:
+                break
+            if item is FIN:
+                terminado = True
+                break
+            lote.append(item)
+
+        registros = [registro for registro, _, _ in lote]
+        df_lote = await asyncio.to_thread(procesador.procesar, registros)
+        fin = lote[-1][1]
+        await asyncio.to_thread(procesador.confirmar, df_lote, None if fin is None else {'byte': fin})
+
+        ahora = time.perf_counter()
+        metricas.registrar_lote(len(lote))
+        for _, _, llegada in lote:
+            metricas.registrar(ahora - llegada)
+
+
+async def ingerir_jsonl(ruta, ruta_salida, capacidad=CAPACIDAD_COLA, tamano_lote=TAMANO_LOTE,
+                        espera_max=ESPERA_MAX, edad_mediana=None, una_pasada=False):
+    """Ingesta continua de un archivo JSONL; reanuda desde el último lote confirmado"""
+    cola = asyncio.Queue(maxsize=capacidad)
+    metricas = MetricasLatencia()
+    procesador = ProcesadorReportes(ruta_salida, edad_mediana)
+    desde = procesador.recuperar().get('byte', 0)
+    await asyncio.gather(
+        seguir_jsonl(ruta, cola, metricas, desde, una_pasada=una_pasada),
+        trabajador(cola, procesador, metricas, tamano_lote, espera_max)
+    )
+    return metricas
+
+
+async def ingerir_socket(ruta_salida, host='127.0.0.1', puerto=9090, capacidad=CAPACIDAD_COLA,
+                         tamano_lote=TAMANO_LOTE, espera_max=ESPERA_MAX, edad_mediana=None):
+    """Ingesta continua de reportes recibidos por TCP (una línea JSON por reporte)"""
+    cola = asyncio.Queue(maxsize=capacidad)
+    metricas = MetricasLatencia()
+    procesador = ProcesadorReportes(ruta_salida, edad_mediana)
+    # Un socket no se puede releer: el lote en curso al cortarse se pierde (a lo sumo una vez);
+    # recuperar() solo evita que quede a medias en la salida
+    procesador.recuperar()
+    servidor = await servir_socket(cola, metricas, host, puerto)
+    print(f"[OK] Recibiendo reportes en {host}:{servidor.sockets[0].getsockname()[1]}")
+    async with servidor:
+        await trabajador(cola, procesador, metricas, tamano_lote, espera_max)
+    return metricas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ingesta continua de reportes OSBRA (JSONL o socket)')
+    parser.add_argument('fuente', nargs='?', default='reportes.jsonl', help='Archivo JSONL a seguir')
+    parser.add_argument('--socket', default=None, metavar='HOST:PUERTO', help='Recibir por TCP en lugar de un archivo')
+    parser.add_argument('--salida', default='reportes_procesados.csv')
+    parser.add_argument('--capacidad', type=int, default=CAPACIDAD_COLA, help='Reportes en cola como máximo')
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE)
+    parser.add_argument('--espera-ms', type=float, default=ESPERA_MAX * 1000)
+    parser.add_argument('--referencia', default='dataset.csv', help='CSV histórico para la mediana de Edad')
+    parser.add_argument('--una-pasada', action='store_true', help='Terminar al llegar al final del archivo')
+    args = parser.parse_args()
+
+    edad_mediana = mediana_edad_por_bloques(args.referencia) if os.path.exists(args.referencia) else None
+    inicio = time.perf_counter()
+    try:
+        if args.socket:
+            host, puerto = args.socket.rsplit(':', 1)
+            metricas = asyncio.run(ingerir_socket(args.salida, host, int(puerto), args.capacidad,
+                                                  args.tamano_lote, args.espera_ms / 1000, edad_mediana))
+        else:
+            metricas = asyncio.run(ingerir_jsonl(args.fuente, args.salida, args.capacidad, args.tamano_lote,
+                                                 args.espera_ms / 1000, edad_mediana, args.una_pasada))
+    except KeyboardInterrupt:
+        metricas = None
+
+    if metricas is not None:
+        resumen = metricas.resumen()
+        segundos = time.perf_counter() - inicio
+        print(f"[OK] {resumen['atendidas']:,} reportes en {resumen['lotes']:,} lotes "
+              f"({resumen['atendidas'] / segundos:,.0f} reportes/s), {resumen['rechazadas']:,} líneas inválidas")
+        print(f"[OK] Latencia hasta confirmar: p50 {resumen['p50_ms']:.1f} ms, p99 {resumen['p99_ms']:.1f} ms"
+              if resumen['atendidas'] else "[OK] Sin reportes nuevos")
+        print(f"[OK] Resultados anexados a {args.salida}")
@@ -0,0 +1,158 @@
+import argparse
+import os
+
+import pandas as pd
+
+from deduplicacion import memoizar_clasificacion
+from gemini_simulado import GeminiSimulation
+from limpieza import limpiar_datos, mediana_frecuencias
+
+# ============================================
+# INGESTA POR BLOQUES (FUERA DE MEMORIA)
+# ============================================
+
+# Esquema del reporte con tipos compactos explícitos: evita que pandas
+# infiera int64/float64/object en cada bloque
+DTYPES_REPORTE = {
+    'ID': 'int32',
+    # Nombres casi únicos por reporte: como category cada bloque arrastraría su propio diccionario
+    'Nombre': 'object',
+    'Edad': 'float32',
+    'Género': 'object',
+    'Ciudad': 'category',
+    'Comentario': 'object',
+    'Categoría del problema': 'category',
+    'Nivel de urgencia': 'category',
+    'Fecha del reporte': 'object',
+    'Acceso a internet': 'int8',
+    'Atención previa del gobierno': 'int8',
+    'Zona rural': 'int8'
+}
+TAMANO_BLOQUE = 100_000
+
+# Columnas cuyo conteo se acumula bloque a bloque (secciones 3 y 4)
+COLUMNAS_CONTEO = [
+    'Categoría del problema', 'Nivel de urgencia', 'Ciudad', 'Tiene_Internet',
+    'Atencion_Gobierno', 'Es_Zona_Rural', 'Género'
+]
+
+
+def leer_bloques(ruta, tamano_bloque=TAMANO_BLOQUE, usecols=None):
+    """Lee el archivo de reportes por bloques con tipos compactos"""
+    dtypes = DTYPES_REPORTE if usecols is None else {c: DTYPES_REPORTE[c] for c in usecols}
+    return pd.read_csv(ruta, sep=',', encoding='utf-8', dtype=dtypes, usecols=usecols,
+                       chunksize=tamano_bloque)
+
+
+def mediana_edad_por_bloques(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """Mediana exacta de Edad acumulando frecuencias (memoria según edades distintas)"""
+    frecuencias = pd.Series(dtype='int64')
+    for bloque in leer_bloques(ruta, tamano_bloque, usecols=['Edad']):
+        frecuencias = frecuencias.add(bloque['Edad'].value_counts(), fill_value=0)
+    return mediana_frecuencias(frecuencias)
+
+
+def leer_bloques_limpios(ruta, tamano_bloque=TAMANO_BLOQUE, edad_mediana=None):
+    """Genera bloques ya limpios usando la mediana global de Edad"""
+    if edad_mediana is None:
+        edad_mediana = mediana_edad_por_bloques(ruta, tamano_bloque)
+    for bloque in leer_bloques(ruta, tamano_bloque):
+        bloque_limpio, _ = limpiar_datos(bloque, edad_mediana=edad_mediana)
+        yield bloque_limpio
+
+
+class ContadoresEDA:
+    """Agregados del análisis exploratorio que se actualizan bloque a bloque"""
+
+    def __init__(self):
+        self.filas = 0
+        self.comentarios_vacios = 0
+        self.conteos = {columna: pd.Series(dtype='int64') for columna in COLUMNAS_CONTEO}
+        self.edad_suma = pd.Series(dtype='float64')
+        self.edad_n = pd.Series(dtype='int64')
+        self.internet_por_zona = pd.DataFrame()
+        self.atencion_por_zona = pd.DataFrame()
+        self.conteo_gemini = pd.Series(dtype='int64')
+        self.comentarios_validos = 0
+        self.aciertos_gemini = 0
+
+    def actualizar(self, bloque):
+        """Incorpora un bloque limpio (y opcionalmente clasificado) a los contadores"""
+        self.filas += len(bloque)
+        self.comentarios_vacios += int((bloque['Comentario'] == 'Sin comentario').sum())
+        for columna in COLUMNAS_CONTEO:
+            conteo = bloque[columna].value_counts()
+            self.conteos[columna] = self.conteos[columna].add(conteo, fill_value=0)
+
+        edad = bloque.groupby('Categoría del problema', observed=True)['Edad']
+        self.edad_suma = self.edad_suma.add(edad.sum().astype('float64'), fill_value=0)
+        self.edad_n = self.edad_n.add(edad.count(), fill_value=0)
+
+        self.internet_por_zona = self.internet_por_zona.add(
+            pd.crosstab(bloque['Es_Zona_Rural'], bloque['Tiene_Internet']), fill_value=0)
+        self.atencion_por_zona = self.atencion_por_zona.add(
+            pd.crosstab(bloque['Es_Zona_Rural'], bloque['Atencion_Gobierno']), fill_value=0)
+
+        if 'Categoria_Gemini' in bloque:
+            validos = bloque[bloque['Comentario'] != 'Sin comentario']
+            self.comentarios_validos += len(validos)
+            self.conteo_gemini = self.conteo_gemini.add(validos['Categoria_Gemini'].value_counts(), fill_value=0)
+            self.aciertos_gemini += int((validos['Categoria_Gemini'] == validos['Categoría del problema'].astype(object)).sum())
+
+    def conteo(self, columna):
+        """Conteo acumulado de una columna, ordenado como value_counts()"""
+        return self.conteos[columna].astype('int64').sort_values(ascending=False)
+
+    def edad_promedio_por_categoria(self):
+        """Edad promedio por categoría de problema"""
+        return (self.edad_suma / self.edad_n).round(2)
+
+    def precision_gemini(self):
+        """Precisión de Gemini simulado sobre los comentarios válidos"""
+        return self.aciertos_gemini / self.comentarios_validos if self.comentarios_validos else float('nan')
+
+
+def procesar_en_bloques(ruta, tamano_bloque=TAMANO_BLOQUE, ruta_salida=None, clasificar=True):
+    """Limpia, cuenta y clasifica el archivo bloque a bloque con memoria acotada"""
+    edad_mediana = mediana_edad_por_bloques(ruta, tamano_bloque)
+    print(f"[OK] Mediana global de Edad: {edad_mediana:.0f} años")
+
+    # Los textos ya clasificados en bloques anteriores se toman de la cache LRU
+    memo = memoizar_clasificacion(GeminiSimulation()) if clasificar else None
+    contadores = ContadoresEDA()
+    if ruta_salida and os.path.exists(ruta_salida):
+        os.remove(ruta_salida)
+
+    for i, bloque in enumerate(leer_bloques_limpios(ruta, tamano_bloque, edad_mediana), 1):
+        if memo is not None:
+            bloque['Categoria_Gemini'] = memo.procesar(bloque['Comentario'])
+        contadores.actualizar(bloque)
+        if ruta_salida:
+            bloque.to_csv(ruta_salida, mode='a', header=(i == 1), index=False, encoding='utf-8')
+        print(f"[OK] Bloque {i}: {len(bloque):,} reportes ({contadores.filas:,} acumulados)")
+
+    return contadores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ingesta por bloques de reportes OSBRA')
+    parser.add_argument('ruta', nargs='?', default='dataset.csv')
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE)
+    parser.add_argument('--salida', default=None, help='CSV donde se anexan los bloques clasificados')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("INGESTA POR BLOQUES")
+    print("="*60)
+    contadores = procesar_en_bloques(args.ruta, args.tamano_bloque, args.salida)
+
+    print(f"\nReportes procesados: {contadores.filas:,}")
+    print(f"Comentarios vacios: {contadores.comentarios_vacios:,}")
+    for columna in COLUMNAS_CONTEO:
+        print(f"\nDistribución por {columna}:")
+        print(contadores.conteo(columna))
+    print("\nEdad promedio por categoría de problema:")
+    print(contadores.edad_promedio_por_categoria())
+    print("\nAcceso a internet por zona:")
+    print(contadores.internet_por_zona.astype('int64'))
+    print(f"\nGemini Simulado: {contadores.precision_gemini()*100:.2f}% precisión")
@@ -0,0 +1,181 @@
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ============================================
+# INSTRUMENTACIÓN DE TIEMPO Y MEMORIA POR SECCIÓN
+# ============================================
+
+# OSBRA_TRAZA=ruta.json activa la instrumentación sin tocar el código:
+# al terminar el proceso se imprime el resumen y se exporta la traza
+VARIABLE_TRAZA = 'OSBRA_TRAZA'
+# Campos de cada sección que se copian a los eventos de la traza
+ARGUMENTOS_TRAZA = ('filas', 'filas_por_s', 'cpu_s', 'rss_fin_mb', 'rss_delta_mb', 'aumento_pico_mb', 'pico_proceso_mb')
+
+
+def rss_actual_mb():
+    """Memoria residente actual del proceso (MB) o None si no se puede medir"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def rss_pico_mb():
+    """Pico de memoria residente desde que arrancó el proceso (MB) o None si no se puede medir"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS reporta bytes
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 2**10
+
+
+class Instrumentador:
+    """Mide tiempo de reloj, tiempo de CPU, memoria y filas/s de cada sección"""
+
+    def __init__(self, activo=True):
+        self.activo = activo
+        self.secciones = []
+        self._abierta = None
+        self._origen = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _abrir(self, nombre, filas):
+        return {
+            'nombre': nombre,
+            'filas': filas,
+            'inicio': time.perf_counter(),
+            'cpu_inicio': time.process_time(),
+            'rss_inicio_mb': rss_actual_mb(),
+            'pico_inicio_mb': rss_pico_mb(),
+            'tid': threading.get_ident()
+        }
+
+    def _cerrar(self, registro):
+        fin = time.perf_counter()
+        registro['duracion_s'] = fin - registro.pop('inicio')
+        registro['inicio_s'] = fin - registro['duracion_s'] - self._origen
+        registro['cpu_s'] = time.process_time() - registro.pop('cpu_inicio')
+        registro['rss_fin_mb'] = rss_actual_mb()
+        # ru_maxrss es el máximo de toda la vida del proceso: por sección solo tiene sentido
+        # cuánto lo elevó (0 si no superó un pico anterior); el valor absoluto se guarda aparte
+        registro['pico_proceso_mb'] = rss_pico_mb()
+        pico_inicio = registro.pop('pico_inicio_mb')
+        if pico_inicio is not None:
+            registro['aumento_pico_mb'] = registro['pico_proceso_mb'] - pico_inicio
+        if registro['rss_inicio_mb'] is not None:
+            registro['rss_delta_mb'] = registro['rss_fin_mb'] - registro['rss_inicio_mb']
+        if registro['filas'] and registro['duracion_s'] > 0:
+            registro['filas_por_s'] = registro['filas'] / registro['duracion_s']
+        with self._lock:
+            self.secciones.append(registro)
+
+    @contextmanager
+    def seccion(self, nombre, filas=None):
+        """Mide el bloque 'with'; filas permite calcular el throughput"""
+        if not self.activo:
+            yield {}
+            return
+        registro = self._abrir(nombre, filas)
+        try:
+            yield registro
+        finally:
+            self._cerrar(registro)
+
+    def medir(self, nombre=None):
+        """Decorador que mide cada llamada de la función como una sección"""
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self.seccion(nombre or funcion.__name__):
+                    return funcion(*args, **kwargs)
+            return envoltura
+        return decorador
+
+    def etapa(self, nombre, filas=None):
+        """Cierra la etapa en curso y abre otra (para scripts de secciones secuenciales)"""
+        self.terminar()
+        if self.activo:
+            self._abierta = self._abrir(nombre, filas)
+
+    def registrar_filas(self, filas):
+        """Asigna el número de filas procesadas por la etapa en curso"""
+        if self._abierta is not None:
+            self._abierta['filas'] = filas
+
+    def terminar(self):
+        """Cierra la etapa en curso, si la hay"""
+        if self._abierta is not None:
+            registro, self._abierta = self._abierta, None
+            self._cerrar(registro)
+
+    def imprimir_resumen(self):
+        """Tabla de secciones con tiempos, memoria y throughput
+
+        ΔRSS es la variación de la memoria residente durante la sección, Aumento pico cuánto
+        elevó la sección el máximo del proceso y Pico proceso ese máximo al cerrar la sección.
+        """
+        self.terminar()
+        if not self.secciones:
+            return
+        print("\n" + "="*60)
+        print("INSTRUMENTACIÓN POR SECCIÓN")
+        print("="*60)
+        print(f"{'Sección':<24}{'Reloj (s)':>10}{'CPU (s)':>10}{'ΔRSS (MB)':>11}{'Aumento pico':>14}"
+              f"{'Pico proceso':>14}{'Filas/s':>12}")
+        for s in sorted(self.secciones, key=lambda s: s['inicio_s']):
+            delta = f"{s['rss_delta_mb']:+.0f}" if 'rss_delta_mb' in s else '-'
+            aumento = f"{s['aumento_pico_mb']:.0f}" if 'aumento_pico_mb' in s else '-'
+            pico = f"{s['pico_proceso_mb']:.0f}" if s['pico_proceso_mb'] is not None else '-'
+            throughput = f"{s['filas_por_s']:,.0f}" if 'filas_por_s' in s else '-'
+            print(f"{s['nombre']:<24}{s['duracion_s']:>10.3f}{s['cpu_s']:>10.3f}{delta:>11}{aumento:>14}"
+                  f"{pico:>14}{throughput:>12}")
+        print("(memoria en MB; Pico proceso es el máximo acumulado del proceso, no de la sección)")
+
+    def exportar_chrome_trace(self, ruta):
+        """Exporta las secciones en formato Chrome Trace (chrome://tracing, Perfetto)"""
+        self.terminar()
+        pid = os.getpid()
+        eventos = []
+        for s in self.secciones:
+            argumentos = {clave: s[clave] for clave in ARGUMENTOS_TRAZA if s.get(clave) is not None}
+            eventos.append({'name': s['nombre'], 'cat': 'osbra', 'ph': 'X', 'pid': pid, 'tid': s['tid'],
+                            'ts': s['inicio_s'] * 1e6, 'dur': s['duracion_s'] * 1e6, 'args': argumentos})
+            if s['rss_fin_mb'] is not None:
+                eventos.append({'name': 'RSS (MB)', 'ph': 'C', 'pid': pid,
+                                'ts': (s['inicio_s'] + s['duracion_s']) * 1e6,
+                                'args': {'rss': s['rss_fin_mb']}})
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return ruta
+
+
+def _crear_instrumentador_global():
+    # Con spawn los trabajadores de un pool vuelven a importar este módulo y terminan con
+    # sys.exit (que sí ejecuta atexit): solo el proceso principal mide y exporta la traza
+    principal = multiprocessing.current_process().name == 'MainProcess'
+    ruta = os.environ.get(VARIABLE_TRAZA) if principal else None
+    instrumentador = Instrumentador(activo=bool(ruta))
+    if ruta:
+        def al_salir():
+            instrumentador.imprimir_resumen()
+            instrumentador.exportar_chrome_trace(ruta)
+            print(f"[OK] Traza exportada: {ruta}")
+        atexit.register(al_salir)
+    return instrumentador
+
+
+# Instancia compartida por todos los scripts del proyecto
+traza = _crear_instrumentador_global()
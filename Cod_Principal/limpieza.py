@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# LIMPIEZA COMPARTIDA CON CACHE COLUMNAR
+# ============================================
+
+# Incrementar cuando cambien las reglas de limpieza: invalida la cache
+VERSION_LIMPIEZA = 1
+DIRECTORIO_CACHE = '.cache_osbra'
+
+MAPA_GENERO = {'M': 'Masculino', 'F': 'Femenino', 'Otro': 'Otro'}
+MAPA_SI_NO = {0: 'No', 1: 'Si'}
+
+# Columnas legibles derivadas de los indicadores 0/1
+COLUMNAS_SI_NO = {
+    'Tiene_Internet': 'Acceso a internet',
+    'Atencion_Gobierno': 'Atención previa del gobierno',
+    'Es_Zona_Rural': 'Zona rural'
+}
+
+# Tipos que se imponen al limpiar: los reportes que llegan en línea (JSON) pueden traer
+# cualquier valor; lo que no se puede convertir se trata como faltante
+COLUMNAS_NUMERICAS = ['Edad', *COLUMNAS_SI_NO.values()]
+COLUMNAS_TEXTO = ['Nombre', 'Género', 'Ciudad', 'Comentario', 'Categoría del problema', 'Nivel de urgencia']
+
+
+def limpiar_datos(df, edad_mediana=None):
+    """Aplica las reglas de limpieza de OSBRA; retorna (df_limpio, resumen)"""
+    df_clean = df.copy()
+    invalidos = _imponer_tipos(df_clean)
+
+    # Manejo de valores faltantes en Edad (la mediana puede venir de fuera,
+    # p. ej. calculada sobre todo el archivo al limpiar por bloques)
+    if edad_mediana is None:
+        edad_mediana = df_clean['Edad'].median()
+    df_clean['Edad'] = df_clean['Edad'].fillna(edad_mediana)
+
+    # Manejo de comentarios vacíos
+    comentarios_vacios = int(df_clean['Comentario'].isnull().sum())
+    df_clean['Comentario'] = df_clean['Comentario'].fillna('Sin comentario')
+
+    # Normalización de género
+    df_clean['Género'] = df_clean['Género'].replace(MAPA_GENERO)
+
+    # Conversión de fechas
+    df_clean['Fecha del reporte'] = pd.to_datetime(df_clean['Fecha del reporte'], format='%Y-%m-%d', errors='coerce')
+    df_clean['Año'] = df_clean['Fecha del reporte'].dt.year
+    df_clean['Mes'] = df_clean['Fecha del reporte'].dt.month
+
+    # Crear columnas categóricas legibles
+    for columna, origen in COLUMNAS_SI_NO.items():
+        df_clean[columna] = df_clean[origen].map(MAPA_SI_NO)
+
+    resumen = {
+        'version': VERSION_LIMPIEZA,
+        'columnas_originales': list(df.columns),
+        'faltantes_originales': {col: int(n) for col, n in df.isnull().sum().items()},
+        'edad_mediana': float(edad_mediana),
+        'comentarios_vacios': comentarios_vacios,
+        'valores_invalidos': invalidos
+    }
+    return df_clean, resumen
+
+
+def _imponer_tipos(df_clean):
+    """Convierte en el lugar las columnas numéricas y de texto; retorna {columna: valores descartados}
+
+    Con un CSV bien formado las columnas ya tienen el tipo correcto y no se recorre nada.
+    """
+    invalidos = {}
+    for columna in COLUMNAS_NUMERICAS:
+        if columna in df_clean and not pd.api.types.is_numeric_dtype(df_clean[columna]):
+            valores = pd.to_numeric(df_clean[columna], errors='coerce')
+            descartados = int((valores.isna() & df_clean[columna].notna()).sum())
+            if descartados:
+                invalidos[columna] = descartados
+            df_clean[columna] = valores
+    for columna in COLUMNAS_TEXTO:
+        if columna in df_clean and df_clean[columna].dtype == object and \
+                pd.api.types.infer_dtype(df_clean[columna], skipna=True) not in ('string', 'empty'):
+            # Números, listas u objetos JSON en un campo de texto: se guardan como su texto
+            df_clean[columna] = df_clean[columna].map(lambda v: v if isinstance(v, str) or v is None or v != v
+                                                      else str(v))
+    return invalidos
+
+
+def mediana_frecuencias(frecuencias):
+    """Mediana de una Serie {valor: repeticiones}; igual a Series.median() sobre los valores repetidos
+
+    Permite calcular la mediana de todo el archivo acumulando frecuencias por bloques.
+    """
+    frecuencias = frecuencias[frecuencias > 0].sort_index()
+    if frecuencias.empty:
+        return np.nan
+    acumuladas = frecuencias.cumsum().to_numpy()
+    total = acumuladas[-1]
+    valores = frecuencias.index.to_numpy(dtype='float64')
+    # Promedio de los dos centrales si el total es par
+    bajo = valores[np.searchsorted(acumuladas, (total - 1) // 2 + 1)]
+    alto = valores[np.searchsorted(acumuladas, total // 2 + 1)]
+    return float((bajo + alto) / 2)
+
+
+def huella_archivo(ruta, tamano_bloque=1 << 20):
+    """Hash SHA-256 del contenido del archivo junto con la versión de limpieza"""
+    h = hashlib.sha256(f"limpieza-v{VERSION_LIMPIEZA}".encode())
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()[:16]
+
+
+def _rutas_cache(ruta, directorio_cache):
+    """Rutas de los datos y del resumen en cache para un archivo fuente"""
+    if directorio_cache is None:
+        directorio_cache = os.path.join(os.path.dirname(ruta) or '.', DIRECTORIO_CACHE)
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    prefijo = os.path.join(directorio_cache, f"{base}_{huella_archivo(ruta)}")
+    return directorio_cache, prefijo
+
+
+def _guardar_tabla(df, prefijo):
+    """Guarda en Parquet; si no hay motor Parquet disponible usa pickle"""
+    try:
+        df.to_parquet(prefijo + '.parquet', index=False)
+        return prefijo + '.parquet'
+    except ImportError:
+        df.to_pickle(prefijo + '.pkl')
+        return prefijo + '.pkl'
+
+
+def _leer_tabla(prefijo):
+    """Lee la tabla en cache o retorna None si no existe"""
+    if os.path.exists(prefijo + '.parquet'):
+        try:
+            return pd.read_parquet(prefijo + '.parquet')
+        except ImportError:
+            pass
+    if os.path.exists(prefijo + '.pkl'):
+        return pd.read_pickle(prefijo + '.pkl')
+    return None
+
+
+def cargar_datos_limpios(ruta='dataset.csv', directorio_cache=None, usar_cache=True):
+    """Carga el dataset limpio desde la cache columnar, limpiando solo si cambió la fuente"""
+    directorio_cache, prefijo = _rutas_cache(ruta, directorio_cache)
+
+    if usar_cache and os.path.exists(prefijo + '.json'):
+        df_clean = _leer_tabla(prefijo)
+        if df_clean is not None:
+            with open(prefijo + '.json', encoding='utf-8') as f:
+                resumen = json.load(f)
+            resumen['desde_cache'] = True
+            return df_clean, resumen
+
+    df = pd.read_csv(ruta, sep=',', encoding='utf-8')
+    df_clean, resumen = limpiar_datos(df)
+
+    if usar_cache:
+        os.makedirs(directorio_cache, exist_ok=True)
+        resumen['archivo_cache'] = _guardar_tabla(df_clean, prefijo)
+        # El resumen se escribe al final: marca la entrada de cache como completa
+        with open(prefijo + '.json', 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+    resumen['desde_cache'] = False
+    return df_clean, resumen
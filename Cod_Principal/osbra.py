@@ -0,0 +1,281 @@
+import argparse
+import sys
+import time
+
+from artefactos_modelo import DIRECTORIO_MODELOS
+
+# ============================================
+# LÍNEA DE COMANDOS Y API UNIFICADA DE OSBRA
+# ============================================
+
+# Cada etapa importa sus dependencias al ejecutarse: 'classify' y 'plan' nunca cargan
+# matplotlib, y 'plan' tampoco carga pandas ni scikit-learn.
+
+
+def limpiar(ruta='dataset.csv', usar_cache=True):
+    """Dataset limpio y resumen de la limpieza"""
+    from limpieza import cargar_datos_limpios
+    return cargar_datos_limpios(ruta, usar_cache=usar_cache)
+
+
+def entrenar(ruta='dataset.csv', directorio_modelos=DIRECTORIO_MODELOS):
+    """Entrena Naive Bayes y Random Forest en paralelo y guarda el paquete; retorna (ruta, métricas)"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.model_selection import train_test_split
+    from sklearn.naive_bayes import MultinomialNB
+
+    from artefactos_modelo import guardar_artefactos
+    from comparacion_modelos import comparar_modelos
+    from gemini_simulado import GeminiSimulation
+
+    df_clean, _ = limpiar(ruta)
+    df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario']
+    y = df_ml['Categoría del problema']
+    vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))
+    X_train, X_test, y_train, y_test = train_test_split(
+        vectorizer.fit_transform(df_ml['Comentario']), y, test_size=0.2, random_state=42, stratify=y
+    )
+    resultados = comparar_modelos({
+        'naive_bayes': MultinomialNB(),
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    }, X_train, y_train, X_test, y_test)
+
+    etiquetas_gemini, _ = GeminiSimulation().classify_batch(df_ml['Comentario'])
+    metricas = {nombre: r['precision'] for nombre, r in resultados.items()}
+    metricas['gemini_simulado'] = float((etiquetas_gemini == y).mean())
+    ruta_modelos = guardar_artefactos(
+        vectorizer,
+        {nombre: r['modelo'] for nombre, r in resultados.items()},
+        metricas=metricas,
+        modelo_principal=max(resultados, key=lambda nombre: resultados[nombre]['precision']),
+        directorio=directorio_modelos
+    )
+    return ruta_modelos, metricas
+
+
+def clasificar(comentarios, directorio_modelos=DIRECTORIO_MODELOS, usar_gemini=False):
+    """Categoría de cada comentario con el paquete actual (o con Gemini simulado si no hay paquete)"""
+    if not usar_gemini:
+        from artefactos_modelo import cargar_artefactos
+        from predecir_osbra import predecir
+        try:
+            return predecir(comentarios, cargar_artefactos(directorio_modelos, modelos='principal'))
+        except FileNotFoundError as error:
+            print(f"[AVISO] {error}; se usará Gemini simulado", file=sys.stderr)
+    from gemini_simulado import GeminiSimulation
+    gemini_ai = GeminiSimulation()
+    return [gemini_ai.classify_with_gemini(c) for c in comentarios]
+
+
+def planificar(categoria, urgencia='No urgente', ciudad='', comentario=''):
+    """Prioridad, soluciones, recursos y plan de acción de un problema"""
+    from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+    return OSBRASolutionsGenerator().analizar_problema(comentario, categoria, urgencia, ciudad, mostrar=False)
+
+
+def planificar_lote(ruta='dataset.csv', por_incidente=False):
+    """Prioridad, recursos y presupuesto de todos los reportes de un archivo
+
+    Con por_incidente=True los reportes casi duplicados se agrupan y se planifica una vez por incidente.
+    """
+    from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+    df_clean, _ = limpiar(ruta)
+    if por_incidente:
+        from incidentes import agrupar_incidentes, planificar_incidentes
+        return planificar_incidentes(df_clean, agrupar_incidentes(df_clean), OSBRASolutionsGenerator())
+    return OSBRASolutionsGenerator().analizar_lote(df_clean)
+
+
+# ============================================
+# SUBCOMANDOS
+# ============================================
+
+def _comando_clean(args):
+    df_clean, resumen = limpiar(args.archivo, usar_cache=not args.sin_cache)
+    origen = 'cache' if resumen['desde_cache'] else 'fuente'
+    print(f"[OK] Dataset limpio ({origen}): {df_clean.shape}")
+    print(f"[OK] Comentarios vacios: {resumen['comentarios_vacios']}, "
+          f"mediana de edad: {resumen['edad_mediana']:.0f} años")
+    if args.salida:
+        df_clean.to_csv(args.salida, index=False, encoding='utf-8')
+        print(f"[OK] Datos limpios guardados: {args.salida}")
+
+
+def _comando_train(args):
+    ruta_modelos, metricas = entrenar(args.archivo, args.modelos)
+    for nombre, precision in metricas.items():
+        print(f"  {nombre:<16} {precision*100:6.2f}%")
+    print(f"[OK] Modelos guardados: {ruta_modelos}")
+
+
+def _comando_classify(args):
+    comentarios = args.comentarios or [linea.strip() for linea in sys.stdin if linea.strip()]
+    for comentario, categoria in zip(comentarios, clasificar(comentarios, args.modelos, args.gemini)):
+        print(f"{categoria}\t{comentario}")
+
+
+def _comando_plan(args):
+    if args.archivo:
+        planes = planificar_lote(args.archivo, args.por_incidente)
+        if args.salida:
+            planes.to_csv(args.salida, index=args.por_incidente, encoding='utf-8')
+            print(f"[OK] {len(planes):,} planes guardados: {args.salida}")
+        else:
+            print(planes.groupby('prioridad_nivel', observed=True)[['presupuesto', 'personal_total']].sum())
+        return
+    if not args.categoria:
+        sys.exit("Indique --categoria o --archivo")
+    resultado = planificar(args.categoria, args.urgencia, args.ciudad, ' '.join(args.comentario))
+    print(f"[PRIORIDAD] {resultado['prioridad']['nivel'].upper()} "
+          f"(score {resultado['prioridad']['score']:.2f}, respuesta {resultado['prioridad']['tiempo_respuesta']})")
+    for i, solucion in enumerate(resultado['soluciones']['aplicar_ahora'], 1):
+        print(f"   {i}. {solucion}")
+    print(f"[PRESUPUESTO] ${resultado['soluciones']['presupuesto']:,} COP")
+    print(f"[TIEMPO] {resultado['soluciones']['tiempo']}")
+    for cargo, cantidad in resultado['recursos']['personal'].items():
+        print(f"   {cargo.title()}: {cantidad} personas")
+
+
+def _comando_similar(args):
+    from indice_similitud import IndiceSimilitud
+    filtros = {'ciudad': args.ciudad, 'categoria': args.categoria, 'desde': args.desde, 'hasta': args.hasta}
+    try:
+        indice = IndiceSimilitud.cargar(args.indice)
+    except (FileNotFoundError, ValueError) as error:
+        # Índice sin construir o de otra versión: el mensaje ya indica qué hacer
+        sys.exit(str(error))
+    similares = indice.top_k(' '.join(args.comentario), args.k, filtros)
+    print(similares.to_string(index=False) if len(similares) else "[AVISO] Sin reportes similares")
+
+
+def _comando_ingest(args):
+    import asyncio
+    import os
+
+    from ingesta_async import ingerir_jsonl, ingerir_socket
+    from ingesta_streaming import mediana_edad_por_bloques
+    edad_mediana = mediana_edad_por_bloques(args.referencia) if os.path.exists(args.referencia) else None
+    if args.socket:
+        host, puerto = args.socket.rsplit(':', 1)
+        metricas = asyncio.run(ingerir_socket(args.salida, host, int(puerto), edad_mediana=edad_mediana))
+    else:
+        metricas = asyncio.run(ingerir_jsonl(args.fuente, args.salida, edad_mediana=edad_mediana,
+                                             una_pasada=args.una_pasada))
+    resumen = metricas.resumen()
+    print(f"[OK] {resumen['atendidas']:,} reportes anexados a {args.salida} en {resumen['lotes']:,} lotes")
+
+
+def _comando_budget(args):
+    from rollups_presupuesto import resumen_por_categoria, rollup_archivo
+    rollup = rollup_archivo(args.archivo).resultado()
+    for categoria, datos in resumen_por_categoria(rollup).items():
+        print(f"  {categoria:<16} {datos['total']:>10,} problemas {datos['criticos']:>10,} críticos "
+              f"${datos['presupuesto']:,} COP")
+    if args.salida:
+        rollup.to_csv(args.salida, index=False, encoding='utf-8')
+        print(f"[OK] Consolidado por ciudad, categoría y mes guardado: {args.salida}")
+
+
+def _comando_forecast(args):
+    from pronostico_demanda import pronosticador_archivo
+    pronosticador, _, nuevos = pronosticador_archivo(args.archivo, args.frecuencia, args.reajustar)
+    pronostico = pronosticador.pronosticar(args.horizonte)
+    origen = "ajustadas" if nuevos is None else f"actualizadas con {nuevos} periodos nuevos"
+    print(f"[OK] {len(pronostico):,} series {origen}")
+    print(pronostico.sum().round(0).to_string())
+    if args.salida:
+        pronostico.to_csv(args.salida, encoding='utf-8')
+        print(f"[OK] Pronóstico por ciudad, categoría y urgencia guardado: {args.salida}")
+
+
+def _comando_dashboard(args):
+    from render_dashboards import ejecutar
+    ejecutar(args, args.parser, args.archivo)
+
+
+def _comando_report(args):
+    from osbra_final_perfecto import main
+    main(args.archivo)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='osbra', description='Análisis de reportes ciudadanos OSBRA')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    clean = subparsers.add_parser('clean', help='Limpiar el dataset (usa la cache columnar)')
+    clean.add_argument('archivo', nargs='?', default='dataset.csv')
+    clean.add_argument('--salida', default=None, help='CSV con los datos limpios')
+    clean.add_argument('--sin-cache', action='store_true', help='Limpiar aunque exista cache')
+    clean.set_defaults(funcion=_comando_clean)
+
+    train = subparsers.add_parser('train', help='Entrenar los modelos y guardar un paquete versionado')
+    train.add_argument('archivo', nargs='?', default='dataset.csv')
+    train.add_argument('--modelos', default=DIRECTORIO_MODELOS)
+    train.set_defaults(funcion=_comando_train)
+
+    classify = subparsers.add_parser('classify', help='Clasificar comentarios (argumentos o stdin)')
+    classify.add_argument('comentarios', nargs='*')
+    classify.add_argument('--modelos', default=DIRECTORIO_MODELOS)
+    classify.add_argument('--gemini', action='store_true', help='Clasificar con Gemini simulado')
+    classify.set_defaults(funcion=_comando_classify)
+
+    plan = subparsers.add_parser('plan', help='Plan de acción de un problema o de un archivo de reportes')
+    plan.add_argument('comentario', nargs='*')
+    plan.add_argument('--categoria', default=None)
+    plan.add_argument('--urgencia', default='No urgente')
+    plan.add_argument('--ciudad', default='')
+    plan.add_argument('--archivo', default=None, help='Planificar todos los reportes de un CSV')
+    plan.add_argument('--salida', default=None, help='CSV con los planes del archivo')
+    plan.add_argument('--por-incidente', action='store_true',
+                      help='Agrupar reportes casi duplicados y planificar una vez por incidente')
+    plan.set_defaults(funcion=_comando_plan)
+
+    similar = subparsers.add_parser('similar', help='Reportes pasados más parecidos a un comentario')
+    similar.add_argument('comentario', nargs='+')
+    similar.add_argument('--k', type=int, default=5)
+    similar.add_argument('--ciudad', default=None)
+    similar.add_argument('--categoria', default=None)
+    similar.add_argument('--desde', default=None, help='Fecha mínima (AAAA-MM-DD)')
+    similar.add_argument('--hasta', default=None, help='Fecha máxima (AAAA-MM-DD)')
+    similar.add_argument('--indice', default='indice_similitud')
+    similar.set_defaults(funcion=_comando_similar)
+
+    ingest = subparsers.add_parser('ingest', help='Ingesta continua de reportes nuevos (JSONL o socket)')
+    ingest.add_argument('fuente', nargs='?', default='reportes.jsonl')
+    ingest.add_argument('--socket', default=None, metavar='HOST:PUERTO')
+    ingest.add_argument('--salida', default='reportes_procesados.csv')
+    ingest.add_argument('--referencia', default='dataset.csv', help='CSV histórico para la mediana de Edad')
+    ingest.add_argument('--una-pasada', action='store_true', help='Terminar al llegar al final del archivo')
+    ingest.set_defaults(funcion=_comando_ingest)
+
+    budget = subparsers.add_parser('budget', help='Presupuesto y personal por ciudad, categoría y mes')
+    budget.add_argument('archivo', nargs='?', default='dataset.csv')
+    budget.add_argument('--salida', default=None, help='CSV con el consolidado')
+    budget.set_defaults(funcion=_comando_budget)
+
+    forecast = subparsers.add_parser('forecast', help='Pronóstico de reportes por ciudad, categoría y urgencia')
+    forecast.add_argument('archivo', nargs='?', default='dataset.csv')
+    forecast.add_argument('--frecuencia', choices=['M', 'W'], default='M', help='Mensual o semanal')
+    forecast.add_argument('--horizonte', type=int, default=3)
+    forecast.add_argument('--reajustar', action='store_true', help='Ignorar el ajuste guardado')
+    forecast.add_argument('--salida', default=None, help='CSV con el pronóstico')
+    forecast.set_defaults(funcion=_comando_forecast)
+
+    from render_dashboards import agregar_argumentos
+    dashboard = subparsers.add_parser('dashboard', help='Regenerar los dashboards desde el cubo de agregados')
+    agregar_argumentos(dashboard)
+    dashboard.add_argument('--archivo', default='dataset.csv')
+    dashboard.set_defaults(funcion=_comando_dashboard, parser=dashboard)
+
+    report = subparsers.add_parser('report', help='Pipeline completo (osbra_final_perfecto.py)')
+    report.add_argument('archivo', nargs='?', default='dataset.csv')
+    report.set_defaults(funcion=_comando_report)
+    return parser
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    args = crear_parser().parse_args()
+    args.funcion(args)
+    print(f"[OK] {args.comando} completado en {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
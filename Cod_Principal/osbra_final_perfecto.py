@@ -1,517 +1,407 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
 import warnings
+from instrumentacion import traza
 warnings.filterwarnings('ignore')
 
-# Configuración de visualización
-plt.style.use('default')
-sns.set_palette("Set2")
-
-# ============================================
-# SIMULACIÓN AVANZADA DE GEMINI
-# ============================================
-
-class GeminiSimulation:
-    def __init__(self):
-        self.name = "Google Gemini (Simulado)"
-        print("[OK] Gemini Simulation configurado correctamente")
-    
-    def classify_with_gemini(self, text, categories):
-        """Simula clasificación con Gemini usando análisis semántico avanzado"""
-        text_lower = text.lower()
-        
-        # Palabras clave más específicas y contextuales
-        keywords = {
-            'Salud': ['médico', 'hospital', 'salud', 'enfermo', 'medicina', 'clínica', 'doctor', 'paciente', 'ambulancia', 'emergencia médica', 'farmacia', 'medicamento'],
-            'Educación': ['escuela', 'profesor', 'estudiante', 'educación', 'colegio', 'universidad', 'maestro', 'aprender', 'aula', 'clase', 'estudio', 'académico'],
-            'Seguridad': ['delincuencia', 'robo', 'policía', 'seguridad', 'crimen', 'violencia', 'peligroso', 'inseguro', 'asalto', 'hurto', 'patrullaje', 'vigilancia'],
-            'Medio Ambiente': ['basura', 'contaminación', 'río', 'aire', 'limpio', 'reciclaje', 'verde', 'ecológico', 'residuos', 'desechos', 'polución', 'sostenible']
-        }
-        
-        # Análisis de contexto semántico
-        context_scores = {}
-        for category, words in keywords.items():
-            score = 0
-            for word in words:
-                if word in text_lower:
-                    # Peso diferente según la importancia de la palabra
-                    if word in ['médico', 'hospital', 'escuela', 'profesor', 'delincuencia', 'policía', 'basura', 'contaminación']:
-                        score += 3
-                    elif word in ['salud', 'educación', 'seguridad', 'medio ambiente']:
-                        score += 2
-                    else:
-                        score += 1
-            context_scores[category] = score
-        
-        # Análisis de frases específicas
-        phrases = {
-            'Salud': ['falta de médicos', 'centro de salud', 'atención médica', 'servicio de salud'],
-            'Educación': ['falta de profesores', 'centro educativo', 'infraestructura educativa', 'servicio educativo'],
-            'Seguridad': ['falta de seguridad', 'patrullaje', 'vigilancia', 'servicio de seguridad'],
-            'Medio Ambiente': ['recolección de basura', 'limpieza', 'gestión de residuos', 'servicio ambiental']
-        }
-        
-        for category, phrase_list in phrases.items():
-            for phrase in phrase_list:
-                if phrase in text_lower:
-                    context_scores[category] += 5
-        
-        # Retornar la categoría con mayor puntuación
-        if max(context_scores.values()) > 0:
-            return max(context_scores, key=context_scores.get)
-        else:
-            return 'Seguridad'  # Default
-    
-    def summarize_with_gemini(self, text, max_length=100):
-        """Simula resumen con Gemini usando extracción inteligente"""
-        # Dividir en oraciones
-        sentences = text.split('.')
-        
-        # Identificar la oración más importante
-        important_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 10:  # Filtrar oraciones muy cortas
-                # Puntuación basada en palabras clave
-                score = 0
-                keywords = ['problema', 'falta', 'necesitamos', 'requerimos', 'urgente', 'importante']
-                for keyword in keywords:
-                    if keyword in sentence.lower():
-                        score += 1
-                important_sentences.append((sentence, score))
-        
-        # Ordenar por importancia
-        important_sentences.sort(key=lambda x: x[1], reverse=True)
-        
-        # Construir resumen
-        summary = ""
-        for sentence, _ in important_sentences[:2]:  # Tomar las 2 más importantes
-            if len(summary + sentence) < max_length:
-                if summary:
-                    summary += ". " + sentence
-                else:
-                    summary = sentence
-            else:
-                break
-        
-        # Si no hay resumen, tomar el inicio del texto
-        if not summary:
-            summary = text[:max_length]
-        
-        return summary
-
-# ============================================
-# 1. CARGA Y EXPLORACIÓN INICIAL DE DATOS
-# ============================================
-
-# Cargar el dataset
-df = pd.read_csv('dataset.csv', sep=',', encoding='utf-8')
-
-print("="*60)
-print("ANÁLISIS EXPLORATORIO CON IA GENERATIVA AVANZADA")
-print("="*60)
-print(f"\nDimensiones del dataset: {df.shape}")
-print(f"\nPrimeras filas:")
-print(df.head())
-
-print(f"\nInformación general:")
-print(df.info())
-
-print(f"\nValores faltantes por columna:")
-print(df.isnull().sum())
-
-# ============================================
-# 2. LIMPIEZA DE DATOS
-# ============================================
-
-print("\n" + "="*60)
-print("LIMPIEZA DE DATOS")
-print("="*60)
-
-# Crear una copia para limpieza
-df_clean = df.copy()
-
-# 2.1 Manejo de valores faltantes en Edad
-edad_media = df_clean['Edad'].median()
-df_clean['Edad'].fillna(edad_media, inplace=True)
-print(f"\n[OK] Edades faltantes rellenadas con la mediana: {edad_media:.0f} años")
-
-# 2.2 Manejo de comentarios vacíos
-comentarios_vacios = df_clean['Comentario'].isnull().sum()
-df_clean['Comentario'].fillna('Sin comentario', inplace=True)
-print(f"[OK] Comentarios vacios encontrados: {comentarios_vacios}")
-
-# 2.3 Normalización de género
-df_clean['Género'] = df_clean['Género'].replace({
-    'M': 'Masculino',
-    'F': 'Femenino',
-    'Otro': 'Otro'
-})
-print(f"[OK] Genero normalizado")
-
-# 2.4 Conversión de fechas
-df_clean['Fecha del reporte'] = pd.to_datetime(df_clean['Fecha del reporte'], format='%Y-%m-%d', errors='coerce')
-df_clean['Año'] = df_clean['Fecha del reporte'].dt.year
-df_clean['Mes'] = df_clean['Fecha del reporte'].dt.month
-print(f"[OK] Fechas convertidas correctamente")
-
-# 2.5 Crear columnas categóricas legibles
-df_clean['Tiene_Internet'] = df_clean['Acceso a internet'].map({0: 'No', 1: 'Si'})
-df_clean['Atencion_Gobierno'] = df_clean['Atención previa del gobierno'].map({0: 'No', 1: 'Si'})
-df_clean['Es_Zona_Rural'] = df_clean['Zona rural'].map({0: 'No', 1: 'Si'})
-
-print(f"\n[OK] Dataset limpio: {df_clean.shape}")
-print(f"[OK] Valores faltantes restantes: {df_clean.isnull().sum().sum()}")
-
-# ============================================
-# 3. ANÁLISIS EXPLORATORIO DE DATOS (EDA)
-# ============================================
-
-print("\n" + "="*60)
-print("ANÁLISIS EXPLORATORIO")
-print("="*60)
-
-# 3.1 Distribución por categoría
-print("\nDistribución por Categoría del Problema:")
-print(df_clean['Categoría del problema'].value_counts())
-
-# 3.2 Distribución por urgencia
-print("\nDistribución por Nivel de Urgencia:")
-print(df_clean['Nivel de urgencia'].value_counts())
-
-# 3.3 Distribución por ciudad
-print("\nDistribución por Ciudad:")
-print(df_clean['Ciudad'].value_counts())
-
-# 3.4 Análisis de acceso a servicios
-print("\nAcceso a Internet:")
-print(df_clean['Tiene_Internet'].value_counts())
-
-print("\nAtención Previa del Gobierno:")
-print(df_clean['Atencion_Gobierno'].value_counts())
-
-print("\nZona Rural vs Urbana:")
-print(df_clean['Es_Zona_Rural'].value_counts())
-
-# ============================================
-# 4. DETECCIÓN DE SESGOS ÉTICOS
-# ============================================
-
-print("\n" + "="*60)
-print("ANÁLISIS ÉTICO - DETECCIÓN DE SESGOS")
-print("="*60)
-
-# 4.1 Distribución de género
-print("\nDistribución por Género:")
-print(df_clean['Género'].value_counts(normalize=True) * 100)
-
-# 4.2 Edad promedio por categoría
-print("\nEdad promedio por categoría de problema:")
-print(df_clean.groupby('Categoría del problema')['Edad'].mean().round(2))
-
-# 4.3 Acceso a internet por zona
-print("\nAcceso a internet por zona:")
-print(pd.crosstab(df_clean['Es_Zona_Rural'], df_clean['Tiene_Internet'], normalize='index') * 100)
-
-# 4.4 Atención del gobierno por zona
-print("\nAtención previa del gobierno por zona:")
-print(pd.crosstab(df_clean['Es_Zona_Rural'], df_clean['Atencion_Gobierno'], normalize='index') * 100)
-
-# ============================================
-# 5. INTEGRACIÓN DE GEMINI SIMULADO
-# ============================================
-
-print("\n" + "="*60)
-print("INTEGRACIÓN DE GEMINI SIMULADO")
-print("="*60)
-
-# Inicializar Gemini simulado
-gemini_ai = GeminiSimulation()
-
-# 5.1 Clasificación con Gemini simulado
-print("\nClasificando comentarios con Gemini simulado...")
-df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario'].copy()
-
-# Tomar una muestra para pruebas
-sample_size = min(100, len(df_ml))
-df_sample = df_ml.sample(n=sample_size, random_state=42)
-
-categories = df_clean['Categoría del problema'].unique().tolist()
-print(f"Procesando muestra de {len(df_sample)} comentarios...")
-
-# Clasificación con Gemini simulado
-df_sample['Categoria_Gemini'] = df_sample['Comentario'].apply(
-    lambda x: gemini_ai.classify_with_gemini(x, categories)
-)
-df_sample['Resumen_Gemini'] = df_sample['Comentario'].apply(
-    lambda x: gemini_ai.summarize_with_gemini(x)
-)
-
-# Mostrar resultados de clasificación
-print("\nResultados de clasificación con Gemini simulado:")
-print(df_sample[['Comentario', 'Categoría del problema', 'Categoria_Gemini']].head(10))
-
-# Mostrar resúmenes generados
-print("\nResúmenes generados con Gemini simulado:")
-for idx, row in df_sample.head(5).iterrows():
-    print(f"\nOriginal: {row['Comentario'][:100]}...")
-    print(f"Resumen: {row['Resumen_Gemini']}")
-
-# ============================================
-# 6. PREPARACIÓN PARA MACHINE LEARNING TRADICIONAL
-# ============================================
-
-print("\n" + "="*60)
-print("PREPARACIÓN PARA MACHINE LEARNING TRADICIONAL")
-print("="*60)
-
-# 6.1 Filtrar registros con comentarios válidos
-df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario'].copy()
-print(f"\nRegistros con comentarios válidos: {len(df_ml)}")
-
-# 6.2 Preparar datos para clasificación de categoría
-X_text = df_ml['Comentario']
-y_categoria = df_ml['Categoría del problema']
-
-# 6.3 Vectorización TF-IDF
-vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2), stop_words=None)
-X_vectorized = vectorizer.fit_transform(X_text)
-
-print(f"[OK] Textos vectorizados: {X_vectorized.shape}")
-
-# 6.4 División en entrenamiento y prueba
-X_train, X_test, y_train, y_test = train_test_split(
-    X_vectorized, y_categoria, test_size=0.2, random_state=42, stratify=y_categoria
-)
-
-print(f"[OK] Conjunto de entrenamiento: {X_train.shape}")
-print(f"[OK] Conjunto de prueba: {X_test.shape}")
-
-# ============================================
-# 7. ENTRENAMIENTO DE MODELOS TRADICIONALES
-# ============================================
-
-print("\n" + "="*60)
-print("ENTRENAMIENTO DE MODELOS DE CLASIFICACIÓN")
-print("="*60)
-
-# 7.1 Modelo Naive Bayes
-print("\n1. Naive Bayes Multinomial:")
-nb_model = MultinomialNB()
-nb_model.fit(X_train, y_train)
-nb_pred = nb_model.predict(X_test)
-nb_score = nb_model.score(X_test, y_test)
-
-print(f"   Precisión: {nb_score*100:.2f}%")
-print("\n   Reporte de clasificación:")
-print(classification_report(y_test, nb_pred))
-
-# 7.2 Modelo Random Forest
-print("\n2. Random Forest:")
-rf_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-rf_model.fit(X_train, y_train)
-rf_pred = rf_model.predict(X_test)
-rf_score = rf_model.score(X_test, y_test)
-
-print(f"   Precisión: {rf_score*100:.2f}%")
-print("\n   Reporte de clasificación:")
-print(classification_report(y_test, rf_pred))
-
-# ============================================
-# 8. PREDICCIONES DE EJEMPLO CON GEMINI SIMULADO
-# ============================================
-
-print("\n" + "="*60)
-print("EJEMPLOS DE PREDICCIÓN CON GEMINI SIMULADO")
-print("="*60)
-
-ejemplos = [
-    "necesitamos más médicos en el hospital",
-    "las calles están muy sucias y llenas de basura",
-    "no hay suficientes profesores en la escuela",
-    "hay mucha delincuencia en el barrio"
-]
-
-print("\nPredicciones con modelos tradicionales vs Gemini simulado:\n")
-
-for ejemplo in ejemplos:
-    print(f"Comentario: '{ejemplo}'")
-    
-    # Predicción con Random Forest
-    ejemplo_vectorizado = vectorizer.transform([ejemplo])
-    prediccion_rf = rf_model.predict(ejemplo_vectorizado)[0]
-    print(f"Random Forest: {prediccion_rf}")
-    
-    # Predicción con Gemini simulado
-    prediccion_gemini = gemini_ai.classify_with_gemini(ejemplo, categories)
-    print(f"Gemini Simulado: {prediccion_gemini}")
-    
-    # Resumen con Gemini simulado
-    resumen = gemini_ai.summarize_with_gemini(ejemplo)
-    print(f"Resumen: {resumen}")
-    
-    print("-" * 50)
-
-# ============================================
-# 9. ANÁLISIS COMPARATIVO
-# ============================================
-
-print("\n" + "="*60)
-print("ANÁLISIS COMPARATIVO DE MODELOS")
-print("="*60)
-
-# Comparar precisión de modelos
-print("\nComparación de precisión:")
-print(f"Random Forest: {rf_score*100:.2f}%")
-print(f"Naive Bayes: {nb_score*100:.2f}%")
-
-# Calcular precisión de Gemini simulado
-gemini_correct = (df_sample['Categoria_Gemini'] == df_sample['Categoría del problema']).sum()
-gemini_total = len(df_sample)
-gemini_accuracy = gemini_correct / gemini_total
-print(f"Gemini Simulado: {gemini_accuracy*100:.2f}%")
-
-# Análisis de resúmenes generados
-resumenes_validos = df_sample['Resumen_Gemini'].dropna()
-print(f"\nResúmenes generados: {len(resumenes_validos)}")
-if len(resumenes_validos) > 0:
-    print(f"Longitud promedio de resúmenes: {resumenes_validos.str.len().mean():.0f} caracteres")
-
-# ============================================
-# 10. VISUALIZACIONES PERFECTAS
-# ============================================
-
-print("\n" + "="*60)
-print("GENERANDO VISUALIZACIONES PERFECTAS")
-print("="*60)
-
-# Crear visualizaciones perfectas
-fig, axes = plt.subplots(2, 2, figsize=(18, 14))
-fig.suptitle('Análisis Avanzado de Comentarios Ciudadanos con IA Generativa', 
-             fontsize=18, fontweight='bold', y=0.98)
-
-# 1. Distribución de categorías (PERFECTO)
-categoria_counts = df_clean['Categoría del problema'].value_counts()
-colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
-bars = axes[0,0].bar(range(len(categoria_counts)), categoria_counts.values, color=colors, alpha=0.8)
-axes[0,0].set_title('Distribución de Categorías de Problemas', fontsize=16, fontweight='bold', pad=20)
-axes[0,0].set_xlabel('Categoría', fontsize=14, fontweight='bold')
-axes[0,0].set_ylabel('Cantidad de Reportes', fontsize=14, fontweight='bold')
-axes[0,0].set_xticks(range(len(categoria_counts)))
-axes[0,0].set_xticklabels(categoria_counts.index, rotation=45, ha='right', fontsize=12)
-axes[0,0].grid(True, alpha=0.3, axis='y')
-axes[0,0].set_ylim(0, max(categoria_counts.values) * 1.1)
-
-# Añadir valores en las barras
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    axes[0,0].text(bar.get_x() + bar.get_width()/2., height + 20,
-                   f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-
-# 2. Distribución por urgencia (PERFECTO)
-urgencia_counts = df_clean['Nivel de urgencia'].value_counts()
-colors_pie = ['#FF9999', '#66B2FF']
-wedges, texts, autotexts = axes[0,1].pie(urgencia_counts.values, 
-                                        labels=urgencia_counts.index,
-                                        autopct='%1.1f%%',
-                                        colors=colors_pie,
-                                        startangle=90,
-                                        textprops={'fontsize': 12, 'fontweight': 'bold'})
-axes[0,1].set_title('Distribución por Nivel de Urgencia', fontsize=16, fontweight='bold', pad=20)
-
-# 3. Acceso a internet por zona (PERFECTO)
-internet_por_zona = pd.crosstab(df_clean['Es_Zona_Rural'], df_clean['Tiene_Internet'])
-internet_por_zona.plot(kind='bar', ax=axes[1,0], color=['#FFB6C1', '#98FB98'], alpha=0.8)
-axes[1,0].set_title('Acceso a Internet por Zona', fontsize=16, fontweight='bold', pad=20)
-axes[1,0].set_xlabel('Zona Rural', fontsize=14, fontweight='bold')
-axes[1,0].set_ylabel('Cantidad de Personas', fontsize=14, fontweight='bold')
-axes[1,0].legend(['Sin Internet', 'Con Internet'], title='Acceso a Internet', fontsize=12)
-axes[1,0].tick_params(axis='x', rotation=0, labelsize=12)
-axes[1,0].grid(True, alpha=0.3, axis='y')
-
-# 4. Comparación de precisión de modelos (PERFECTO)
-modelos = ['Random Forest', 'Naive Bayes', 'Gemini Simulado']
-precisiones = [rf_score*100, nb_score*100, gemini_accuracy*100]
-colors_models = ['#FF6B6B', '#4ECDC4', '#FFD93D']
-
-bars = axes[1,1].bar(modelos, precisiones, color=colors_models, alpha=0.8)
-axes[1,1].set_title('Comparación de Precisión de Modelos', fontsize=16, fontweight='bold', pad=20)
-axes[1,1].set_ylabel('Precisión (%)', fontsize=14, fontweight='bold')
-axes[1,1].set_ylim(0, max(precisiones) * 1.2)
-axes[1,1].grid(True, alpha=0.3, axis='y')
-axes[1,1].tick_params(axis='x', rotation=45, labelsize=12)
-
-# Añadir valores en las barras
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    axes[1,1].text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                   f'{height:.1f}%', ha='center', va='bottom', fontweight='bold', fontsize=11)
-
-plt.tight_layout()
-plt.savefig('analisis_osbra_perfecto.png', dpi=300, bbox_inches='tight')
-print("[OK] Visualizaciones perfectas guardadas: analisis_osbra_perfecto.png")
-
-# ============================================
-# 11. GUARDAR RESULTADOS Y MODELOS
-# ============================================
-
-print("\n" + "="*60)
-print("GUARDANDO RESULTADOS")
-print("="*60)
-
-# Guardar dataset limpio
-df_clean.to_csv('dataset_limpio_perfecto.csv', index=False, encoding='utf-8')
-print("[OK] Dataset limpio guardado: dataset_limpio_perfecto.csv")
-
-# Guardar muestra con clasificaciones de Gemini
-df_sample.to_csv('muestra_clasificacion_perfecto.csv', index=False, encoding='utf-8')
-print("[OK] Muestra con clasificaciones guardada: muestra_clasificacion_perfecto.csv")
-
-# Guardar métricas en un archivo
-with open('metricas_modelos_perfecto.txt', 'w', encoding='utf-8') as f:
-    f.write("MÉTRICAS DE LOS MODELOS CON IA GENERATIVA PERFECTA\n")
-    f.write("="*60 + "\n\n")
-    f.write(f"Random Forest - Precisión: {rf_score*100:.2f}%\n\n")
-    f.write("Reporte de clasificación:\n")
-    f.write(classification_report(y_test, rf_pred))
-    f.write("\n" + "="*60 + "\n\n")
-    f.write(f"Naive Bayes - Precisión: {nb_score*100:.2f}%\n\n")
-    f.write("Reporte de clasificación:\n")
-    f.write(classification_report(y_test, nb_pred))
-    f.write("\n" + "="*60 + "\n\n")
-    f.write(f"Gemini Simulado - Precisión: {gemini_accuracy*100:.2f}%\n\n")
-    f.write("INTEGRACIÓN DE IA GENERATIVA PERFECTA\n")
-    f.write("- Gemini Simulado: Clasificación y resumen avanzados\n")
-    f.write("- Análisis semántico contextual\n")
-    f.write("- Comparación con modelos tradicionales\n")
-    f.write(f"- Comentarios procesados: {len(df_sample)}\n")
-
-print("[OK] Métricas guardadas: metricas_modelos_perfecto.txt")
-
-print("\n" + "="*60)
-print("PROCESO COMPLETADO PERFECTAMENTE")
-print("="*60)
-print("\nResumen:")
-print(f"- Registros procesados: {len(df_clean)}")
-print(f"- Categorías: {df_clean['Categoría del problema'].nunique()}")
-print(f"- Ciudades: {df_clean['Ciudad'].nunique()}")
-print(f"- Mejor modelo tradicional: Naive Bayes ({nb_score*100:.2f}% precisión)")
-print(f"- Gemini Simulado: {gemini_accuracy*100:.2f}% precisión")
-print(f"- Comentarios procesados con IA: {len(df_sample)}")
-print("\nArchivos generados:")
-print("  1. dataset_limpio_perfecto.csv")
-print("  2. muestra_clasificacion_perfecto.csv")
-print("  3. metricas_modelos_perfecto.txt")
-print("  4. analisis_osbra_perfecto.png")
-print("\nFuncionalidades de IA generativa:")
-print("  - Clasificación semántica avanzada con Gemini simulado")
-print("  - Resumen inteligente contextual")
-print("  - Comparación con modelos tradicionales")
-print("  - Visualizaciones perfectas y profesionales")
+def main(ruta='dataset.csv'):
+    """Pipeline completo: limpieza, EDA, Gemini simulado, modelos, gráficos y guardado"""
+    # Las dependencias pesadas se importan al ejecutar, no al importar el módulo
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import classification_report
+    from gemini_simulado import GeminiSimulation
+    from limpieza import cargar_datos_limpios
+    from cubo_agregados import cargar_cubo
+    from artefactos_modelo import guardar_artefactos
+    from comparacion_modelos import comparar_modelos
+    from deduplicacion import transformar_deduplicado
+    from clasificacion_paralela import procesar_corpus
+    from indice_similitud import IndiceSimilitud
+    from render_dashboards import agregados_analisis, renderizar
+
+    # ============================================
+    # 1. CARGA Y EXPLORACIÓN INICIAL DE DATOS
+    # ============================================
+
+    traza.etapa('carga')
+
+    # Cargar el dataset limpio (desde la cache columnar si la fuente no cambió)
+    df_clean, resumen_limpieza = cargar_datos_limpios(ruta)
+    traza.registrar_filas(len(df_clean))
+    columnas_originales = resumen_limpieza['columnas_originales']
+
+    print("="*60)
+    print("ANÁLISIS EXPLORATORIO CON IA GENERATIVA AVANZADA")
+    print("="*60)
+    print(f"\nDimensiones del dataset: {(len(df_clean), len(columnas_originales))}")
+    # Las filas y conteos de esta sección son los del archivo original, antes de limpiar:
+    # las primeras filas se leen del CSV y los no nulos salen del resumen de limpieza
+    print(f"\nPrimeras filas:")
+    print(pd.read_csv(ruta, sep=',', encoding='utf-8', nrows=5))
+
+    print(f"\nInformación general:")
+    faltantes_originales = pd.Series(resumen_limpieza['faltantes_originales'])
+    print(f"{len(df_clean)} entradas, {len(columnas_originales)} columnas")
+    print((len(df_clean) - faltantes_originales).rename('No nulos').to_frame())
+
+    print(f"\nValores faltantes por columna:")
+    print(faltantes_originales)
+
+    # ============================================
+    # 2. LIMPIEZA DE DATOS
+    # ============================================
+
+    traza.etapa('limpieza', filas=len(df_clean))
+
+    print("\n" + "="*60)
+    print("LIMPIEZA DE DATOS")
+    print("="*60)
+
+    # Las reglas de limpieza viven en limpieza.py y se comparten con el dashboard
+    if resumen_limpieza['desde_cache']:
+        print(f"\n[OK] Dataset limpio cargado desde cache (version de limpieza {resumen_limpieza['version']})")
+    print(f"\n[OK] Edades faltantes rellenadas con la mediana: {resumen_limpieza['edad_mediana']:.0f} años")
+    print(f"[OK] Comentarios vacios encontrados: {resumen_limpieza['comentarios_vacios']}")
+    print(f"[OK] Genero normalizado")
+    print(f"[OK] Fechas convertidas correctamente")
+
+    print(f"\n[OK] Dataset limpio: {df_clean.shape}")
+    print(f"[OK] Valores faltantes restantes: {df_clean.isnull().sum().sum()}")
+
+    # Cubo de agregados: EDA, sesgos y gráficos leen de aquí, no de las filas
+    cubo, info_cubo = cargar_cubo(ruta, df_clean)
+    print(f"[OK] Cubo de agregados ({info_cubo['origen']}): {len(cubo.tabla):,} celdas")
+
+    # ============================================
+    # 3. ANÁLISIS EXPLORATORIO DE DATOS (EDA)
+    # ============================================
+
+    traza.etapa('eda', filas=len(df_clean))
+
+    print("\n" + "="*60)
+    print("ANÁLISIS EXPLORATORIO")
+    print("="*60)
+
+    # 3.1 Distribución por categoría
+    print("\nDistribución por Categoría del Problema:")
+    print(cubo.conteo('Categoría del problema'))
+
+    # 3.2 Distribución por urgencia
+    print("\nDistribución por Nivel de Urgencia:")
+    print(cubo.conteo('Nivel de urgencia'))
+
+    # 3.3 Distribución por ciudad
+    print("\nDistribución por Ciudad:")
+    print(cubo.conteo('Ciudad'))
+
+    # 3.4 Análisis de acceso a servicios
+    print("\nAcceso a Internet:")
+    print(cubo.conteo('Tiene_Internet'))
+
+    print("\nAtención Previa del Gobierno:")
+    print(cubo.conteo('Atencion_Gobierno'))
+
+    print("\nZona Rural vs Urbana:")
+    print(cubo.conteo('Es_Zona_Rural'))
+
+    # ============================================
+    # 4. DETECCIÓN DE SESGOS ÉTICOS
+    # ============================================
+
+    traza.etapa('sesgos', filas=len(df_clean))
+
+    print("\n" + "="*60)
+    print("ANÁLISIS ÉTICO - DETECCIÓN DE SESGOS")
+    print("="*60)
+
+    # 4.1 Distribución de género
+    print("\nDistribución por Género:")
+    print(cubo.conteo('Género', normalize=True) * 100)
+
+    # 4.2 Edad promedio por categoría
+    print("\nEdad promedio por categoría de problema:")
+    print(cubo.edad_promedio('Categoría del problema').round(2))
+
+    # 4.3 Acceso a internet por zona
+    print("\nAcceso a internet por zona:")
+    print(cubo.tabla_cruzada('Es_Zona_Rural', 'Tiene_Internet', normalize='index') * 100)
+
+    # 4.4 Atención del gobierno por zona
+    print("\nAtención previa del gobierno por zona:")
+    print(cubo.tabla_cruzada('Es_Zona_Rural', 'Atencion_Gobierno', normalize='index') * 100)
+
+    # ============================================
+    # 5. INTEGRACIÓN DE GEMINI SIMULADO
+    # ============================================
+
+    traza.etapa('gemini_simulado')
+
+    print("\n" + "="*60)
+    print("INTEGRACIÓN DE GEMINI SIMULADO")
+    print("="*60)
+
+    # Inicializar Gemini simulado
+    gemini_ai = GeminiSimulation()
+
+    # 5.1 Clasificación con Gemini simulado sobre todo el corpus
+    print("\nClasificando comentarios con Gemini simulado...")
+    df_ml = df_clean[df_clean['Comentario'] != 'Sin comentario'].copy()
+
+    categories = df_clean['Categoría del problema'].unique().tolist()
+    print(f"Procesando corpus de {len(df_ml)} comentarios...")
+
+    # Clasificación y resumen por bloques en todos los núcleos, en el orden original
+    traza.registrar_filas(len(df_ml))
+    df_ml['Categoria_Gemini'], df_ml['Resumen_Gemini'], estadisticas_gemini = procesar_corpus(
+        df_ml['Comentario'], gemini_ai=gemini_ai)
+    print(f"[OK] {estadisticas_gemini['filas_por_segundo']:,.0f} comentarios/s "
+          f"({estadisticas_gemini['procesos']} procesos, {estadisticas_gemini['bloques']} bloques)")
+
+    # Tomar una muestra para la inspección manual
+    sample_size = min(100, len(df_ml))
+    df_sample = df_ml.sample(n=sample_size, random_state=42)
+
+    # Mostrar resultados de clasificación
+    print("\nResultados de clasificación con Gemini simulado:")
+    print(df_sample[['Comentario', 'Categoría del problema', 'Categoria_Gemini']].head(10))
+
+    # Mostrar resúmenes generados
+    print("\nResúmenes generados con Gemini simulado:")
+    for idx, row in df_sample.head(5).iterrows():
+        print(f"\nOriginal: {row['Comentario'][:100]}...")
+        print(f"Resumen: {row['Resumen_Gemini']}")
+
+    # ============================================
+    # 6. PREPARACIÓN PARA MACHINE LEARNING TRADICIONAL
+    # ============================================
+
+    traza.etapa('vectorizacion', filas=len(df_ml))
+
+    print("\n" + "="*60)
+    print("PREPARACIÓN PARA MACHINE LEARNING TRADICIONAL")
+    print("="*60)
+
+    # 6.1 Registros con comentarios válidos (df_ml ya filtrado en la sección 5)
+    print(f"\nRegistros con comentarios válidos: {len(df_ml)}")
+
+    # 6.2 Preparar datos para clasificación de categoría
+    X_text = df_ml['Comentario']
+    y_categoria = df_ml['Categoría del problema']
+
+    # 6.3 Vectorización TF-IDF
+    vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2), stop_words=None)
+    # El ajuste ve todas las filas (el IDF depende de la frecuencia de cada texto);
+    # la transformación se calcula una vez por texto único y se copia a sus filas
+    vectorizer.fit(X_text)
+    X_vectorized = transformar_deduplicado(vectorizer, X_text)
+
+    print(f"[OK] Textos vectorizados: {X_vectorized.shape}")
+
+    # Índice de reportes similares sobre los mismos vectores (ver indice_similitud.py)
+    ruta_indice = IndiceSimilitud.construir(df_ml, vectorizer).guardar()
+    print(f"[OK] Índice de similitud guardado: {ruta_indice}/")
+
+    # 6.4 División en entrenamiento y prueba
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_vectorized, y_categoria, test_size=0.2, random_state=42, stratify=y_categoria
+    )
+
+    print(f"[OK] Conjunto de entrenamiento: {X_train.shape}")
+    print(f"[OK] Conjunto de prueba: {X_test.shape}")
+
+    # ============================================
+    # 7. ENTRENAMIENTO DE MODELOS TRADICIONALES
+    # ============================================
+
+    traza.etapa('entrenamiento', filas=X_train.shape[0])
+
+    print("\n" + "="*60)
+    print("ENTRENAMIENTO DE MODELOS DE CLASIFICACIÓN")
+    print("="*60)
+
+    # Los modelos se entrenan a la vez en procesos que comparten la matriz TF-IDF
+    resultados_modelos = comparar_modelos({
+        'naive_bayes': MultinomialNB(),
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    }, X_train, y_train, X_test, y_test)
+    nb_model, nb_pred, nb_score = (resultados_modelos['naive_bayes'][c] for c in ('modelo', 'prediccion', 'precision'))
+    rf_model, rf_pred, rf_score = (resultados_modelos['random_forest'][c] for c in ('modelo', 'prediccion', 'precision'))
+
+    # 7.1 Modelo Naive Bayes
+    print("\n1. Naive Bayes Multinomial:")
+    print(f"   Precisión: {nb_score*100:.2f}%")
+    print("\n   Reporte de clasificación:")
+    print(classification_report(y_test, nb_pred))
+
+    # 7.2 Modelo Random Forest
+    print("\n2. Random Forest:")
+    print(f"   Precisión: {rf_score*100:.2f}%")
+    print("\n   Reporte de clasificación:")
+    print(classification_report(y_test, rf_pred))
+
+    # ============================================
+    # 8. PREDICCIONES DE EJEMPLO CON GEMINI SIMULADO
+    # ============================================
+
+    traza.etapa('prediccion')
+
+    print("\n" + "="*60)
+    print("EJEMPLOS DE PREDICCIÓN CON GEMINI SIMULADO")
+    print("="*60)
+
+    ejemplos = [
+        "necesitamos más médicos en el hospital",
+        "las calles están muy sucias y llenas de basura",
+        "no hay suficientes profesores en la escuela",
+        "hay mucha delincuencia en el barrio"
+    ]
+
+    print("\nPredicciones con modelos tradicionales vs Gemini simulado:\n")
+
+    for ejemplo in ejemplos:
+        print(f"Comentario: '{ejemplo}'")
+
+        # Predicción con Random Forest
+        ejemplo_vectorizado = vectorizer.transform([ejemplo])
+        prediccion_rf = rf_model.predict(ejemplo_vectorizado)[0]
+        print(f"Random Forest: {prediccion_rf}")
+
+        # Predicción con Gemini simulado
+        prediccion_gemini = gemini_ai.classify_with_gemini(ejemplo, categories)
+        print(f"Gemini Simulado: {prediccion_gemini}")
+
+        # Resumen con Gemini simulado
+        resumen = gemini_ai.summarize_with_gemini(ejemplo)
+        print(f"Resumen: {resumen}")
+
+        print("-" * 50)
+
+    # ============================================
+    # 9. ANÁLISIS COMPARATIVO
+    # ============================================
+
+    traza.etapa('comparacion', filas=len(df_ml))
+
+    print("\n" + "="*60)
+    print("ANÁLISIS COMPARATIVO DE MODELOS")
+    print("="*60)
+
+    # Comparar precisión de modelos
+    print("\nComparación de precisión:")
+    print(f"Random Forest: {rf_score*100:.2f}%")
+    print(f"Naive Bayes: {nb_score*100:.2f}%")
+
+    # Calcular precisión de Gemini simulado
+    gemini_correct = (df_ml['Categoria_Gemini'] == df_ml['Categoría del problema']).sum()
+    gemini_total = len(df_ml)
+    gemini_accuracy = gemini_correct / gemini_total
+    print(f"Gemini Simulado: {gemini_accuracy*100:.2f}%")
+
+    # Análisis de resúmenes generados
+    resumenes_validos = df_ml['Resumen_Gemini'].dropna()
+    print(f"\nResúmenes generados: {len(resumenes_validos)}")
+    if len(resumenes_validos) > 0:
+        print(f"Longitud promedio de resúmenes: {resumenes_validos.str.len().mean():.0f} caracteres")
+
+    # ============================================
+    # 10. VISUALIZACIONES PERFECTAS
+    # ============================================
+
+    traza.etapa('graficos', filas=len(df_clean))
+
+    print("\n" + "="*60)
+    print("GENERANDO VISUALIZACIONES PERFECTAS")
+    print("="*60)
+
+    # Las visualizaciones se dibujan desde agregados; si no cambiaron, se reutiliza la imagen anterior
+    precisiones_modelos = {
+        'Random Forest': rf_score*100,
+        'Naive Bayes': nb_score*100,
+        'Gemini Simulado': gemini_accuracy*100
+    }
+    agregados_figura = agregados_analisis(cubo, precisiones_modelos)
+
+    traza.etapa('guardado_figura')
+    render = renderizar({'analisis': agregados_figura})['analisis']
+    if render['estado'] == 'sin cambios':
+        print(f"[OK] Visualizaciones sin cambios: {render['ruta']}")
+
+    # ============================================
+    # 11. GUARDAR RESULTADOS Y MODELOS
+    # ============================================
+
+    traza.etapa('guardado', filas=len(df_clean))
+
+    print("\n" + "="*60)
+    print("GUARDANDO RESULTADOS")
+    print("="*60)
+
+    # Guardar dataset limpio
+    df_clean.to_csv('dataset_limpio_perfecto.csv', index=False, encoding='utf-8')
+    print("[OK] Dataset limpio guardado: dataset_limpio_perfecto.csv")
+
+    # Guardar muestra con clasificaciones de Gemini
+    df_sample.to_csv('muestra_clasificacion_perfecto.csv', index=False, encoding='utf-8')
+    print("[OK] Muestra con clasificaciones guardada: muestra_clasificacion_perfecto.csv")
+
+    # Guardar métricas en un archivo
+    with open('metricas_modelos_perfecto.txt', 'w', encoding='utf-8') as f:
+        f.write("MÉTRICAS DE LOS MODELOS CON IA GENERATIVA PERFECTA\n")
+        f.write("="*60 + "\n\n")
+        f.write(f"Random Forest - Precisión: {rf_score*100:.2f}%\n\n")
+        f.write("Reporte de clasificación:\n")
+        f.write(classification_report(y_test, rf_pred))
+        f.write("\n" + "="*60 + "\n\n")
+        f.write(f"Naive Bayes - Precisión: {nb_score*100:.2f}%\n\n")
+        f.write("Reporte de clasificación:\n")
+        f.write(classification_report(y_test, nb_pred))
+        f.write("\n" + "="*60 + "\n\n")
+        f.write(f"Gemini Simulado - Precisión: {gemini_accuracy*100:.2f}%\n\n")
+        f.write("INTEGRACIÓN DE IA GENERATIVA PERFECTA\n")
+        f.write("- Gemini Simulado: Clasificación y resumen avanzados\n")
+        f.write("- Análisis semántico contextual\n")
+        f.write("- Comparación con modelos tradicionales\n")
+        f.write(f"- Comentarios procesados: {len(df_ml)}\n")
+
+    print("[OK] Métricas guardadas: metricas_modelos_perfecto.txt")
+
+    # Guardar vectorizador y modelos como paquete versionado (ver predecir_osbra.py)
+    ruta_modelos = guardar_artefactos(
+        vectorizer,
+        {'random_forest': rf_model, 'naive_bayes': nb_model},
+        metricas={'random_forest': rf_score, 'naive_bayes': nb_score, 'gemini_simulado': gemini_accuracy},
+        modelo_principal='naive_bayes' if nb_score >= rf_score else 'random_forest'
+    )
+    print(f"[OK] Modelos guardados: {ruta_modelos}")
+
+    print("\n" + "="*60)
+    print("PROCESO COMPLETADO PERFECTAMENTE")
+    print("="*60)
+    print("\nResumen:")
+    print(f"- Registros procesados: {len(df_clean)}")
+    print(f"- Categorías: {df_clean['Categoría del problema'].nunique()}")
+    print(f"- Ciudades: {df_clean['Ciudad'].nunique()}")
+    print(f"- Mejor modelo tradicional: Naive Bayes ({nb_score*100:.2f}% precisión)")
+    print(f"- Gemini Simulado: {gemini_accuracy*100:.2f}% precisión")
+    print(f"- Comentarios procesados con IA: {gemini_total}")
+    print("\nArchivos generados:")
+    print("  1. dataset_limpio_perfecto.csv")
+    print("  2. muestra_clasificacion_perfecto.csv")
+    print("  3. metricas_modelos_perfecto.txt")
+    print("  4. analisis_osbra_perfecto.png")
+    print(f"  5. {ruta_modelos}/ (vectorizador y modelos)")
+    print(f"  6. {ruta_indice}/ (índice de reportes similares)")
+    print("\nFuncionalidades de IA generativa:")
+    print("  - Clasificación semántica avanzada con Gemini simulado")
+    print("  - Resumen inteligente contextual")
+    print("  - Comparación con modelos tradicionales")
+    print("  - Visualizaciones perfectas y profesionales")
+
+    traza.terminar()
+
+    return ruta_modelos
+
+if __name__ == "__main__":
+    main()
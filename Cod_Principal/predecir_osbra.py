@@ -0,0 +1,38 @@
+import argparse
+import sys
+import time
+
+from artefactos_modelo import DIRECTORIO_MODELOS, cargar_artefactos
+
+# ============================================
+# PREDICCIÓN RÁPIDA (SOLO CARGA, NUNCA ENTRENA)
+# ============================================
+
+
+def predecir(comentarios, paquete, modelo=None):
+    """Predice la categoría de una lista de comentarios con un paquete ya cargado"""
+    # transform no admite una lista vacía (stdin sin líneas, por ejemplo)
+    if len(comentarios) == 0:
+        return []
+    nombre = modelo or paquete['manifiesto']['modelo_principal']
+    X = paquete['vectorizer'].transform(comentarios)
+    return list(paquete['modelos'][nombre].predict(X))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Clasifica comentarios con los modelos OSBRA guardados')
+    parser.add_argument('comentarios', nargs='*', help='Comentarios a clasificar (por defecto se leen de stdin)')
+    parser.add_argument('--modelos', default=DIRECTORIO_MODELOS, help='Directorio de paquetes de modelos')
+    parser.add_argument('--version', default=None, help='Versión del paquete (por defecto la actual)')
+    parser.add_argument('--modelo', default=None, help='Modelo a usar (por defecto el principal)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    paquete = cargar_artefactos(args.modelos, args.version,
+                                modelos=[args.modelo] if args.modelo else 'principal')
+    carga_ms = (time.perf_counter() - inicio) * 1000
+    print(f"[OK] Paquete {paquete['manifiesto']['version']} cargado en {carga_ms:.0f} ms", file=sys.stderr)
+
+    comentarios = args.comentarios or [linea.strip() for linea in sys.stdin if linea.strip()]
+    for comentario, categoria in zip(comentarios, predecir(comentarios, paquete, args.modelo)):
+        print(f"{categoria}\t{comentario}")
@@ -0,0 +1,326 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# PRONÓSTICO DE DEMANDA POR CIUDAD, CATEGORÍA Y URGENCIA
+# ============================================
+
+# Incrementar cuando cambie el estado guardado: invalida los ajustes anteriores
+VERSION_PRONOSTICO = 2
+DIMENSIONES = ['Ciudad', 'Categoría del problema', 'Nivel de urgencia']
+ESTACIONALIDAD = {'M': 12, 'W': 52}
+ARREGLOS_ESTADO = ('nivel', 'tendencia', 'sse', 'historia', 'sse_estacional')
+# Malla de parámetros: beta = 0 es suavizado exponencial simple, beta > 0 es Holt (con tendencia)
+ALFAS = np.round(np.arange(0.1, 1.0, 0.1), 2)
+BETAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+MODELOS = ['suavizado_simple', 'holt', 'estacional_ingenuo']
+
+
+def matriz_series(df, frecuencia='M', dimensiones=DIMENSIONES, col_fecha='Fecha del reporte', col_peso=None):
+    """Conteos (series x periodos) con todos los periodos del rango, también los que no tienen reportes
+
+    df puede traer una fila por reporte con su fecha, o una fila por combinación con Año, Mes y
+    col_peso (la tabla del cubo de agregados, solo para frecuencia mensual).
+    """
+    if col_fecha in df:
+        periodo = pd.to_datetime(df[col_fecha]).dt.to_period(frecuencia)
+    else:
+        periodo = pd.Series(pd.PeriodIndex.from_fields(year=df['Año'], month=df['Mes'], freq='M'), index=df.index)
+    peso = pd.Series(1, index=df.index) if col_peso is None else df[col_peso]
+    claves = [df[d].astype(object) if isinstance(df[d].dtype, pd.CategoricalDtype) else df[d] for d in dimensiones]
+    validos = periodo.notna().to_numpy()
+    for clave in claves:
+        validos &= clave.notna().to_numpy()
+    conteos = (peso[validos].groupby([c[validos] for c in claves] + [periodo[validos]]).sum()
+               .unstack(fill_value=0))
+    periodos = pd.period_range(conteos.columns.min(), conteos.columns.max(), freq=frecuencia)
+    return conteos.reindex(columns=periodos, fill_value=0).astype(np.float64)
+
+
+def huellas_periodos(matriz):
+    """Hash de los conteos de cada periodo de la matriz: {periodo: hash}, sin importar el orden de las series"""
+    largo = matriz.stack()
+    largo = largo[largo != 0].reset_index()
+    periodo = largo.iloc[:, len(matriz.index.names)].astype(str).to_numpy()
+    hashes = pd.util.hash_pandas_object(largo.astype({largo.columns[-2]: str}), index=False).to_numpy()
+    # XOR de los hashes de cada celda no nula: no depende del orden de filas
+    huellas = pd.Series(hashes, dtype=np.uint64).groupby(periodo).agg(np.bitwise_xor.reduce)
+    return {str(c): format(int(huellas.get(str(c), 0)), '016x') for c in matriz.columns}
+
+
+class PronosticadorDemanda:
+    """Suavizado exponencial (simple y Holt) y estacional ingenuo ajustados a todas las series a la vez
+
+    Todo el estado son arreglos (combinaciones de parámetros x series): cada periodo nuevo es una
+    operación vectorizada sobre todas las series. El último periodo ajustado suele estar incompleto,
+    así que también se guarda el estado anterior a él: actualizar vuelve a ese estado y reajusta
+    desde el último periodo, y da el mismo resultado que reajustar con la historia completa siempre
+    que los periodos anteriores no cambien. Cada serie usa el modelo y los parámetros con menor
+    error cuadrático de pronóstico a un paso.
+    """
+
+    def __init__(self, claves, frecuencia='M'):
+        self.claves = claves
+        self.frecuencia = frecuencia
+        self.estacionalidad = ESTACIONALIDAD[frecuencia]
+        alfas, betas = np.meshgrid(ALFAS, BETAS, indexing='ij')
+        self.alfas = alfas.ravel()[:, None]
+        self.betas = betas.ravel()[:, None]
+        n = len(claves)
+        self.nivel = np.zeros((len(self.alfas), n))
+        self.tendencia = np.zeros((len(self.alfas), n))
+        self.sse = np.zeros((len(self.alfas), n))
+        # Últimos valores observados (el más antiguo primero) para el modelo estacional
+        self.historia = np.full((n, self.estacionalidad), np.nan)
+        self.sse_estacional = np.zeros(n)
+        self.observaciones = 0
+        self.ultimo_periodo = None
+        # Estado antes del último periodo ajustado, para reajustarlo cuando llegan más reportes
+        self.previo = None
+        # Huellas de los conteos ajustados ({periodo: hash}); las completa pronosticador_archivo
+        self.huellas = {}
+
+    @classmethod
+    def ajustar(cls, matriz, frecuencia='M'):
+        """Ajusta todas las series de matriz_series()"""
+        pronosticador = cls(matriz.index.to_frame(index=False), frecuencia)
+        pronosticador._avanzar(matriz.to_numpy(dtype=np.float64), matriz.columns[-1])
+        return pronosticador
+
+    def _avanzar(self, valores, ultimo_periodo):
+        """Incorpora columnas nuevas (series x periodos) en orden, un paso vectorizado por periodo"""
+        for i, y in enumerate(valores.T):
+            if i == valores.shape[1] - 1:
+                self.previo = self._estado()
+            if self.observaciones == 0:
+                self.nivel[:] = y
+            else:
+                error = y - (self.nivel + self.tendencia)
+                self.sse += error ** 2
+                self.nivel += self.tendencia + self.alfas * error
+                self.tendencia += self.alfas * self.betas * error
+            if self.observaciones >= self.estacionalidad:
+                self.sse_estacional += (y - self.historia[:, 0]) ** 2
+            self.historia = np.concatenate([self.historia[:, 1:], y[:, None]], axis=1)
+            self.observaciones += 1
+        self.ultimo_periodo = ultimo_periodo
+
+    def _estado(self):
+        estado = {nombre: getattr(self, nombre).copy() for nombre in ARREGLOS_ESTADO}
+        estado['observaciones'] = self.observaciones
+        return estado
+
+    def _restaurar(self, estado):
+        for nombre in ARREGLOS_ESTADO:
+            setattr(self, nombre, estado[nombre].copy())
+        self.observaciones = estado['observaciones']
+
+    def actualizar(self, matriz):
+        """Reajusta el último periodo y agrega los posteriores; las series nuevas empiezan con historia en cero
+
+        matriz debe incluir el último periodo ajustado con todos sus reportes, no solo los nuevos.
+        """
+        if self.ultimo_periodo not in matriz.columns:
+            raise ValueError(f"La matriz no incluye el último periodo ajustado ({self.ultimo_periodo})")
+        matriz = matriz.loc[:, matriz.columns >= self.ultimo_periodo]
+        periodos = pd.period_range(self.ultimo_periodo, matriz.columns.max(), freq=self.frecuencia)
+        self._restaurar(self.previo)
+        indice = pd.MultiIndex.from_frame(self.claves)
+        nuevas = matriz.index.difference(indice)
+        if len(nuevas):
+            self._agregar_series(nuevas)
+            indice = pd.MultiIndex.from_frame(self.claves)
+        matriz = matriz.reindex(index=indice, columns=periodos, fill_value=0)
+        self._avanzar(matriz.to_numpy(dtype=np.float64), periodos[-1])
+        return self
+
+    def _agregar_series(self, nuevas):
+        """Series sin reportes hasta ahora: su estado es el de una historia de ceros"""
+        n = len(nuevas)
+        self.claves = pd.concat([self.claves, nuevas.to_frame(index=False, name=list(self.claves.columns))],
+                                ignore_index=True)
+        ceros = np.zeros((len(self.alfas), n))
+        self.nivel = np.hstack([self.nivel, ceros])
+        self.tendencia = np.hstack([self.tendencia, ceros])
+        self.sse = np.hstack([self.sse, ceros])
+        historia = np.full((n, self.estacionalidad), np.nan)
+        historia[:, max(0, self.estacionalidad - self.observaciones):] = 0
+        self.historia = np.vstack([self.historia, historia])
+        self.sse_estacional = np.concatenate([self.sse_estacional, np.zeros(n)])
+        self.previo = None
+
+    # ------------------------------------------------------------
+    # Selección y pronóstico
+    # ------------------------------------------------------------
+
+    def seleccion(self):
+        """Modelo, parámetros y error cuadrático medio elegidos para cada serie"""
+        pasos = max(self.observaciones - 1, 1)
+        simple = (self.betas[:, 0] == 0)
+        mse = self.sse / pasos
+        mejor_simple = np.flatnonzero(simple)[mse[simple].argmin(axis=0)]
+        mejor_holt = np.flatnonzero(~simple)[mse[~simple].argmin(axis=0)]
+        columnas = np.arange(mse.shape[1])
+        pasos_estacional = self.observaciones - self.estacionalidad
+        candidatos = np.vstack([
+            mse[mejor_simple, columnas],
+            mse[mejor_holt, columnas],
+            self.sse_estacional / pasos_estacional if pasos_estacional > 0 else np.full(len(columnas), np.inf)
+        ])
+        modelo = candidatos.argmin(axis=0)
+        combinacion = np.where(modelo == 1, mejor_holt, mejor_simple)
+        return pd.DataFrame({
+            'modelo': np.array(MODELOS, dtype=object)[modelo],
+            'alfa': self.alfas[combinacion, 0],
+            'beta': np.where(modelo == 1, self.betas[combinacion, 0], 0.0),
+            'mse': candidatos[modelo, columnas],
+            '_combinacion': combinacion
+        })
+
+    def pronosticar(self, horizonte=3):
+        """Conteo esperado por serie para los próximos periodos (columnas), con el modelo de cada serie"""
+        elegidos = self.seleccion()
+        columnas = np.arange(len(elegidos))
+        combinacion = elegidos['_combinacion'].to_numpy()
+        nivel = self.nivel[combinacion, columnas][:, None]
+        tendencia = self.tendencia[combinacion, columnas][:, None]
+        pasos = np.arange(1, horizonte + 1)[None, :]
+
+        modelo = elegidos['modelo'].to_numpy()[:, None]
+        suavizado = nivel + np.where(modelo == 'holt', tendencia * pasos, 0.0)
+        estacional = self.historia[:, (pasos[0] - 1) % self.estacionalidad]
+        pronostico = np.where(modelo == 'estacional_ingenuo', estacional, suavizado)
+        periodos = pd.period_range(self.ultimo_periodo + 1, periods=horizonte, freq=self.frecuencia)
+        return pd.DataFrame(np.clip(pronostico, 0, None), index=pd.MultiIndex.from_frame(self.claves),
+                            columns=periodos)
+
+    # ------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------
+
+    def guardar(self, prefijo):
+        os.makedirs(os.path.dirname(prefijo) or '.', exist_ok=True)
+        arreglos = {nombre: getattr(self, nombre) for nombre in ARREGLOS_ESTADO}
+        arreglos.update({f'previo_{nombre}': self.previo[nombre] for nombre in ARREGLOS_ESTADO})
+        np.savez(prefijo + '.npz', **arreglos)
+        metadatos = {'version': VERSION_PRONOSTICO, 'frecuencia': self.frecuencia,
+                     'observaciones': self.observaciones, 'ultimo_periodo': str(self.ultimo_periodo),
+                     'observaciones_previas': self.previo['observaciones'], 'huellas': self.huellas,
+                     'dimensiones': list(self.claves.columns), 'claves': self.claves.values.tolist()}
+        # Los metadatos se escriben al final: marcan el ajuste como completo
+        with open(prefijo + '.json', 'w', encoding='utf-8') as f:
+            json.dump(metadatos, f, ensure_ascii=False)
+
+    @classmethod
+    def leer(cls, prefijo):
+        """Ajuste guardado, o None si no existe o es de otra versión"""
+        if not os.path.exists(prefijo + '.json'):
+            return None
+        with open(prefijo + '.json', encoding='utf-8') as f:
+            metadatos = json.load(f)
+        if metadatos['version'] != VERSION_PRONOSTICO:
+            return None
+        pronosticador = cls(pd.DataFrame(metadatos['claves'], columns=metadatos['dimensiones']),
+                            metadatos['frecuencia'])
+        with np.load(prefijo + '.npz') as arreglos:
+            pronosticador._restaurar({**{nombre: arreglos[nombre] for nombre in ARREGLOS_ESTADO},
+                                      'observaciones': metadatos['observaciones']})
+            pronosticador.previo = {nombre: arreglos[f'previo_{nombre}'] for nombre in ARREGLOS_ESTADO}
+        pronosticador.previo['observaciones'] = metadatos['observaciones_previas']
+        pronosticador.huellas = metadatos['huellas']
+        pronosticador.ultimo_periodo = pd.Period(metadatos['ultimo_periodo'], freq=metadatos['frecuencia'])
+        return pronosticador
+
+
+def _continua_historia(pronosticador, huellas):
+    """True si los conteos anteriores al último periodo ajustado no cambiaron (el archivo solo creció)"""
+    def anteriores(h):
+        return {p: v for p, v in h.items() if pd.Period(p, freq=pronosticador.frecuencia) < pronosticador.ultimo_periodo}
+    return (str(pronosticador.ultimo_periodo) in huellas
+            and anteriores(huellas) == anteriores(pronosticador.huellas))
+
+
+def pronosticador_archivo(ruta='dataset.csv', frecuencia='M', reajustar=False):
+    """Ajuste guardado en la cache actualizado con los periodos nuevos del archivo, o uno nuevo
+
+    Retorna (pronosticador, matriz, periodos_nuevos); periodos_nuevos es None si se ajustó desde cero.
+    """
+    from limpieza import DIRECTORIO_CACHE, cargar_datos_limpios
+
+    df_clean, _ = cargar_datos_limpios(ruta)
+    matriz = matriz_series(df_clean, frecuencia)
+    huellas = huellas_periodos(matriz)
+    prefijo = os.path.join(os.path.dirname(ruta) or '.', DIRECTORIO_CACHE,
+                           f"{os.path.splitext(os.path.basename(ruta))[0]}_pronostico_{frecuencia}")
+    pronosticador = None if reajustar else PronosticadorDemanda.leer(prefijo)
+    if pronosticador is not None and _continua_historia(pronosticador, huellas):
+        nuevos = int((matriz.columns > pronosticador.ultimo_periodo).sum())
+        pronosticador.actualizar(matriz)
+    else:
+        pronosticador, nuevos = PronosticadorDemanda.ajustar(matriz, frecuencia), None
+    pronosticador.huellas = huellas
+    pronosticador.guardar(prefijo)
+    return pronosticador, matriz, nuevos
+
+
+def series_sinteticas(n_series, periodos=104, frecuencia='W', semilla=42):
+    """Matriz de conteos Poisson con tendencia y estacionalidad anual para medir tiempos"""
+    rng = np.random.default_rng(semilla)
+    m = ESTACIONALIDAD[frecuencia]
+    t = np.arange(periodos)[None, :]
+    base = rng.gamma(2.0, 10.0, (n_series, 1))
+    tasa = base * (1 + rng.normal(0, 0.003, (n_series, 1)) * t) * (1 + 0.3 * np.sin(2 * np.pi * t / m))
+    # 8 series por ciudad: 4 categorías x 2 niveles de urgencia
+    i = np.arange(n_series)
+    indice = pd.MultiIndex.from_arrays([[f"Ciudad {c:04d}" for c in i // 8],
+                                        np.array(['Salud', 'Educación', 'Seguridad', 'Medio Ambiente'])[i % 4],
+                                        np.array(['Urgente', 'No urgente'])[(i // 4) % 2]],
+                                       names=DIMENSIONES)
+    columnas = pd.period_range('2023-01-01', periods=periodos, freq=frecuencia)
+    return pd.DataFrame(rng.poisson(np.clip(tasa, 0, None)).astype(np.float64), index=indice, columns=columnas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pronóstico de reportes por ciudad, categoría y urgencia')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--frecuencia', choices=sorted(ESTACIONALIDAD), default='M')
+    parser.add_argument('--horizonte', type=int, default=3)
+    parser.add_argument('--sintetico', type=int, default=0, metavar='SERIES',
+                        help='Medir con N series sintéticas en lugar del archivo')
+    parser.add_argument('--reajustar', action='store_true', help='Ignorar el ajuste guardado')
+    parser.add_argument('--salida', default=None, help='CSV con el pronóstico')
+    args = parser.parse_args()
+
+    if args.sintetico:
+        matriz = series_sinteticas(args.sintetico, frecuencia=args.frecuencia)
+        inicio = time.perf_counter()
+        pronosticador, nuevos = PronosticadorDemanda.ajustar(matriz, args.frecuencia), None
+    else:
+        inicio = time.perf_counter()
+        pronosticador, matriz, nuevos = pronosticador_archivo(args.archivo, args.frecuencia, args.reajustar)
+    pronostico = pronosticador.pronosticar(args.horizonte)
+    segundos = time.perf_counter() - inicio
+    origen = "ajustado" if nuevos is None else f"actualizado con {nuevos} periodos nuevos"
+    print(f"[OK] {len(pronostico):,} series x {pronosticador.observaciones} periodos {origen} "
+          f"en {segundos*1000:.0f} ms")
+    print("\nModelo elegido por serie:")
+    print(pronosticador.seleccion()['modelo'].value_counts())
+
+    # Validación: ajustar sin los últimos periodos y comparar con lo observado
+    prueba = matriz.iloc[:, -args.horizonte:]
+    retenido = PronosticadorDemanda.ajustar(matriz.iloc[:, :-args.horizonte], args.frecuencia)
+    error = (retenido.pronosticar(args.horizonte).to_numpy() - prueba.to_numpy())
+    ingenuo = prueba.to_numpy() - matriz.iloc[:, [-args.horizonte - 1]].to_numpy()
+    print(f"\n[OK] Error absoluto medio en los últimos {args.horizonte} periodos: {np.abs(error).mean():.2f} "
+          f"(último valor repetido: {np.abs(ingenuo).mean():.2f})")
+
+    print("\nPronóstico total de reportes por periodo:")
+    print(pronostico.sum().round(0))
+    if args.salida:
+        pronostico.to_csv(args.salida, encoding='utf-8')
+        print(f"[OK] Pronóstico guardado: {args.salida}")
@@ -1,8 +1,6 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
+from instrumentacion import traza
+from types import MappingProxyType
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -10,6 +8,20 @@ warnings.filterwarnings('ignore')
 # PROTOTIPO INTERACTIVO DE SOLUCIONES OSBRA
 # ============================================
 
+# Factor ciudad (ciudades con más problemas)
+CIUDADES_PRIORITARIAS = ['Bogotá', 'Manizales', 'Medellín']
+
+# Ajuste de personal según el nivel de prioridad
+MULTIPLICADORES_PRIORIDAD = {'critica': 1.5, 'alta': 1.2}
+
+def congelar(valor):
+    """Copia inmutable y compartible: dict -> MappingProxyType, list -> tuple"""
+    if isinstance(valor, dict):
+        return MappingProxyType({clave: congelar(v) for clave, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    return valor
+
 class OSBRASolutionsGenerator:
     """Generador de soluciones automáticas para problemas ciudadanos"""
     
@@ -17,6 +29,10 @@ class OSBRASolutionsGenerator:
         self.soluciones_db = self._cargar_base_soluciones()
         self.prioridades = self._definir_prioridades()
         self.recursos = self._calcular_recursos()
+        # Soluciones, recursos y planes solo dependen de (categoría, nivel):
+        # se construyen una vez y se comparten como vistas de solo lectura
+        self.tabla_planes = self._precalcular_tabla_planes()
+        self._prioridades_internas = {}
     
     def _cargar_base_soluciones(self):
         """Base de datos de soluciones por categoría"""
@@ -129,15 +145,16 @@ class OSBRASolutionsGenerator:
             }
         }
     
-    def analizar_problema(self, comentario, categoria, urgencia, ciudad):
+    def analizar_problema(self, comentario, categoria, urgencia, ciudad, mostrar=True):
         """Analiza un problema y genera soluciones automáticas"""
-        print(f"\n{'='*80}")
-        print(f"ANÁLISIS AUTOMÁTICO DE PROBLEMA CIUDADANO")
-        print(f"{'='*80}")
-        print(f"Comentario: '{comentario}'")
-        print(f"Categoría: {categoria}")
-        print(f"Urgencia: {urgencia}")
-        print(f"Ciudad: {ciudad}")
+        if mostrar:
+            print(f"\n{'='*80}")
+            print(f"ANÁLISIS AUTOMÁTICO DE PROBLEMA CIUDADANO")
+            print(f"{'='*80}")
+            print(f"Comentario: '{comentario}'")
+            print(f"Categoría: {categoria}")
+            print(f"Urgencia: {urgencia}")
+            print(f"Ciudad: {ciudad}")
         
         # Calcular prioridad
         prioridad = self._calcular_prioridad(categoria, urgencia, ciudad)
@@ -151,13 +168,93 @@ class OSBRASolutionsGenerator:
         # Generar plan de acción
         plan = self._generar_plan_accion(categoria, prioridad, ciudad)
         
+        entrada = self.tabla_planes.get((categoria, prioridad['nivel']))
+        
         return {
             'prioridad': prioridad,
             'soluciones': soluciones,
             'recursos': recursos,
-            'plan': plan
+            'plan': plan,
+            'plan_id': entrada['plan_id'] if entrada else None
         }
     
+    def _precalcular_tabla_planes(self):
+        """Tabla congelada (categoría, nivel) -> soluciones, recursos y plan compartidos"""
+        tabla = {}
+        for categoria in self.soluciones_db:
+            plan = congelar(self._construir_plan_accion(categoria))
+            for nivel in self.prioridades:
+                prioridad = {'nivel': nivel}
+                tabla[(categoria, nivel)] = MappingProxyType({
+                    'plan_id': f"{categoria}:{nivel}",
+                    'categoria': categoria,
+                    'nivel': nivel,
+                    'soluciones': congelar(self._construir_soluciones(categoria, prioridad)),
+                    'recursos': congelar(self._construir_recursos_necesarios(categoria, prioridad)),
+                    'plan': plan
+                })
+        return tabla
+    
+    def obtener_plan(self, plan_id):
+        """Entrada compartida de la tabla de planes a partir de su identificador"""
+        categoria, nivel = plan_id.rsplit(':', 1)
+        return self.tabla_planes[(categoria, nivel)]
+    
+    def analizar_lote(self, df, col_categoria='Categoría del problema',
+                      col_urgencia='Nivel de urgencia', col_ciudad='Ciudad'):
+        """Calcula prioridad, recursos y presupuesto de todos los reportes en una pasada, sin imprimir"""
+        import numpy as np
+        import pandas as pd
+
+        categoria = df[col_categoria].astype(object)
+        score, nivel = self.niveles_lote(df, col_urgencia, col_ciudad)
+        niveles = list(self.prioridades)
+        tiempo_respuesta = {n: c['tiempo_respuesta'] for n, c in self.prioridades.items()}
+
+        resultado = pd.DataFrame({
+            'prioridad_score': score,
+            'prioridad_nivel': pd.Categorical(nivel, categories=niveles),
+            'tiempo_respuesta': pd.Series(nivel).map(tiempo_respuesta).to_numpy(),
+            'presupuesto': categoria.map({c: d['presupuesto_estimado'] for c, d in self.soluciones_db.items()}).to_numpy(),
+            'tiempo_implementacion': categoria.map({c: d['tiempo_implementacion'] for c, d in self.soluciones_db.items()}).to_numpy()
+        }, index=df.index)
+
+        # Personal escalado: una columna por cargo, 0 si la categoría no lo usa
+        multiplicador = pd.Series(nivel).map(MULTIPLICADORES_PRIORIDAD).fillna(1.0).to_numpy()
+        resultado['multiplicador'] = multiplicador
+        personal_total = np.zeros(len(df), dtype=np.int64)
+        for cargo in self._cargos():
+            base = categoria.map({c: p.get(cargo, 0) for c, p in self.recursos['personal_requerido'].items()})
+            escalado = (base.fillna(0).to_numpy(dtype=np.float64) * multiplicador).astype(np.int64)
+            resultado[f'personal_{cargo}'] = escalado
+            personal_total += escalado
+        resultado['personal_total'] = personal_total
+
+        # Referencia a la entrada compartida de la tabla de planes
+        plan_ids = [entrada['plan_id'] for entrada in self.tabla_planes.values()]
+        resultado['plan_id'] = pd.Categorical(
+            categoria.astype(str).str.cat(pd.Series(nivel, index=df.index), sep=':'), categories=plan_ids
+        )
+        return resultado
+
+    def niveles_lote(self, df, col_urgencia='Nivel de urgencia', col_ciudad='Ciudad'):
+        """Score y nivel de prioridad de cada reporte: mismas reglas que _calcular_prioridad, como columnas"""
+        import numpy as np
+
+        score = (0.5
+                 + np.where((df[col_urgencia] == 'Urgente').to_numpy(), 0.3, 0.1)
+                 + np.where(df[col_ciudad].isin(CIUDADES_PRIORITARIAS).to_numpy(), 0.2, 0.0))
+        niveles = list(self.prioridades)
+        nivel = np.select([score >= self.prioridades[n]['score_min'] for n in niveles], niveles, default='baja')
+        return score, nivel
+
+    def _cargos(self):
+        """Todos los cargos de personal, en orden de aparición"""
+        cargos = []
+        for personal in self.recursos['personal_requerido'].values():
+            cargos.extend(c for c in personal if c not in cargos)
+        return cargos
+
     def _calcular_prioridad(self, categoria, urgencia, ciudad):
         """Calcula la prioridad del problema"""
         score = 0.5  # Base
@@ -169,11 +266,17 @@ class OSBRASolutionsGenerator:
             score += 0.1
         
         # Factor ciudad (ciudades con más problemas)
-        ciudades_prioritarias = ['Bogotá', 'Manizales', 'Medellín']
-        if ciudad in ciudades_prioritarias:
+        if ciudad in CIUDADES_PRIORITARIAS:
             score += 0.2
         
-        # Determinar nivel de prioridad
+        # Solo existen unos pocos scores posibles: se reutiliza el mismo objeto
+        prioridad = self._prioridades_internas.get(score)
+        if prioridad is None:
+            prioridad = self._prioridades_internas[score] = congelar(self._nivel_prioridad(score))
+        return prioridad
+    
+    def _nivel_prioridad(self, score):
+        """Determina el nivel de prioridad para un score"""
         for nivel, config in self.prioridades.items():
             if score >= config['score_min']:
                 return {
@@ -191,6 +294,13 @@ class OSBRASolutionsGenerator:
         }
     
     def _generar_soluciones(self, categoria, prioridad):
+        """Soluciones específicas para la categoría (vista compartida de solo lectura)"""
+        entrada = self.tabla_planes.get((categoria, prioridad['nivel']))
+        if entrada is not None:
+            return entrada['soluciones']
+        return self._construir_soluciones(categoria, prioridad)
+    
+    def _construir_soluciones(self, categoria, prioridad):
         """Genera soluciones específicas para la categoría"""
         if categoria not in self.soluciones_db:
             return {'error': 'Categoría no reconocida'}
@@ -211,6 +321,13 @@ class OSBRASolutionsGenerator:
         }
     
     def _calcular_recursos_necesarios(self, categoria, prioridad):
+        """Recursos necesarios para la categoría y prioridad (vista compartida de solo lectura)"""
+        entrada = self.tabla_planes.get((categoria, prioridad['nivel']))
+        if entrada is not None:
+            return entrada['recursos']
+        return self._construir_recursos_necesarios(categoria, prioridad)
+    
+    def _construir_recursos_necesarios(self, categoria, prioridad):
         """Calcula recursos necesarios para implementar soluciones"""
         if categoria not in self.recursos['personal_requerido']:
             return {'error': 'Categoría no reconocida'}
@@ -219,11 +336,7 @@ class OSBRASolutionsGenerator:
         infraestructura = self.recursos['infraestructura'][categoria].copy()
         
         # Ajustar según prioridad
-        multiplicador = 1.0
-        if prioridad['nivel'] == 'critica':
-            multiplicador = 1.5
-        elif prioridad['nivel'] == 'alta':
-            multiplicador = 1.2
+        multiplicador = MULTIPLICADORES_PRIORIDAD.get(prioridad['nivel'], 1.0)
         
         for cargo in personal:
             personal[cargo] = int(personal[cargo] * multiplicador)
@@ -235,6 +348,13 @@ class OSBRASolutionsGenerator:
         }
     
     def _generar_plan_accion(self, categoria, prioridad, ciudad):
+        """Plan de acción detallado (vista compartida de solo lectura)"""
+        entrada = self.tabla_planes.get((categoria, prioridad['nivel']))
+        if entrada is not None:
+            return entrada['plan']
+        return self._construir_plan_accion(categoria)
+    
+    def _construir_plan_accion(self, categoria):
         """Genera un plan de acción detallado"""
         return {
             'fase_1_inmediata': {
@@ -302,16 +422,34 @@ class OSBRASolutionsGenerator:
         
         return resumen_categorias
 
-def crear_dashboard_soluciones():
+def agregados_dashboard_soluciones():
+    """Datos que dibuja el dashboard de soluciones"""
+    # Datos de ejemplo
+    return {
+        'categorias': ['Salud', 'Educación', 'Seguridad', 'Medio Ambiente'],
+        'problemas': [2515, 2509, 2540, 2436],
+        'presupuestos': [500, 300, 400, 200],  # millones COP
+        'prioridades': [45, 35, 60, 25],  # % críticos
+        'fases': ['Inmediata\n(0-48h)', 'Corto Plazo\n(1-4 sem)', 'Mediano Plazo\n(1-6 mes)'],
+        'cobertura': [80, 60, 40]  # % de problemas cubiertos
+    }
+
+@traza.medir('dashboard_soluciones')
+def crear_dashboard_soluciones(ruta='prototipo_soluciones_osbra.png', dpi=300):
     """Crea un dashboard visual de las soluciones generadas"""
+    dibujar_dashboard_soluciones(agregados_dashboard_soluciones(), ruta, dpi)
+
+def dibujar_dashboard_soluciones(agregados, ruta='prototipo_soluciones_osbra.png', dpi=300):
+    """Dibuja el dashboard de soluciones a partir de los agregados precalculados"""
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('OSBRA - PROTOTIPO DE SOLUCIONES AUTOMÁTICAS', fontsize=16, fontweight='bold')
     
-    # Datos de ejemplo
-    categorias = ['Salud', 'Educación', 'Seguridad', 'Medio Ambiente']
-    problemas = [2515, 2509, 2540, 2436]
-    presupuestos = [500, 300, 400, 200]  # millones COP
-    prioridades = [45, 35, 60, 25]  # % críticos
+    categorias = agregados['categorias']
+    problemas = agregados['problemas']
+    presupuestos = agregados['presupuestos']
+    prioridades = agregados['prioridades']
     
     # 1. Distribución de problemas
     axes[0,0].bar(categorias, problemas, color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'])
@@ -333,8 +471,8 @@ def crear_dashboard_soluciones():
     axes[1,0].set_title('Problemas Críticos por Categoría', fontweight='bold')
     
     # 4. Timeline de implementación
-    fases = ['Inmediata\n(0-48h)', 'Corto Plazo\n(1-4 sem)', 'Mediano Plazo\n(1-6 mes)']
-    cobertura = [80, 60, 40]  # % de problemas cubiertos
+    fases = agregados['fases']
+    cobertura = agregados['cobertura']
     axes[1,1].bar(fases, cobertura, color=['#FF4444', '#FFAA44', '#44AA44'])
     axes[1,1].set_title('Cobertura por Fase de Implementación', fontweight='bold')
     axes[1,1].set_ylabel('Problemas Cubiertos (%)')
@@ -343,8 +481,9 @@ def crear_dashboard_soluciones():
         axes[1,1].text(i, v + 2, f'{v}%', ha='center', va='bottom', fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig('prototipo_soluciones_osbra.png', dpi=300, bbox_inches='tight')
-    print("[OK] Dashboard de soluciones guardado: prototipo_soluciones_osbra.png")
+    plt.savefig(ruta, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"[OK] Dashboard de soluciones guardado: {ruta}")
 
 def demostrar_prototipo():
     """Demuestra el funcionamiento del prototipo de soluciones"""
@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from artefactos_modelo import ARCHIVO_MANIFIESTO, DIRECTORIO_MODELOS, ruta_paquete
+
+# ============================================
+# RENDER RÁPIDO E INCREMENTAL DE DASHBOARDS
+# ============================================
+
+DPI_FINAL = 300
+DPI_PREVIA = 72
+ARCHIVO_ESTADO = 'render_dashboards.json'
+
+# figura -> (módulo, función de dibujo, archivo de salida)
+FIGURAS = {
+    'dashboard_final': ('DASHBOARD_FINAL_OSBRA', 'dibujar_dashboard_final', 'DASHBOARD_FINAL_OSBRA.png'),
+    'soluciones': ('prototipo_soluciones_interactivo', 'dibujar_dashboard_soluciones', 'prototipo_soluciones_osbra.png'),
+    'analisis': ('render_dashboards', 'dibujar_analisis_osbra', 'analisis_osbra_perfecto.png')
+}
+
+
+def agregados_analisis(cubo, precisiones):
+    """Conteos de la figura de análisis (sección 10) y precisión de cada modelo en %"""
+    categoria_counts = cubo.conteo('Categoría del problema')
+    urgencia_counts = cubo.conteo('Nivel de urgencia')
+    internet_por_zona = cubo.tabla_cruzada('Es_Zona_Rural', 'Tiene_Internet')
+    return {
+        'categorias': {'etiquetas': categoria_counts.index.tolist(), 'valores': categoria_counts.tolist()},
+        'urgencia': {'etiquetas': urgencia_counts.index.tolist(), 'valores': urgencia_counts.tolist()},
+        'internet_por_zona': {'indice': internet_por_zona.index.tolist(),
+                              'columnas': internet_por_zona.columns.tolist(),
+                              'valores': internet_por_zona.values.tolist()},
+        'precisiones': {nombre: round(float(valor), 6) for nombre, valor in precisiones.items()}
+    }
+
+
+def dibujar_analisis_osbra(agregados, ruta='analisis_osbra_perfecto.png', dpi=DPI_FINAL):
+    """Figura 2x2 de la sección 10 a partir de los agregados precalculados"""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    # Configuración de visualización
+    plt.style.use('default')
+    sns.set_palette("Set2")
+
+    fig, axes = plt.subplots(2, 2, figsize=(18, 14))
+    fig.suptitle('Análisis Avanzado de Comentarios Ciudadanos con IA Generativa',
+                 fontsize=18, fontweight='bold', y=0.98)
+
+    # 1. Distribución de categorías
+    categoria_counts = pd.Series(agregados['categorias']['valores'], index=agregados['categorias']['etiquetas'])
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
+    bars = axes[0,0].bar(range(len(categoria_counts)), categoria_counts.values, color=colors, alpha=0.8)
+    axes[0,0].set_title('Distribución de Categorías de Problemas', fontsize=16, fontweight='bold', pad=20)
+    axes[0,0].set_xlabel('Categoría', fontsize=14, fontweight='bold')
+    axes[0,0].set_ylabel('Cantidad de Reportes', fontsize=14, fontweight='bold')
+    axes[0,0].set_xticks(range(len(categoria_counts)))
+    axes[0,0].set_xticklabels(categoria_counts.index, rotation=45, ha='right', fontsize=12)
+    axes[0,0].grid(True, alpha=0.3, axis='y')
+    axes[0,0].set_ylim(0, max(categoria_counts.values) * 1.1)
+    for bar in bars:
+        height = bar.get_height()
+        axes[0,0].text(bar.get_x() + bar.get_width()/2., height + 20,
+                       f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+
+    # 2. Distribución por urgencia
+    axes[0,1].pie(agregados['urgencia']['valores'],
+                  labels=agregados['urgencia']['etiquetas'],
+                  autopct='%1.1f%%',
+                  colors=['#FF9999', '#66B2FF'],
+                  startangle=90,
+                  textprops={'fontsize': 12, 'fontweight': 'bold'})
+    axes[0,1].set_title('Distribución por Nivel de Urgencia', fontsize=16, fontweight='bold', pad=20)
+
+    # 3. Acceso a internet por zona
+    internet_por_zona = pd.DataFrame(agregados['internet_por_zona']['valores'],
+                                     index=pd.Index(agregados['internet_por_zona']['indice'], name='Es_Zona_Rural'),
+                                     columns=pd.Index(agregados['internet_por_zona']['columnas'], name='Tiene_Internet'))
+    internet_por_zona.plot(kind='bar', ax=axes[1,0], color=['#FFB6C1', '#98FB98'], alpha=0.8)
+    axes[1,0].set_title('Acceso a Internet por Zona', fontsize=16, fontweight='bold', pad=20)
+    axes[1,0].set_xlabel('Zona Rural', fontsize=14, fontweight='bold')
+    axes[1,0].set_ylabel('Cantidad de Personas', fontsize=14, fontweight='bold')
+    axes[1,0].legend(['Sin Internet', 'Con Internet'], title='Acceso a Internet', fontsize=12)
+    axes[1,0].tick_params(axis='x', rotation=0, labelsize=12)
+    axes[1,0].grid(True, alpha=0.3, axis='y')
+
+    # 4. Comparación de precisión de modelos
+    modelos = list(agregados['precisiones'])
+    precisiones = list(agregados['precisiones'].values())
+    bars = axes[1,1].bar(modelos, precisiones, color=['#FF6B6B', '#4ECDC4', '#FFD93D'], alpha=0.8)
+    axes[1,1].set_title('Comparación de Precisión de Modelos', fontsize=16, fontweight='bold', pad=20)
+    axes[1,1].set_ylabel('Precisión (%)', fontsize=14, fontweight='bold')
+    axes[1,1].set_ylim(0, max(precisiones) * 1.2)
+    axes[1,1].grid(True, alpha=0.3, axis='y')
+    axes[1,1].tick_params(axis='x', rotation=45, labelsize=12)
+    for bar in bars:
+        height = bar.get_height()
+        axes[1,1].text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                       f'{height:.1f}%', ha='center', va='bottom', fontweight='bold', fontsize=11)
+
+    plt.tight_layout()
+    plt.savefig(ruta, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"[OK] Visualizaciones perfectas guardadas: {ruta}")
+
+
+def huella_agregados(figura, agregados, dpi):
+    """Hash estable de todo lo que determina el contenido de una figura"""
+    contenido = json.dumps({'figura': figura, 'dpi': dpi, 'agregados': agregados},
+                           sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def _dibujar(figura, agregados, ruta, dpi):
+    """Trabajo de cada proceso: importa solo el módulo de la figura y la guarda"""
+    import matplotlib
+    matplotlib.use('Agg')
+    modulo, funcion, _ = FIGURAS[figura]
+    inicio = time.perf_counter()
+    getattr(importlib.import_module(modulo), funcion)(agregados, ruta, dpi)
+    return time.perf_counter() - inicio
+
+
+def _leer_estado(ruta):
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def renderizar(agregados_por_figura, directorio='.', previa=False, forzar=False, n_procesos=None):
+    """Dibuja solo las figuras cuyos agregados cambiaron, en procesos paralelos
+
+    previa=True usa DPI_PREVIA y escribe '<archivo>_previa.png' sin tocar las figuras finales.
+    Retorna {figura: {'ruta', 'estado', 'segundos'}}.
+    """
+    from limpieza import DIRECTORIO_CACHE
+
+    dpi = DPI_PREVIA if previa else DPI_FINAL
+    ruta_estado = os.path.join(directorio, DIRECTORIO_CACHE, ARCHIVO_ESTADO)
+    estado = _leer_estado(ruta_estado)
+
+    pendientes, resultados = {}, {}
+    for figura, agregados in agregados_por_figura.items():
+        archivo = FIGURAS[figura][2]
+        if previa:
+            archivo = archivo.replace('.png', '_previa.png')
+        ruta = os.path.join(directorio, archivo)
+        huella = huella_agregados(figura, agregados, dpi)
+        if not forzar and estado.get(ruta) == huella and os.path.exists(ruta):
+            resultados[figura] = {'ruta': ruta, 'estado': 'sin cambios', 'segundos': 0.0}
+        else:
+            pendientes[figura] = (ruta, huella)
+
+    if len(pendientes) == 1 or n_procesos == 1:
+        # Una sola figura no justifica crear procesos
+        duraciones = {figura: _dibujar(figura, agregados_por_figura[figura], ruta, dpi)
+                      for figura, (ruta, _) in pendientes.items()}
+    elif pendientes:
+        with ProcessPoolExecutor(max_workers=n_procesos or min(len(pendientes), os.cpu_count() or 1)) as ejecutor:
+            futuros = {figura: ejecutor.submit(_dibujar, figura, agregados_por_figura[figura], ruta, dpi)
+                       for figura, (ruta, _) in pendientes.items()}
+            duraciones = {figura: futuro.result() for figura, futuro in futuros.items()}
+    else:
+        duraciones = {}
+
+    for figura, (ruta, huella) in pendientes.items():
+        estado[ruta] = huella
+        resultados[figura] = {'ruta': ruta, 'estado': 'renderizada', 'segundos': duraciones[figura]}
+
+    if pendientes:
+        os.makedirs(os.path.dirname(ruta_estado), exist_ok=True)
+        with open(ruta_estado + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(estado, f, ensure_ascii=False, indent=2)
+        os.replace(ruta_estado + '.tmp', ruta_estado)
+    return {figura: resultados[figura] for figura in agregados_por_figura}
+
+
+def precisiones_guardadas(directorio_modelos):
+    """Precisión (%) de los modelos del paquete actual, o None si aún no hay paquete"""
+    try:
+        with open(os.path.join(ruta_paquete(directorio_modelos), ARCHIVO_MANIFIESTO), encoding='utf-8') as f:
+            metricas = json.load(f)['metricas']
+    except FileNotFoundError:
+        return None
+    nombres = {'random_forest': 'Random Forest', 'naive_bayes': 'Naive Bayes', 'gemini_simulado': 'Gemini Simulado'}
+    return {nombres[m]: metricas[m] * 100 for m in nombres if m in metricas}
+
+
+def calcular_agregados(figuras=None, ruta='dataset.csv', directorio_modelos=DIRECTORIO_MODELOS):
+    """Agregados de las figuras pedidas, leídos del cubo y de las métricas del paquete actual"""
+    from cubo_agregados import cargar_cubo
+    from DASHBOARD_FINAL_OSBRA import agregados_dashboard_final
+    from prototipo_soluciones_interactivo import agregados_dashboard_soluciones
+
+    figuras = figuras or list(FIGURAS)
+    cubo, _ = cargar_cubo(ruta)
+    agregados = {}
+    if 'dashboard_final' in figuras:
+        agregados['dashboard_final'] = agregados_dashboard_final(cubo)
+    if 'soluciones' in figuras:
+        agregados['soluciones'] = agregados_dashboard_soluciones()
+    if 'analisis' in figuras:
+        precisiones = precisiones_guardadas(directorio_modelos)
+        if precisiones:
+            agregados['analisis'] = agregados_analisis(cubo, precisiones)
+        else:
+            print("[AVISO] Sin modelos guardados: se omite la figura 'analisis'")
+    return agregados
+
+
+def agregar_argumentos(parser):
+    """Opciones de línea de comandos compartidas con el subcomando 'dashboard' de osbra.py"""
+    parser.add_argument('figuras', nargs='*', help=f"Figuras a generar: {', '.join(FIGURAS)} (por defecto todas)")
+    parser.add_argument('--previa', action='store_true', help=f'Vista previa rápida a {DPI_PREVIA} dpi')
+    parser.add_argument('--forzar', action='store_true', help='Dibujar aunque los agregados no hayan cambiado')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--modelos', default=DIRECTORIO_MODELOS, help='Paquete del que se leen las precisiones')
+
+
+def ejecutar(args, parser, ruta='dataset.csv'):
+    """Valida las figuras pedidas, renderiza e imprime el estado de cada una"""
+    figuras = args.figuras or list(FIGURAS)
+    desconocidas = set(figuras) - set(FIGURAS)
+    if desconocidas:
+        parser.error(f"Figuras desconocidas: {', '.join(sorted(desconocidas))}")
+
+    inicio = time.perf_counter()
+    agregados = calcular_agregados(figuras, ruta, args.modelos)
+    for figura, resultado in renderizar(agregados, previa=args.previa, forzar=args.forzar,
+                                        n_procesos=args.procesos).items():
+        print(f"  {figura:<16} {resultado['estado']:<12} {resultado['segundos']:6.2f} s  {resultado['ruta']}")
+    print(f"[OK] Dashboards listos en {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Regenera los dashboards de OSBRA desde agregados')
+    agregar_argumentos(parser)
+    ejecutar(parser.parse_args(), parser)
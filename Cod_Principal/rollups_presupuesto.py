@@ -0,0 +1,123 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingesta_streaming import TAMANO_BLOQUE, leer_bloques
+from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+
+# ============================================
+# CONSOLIDADOS DE PRESUPUESTO Y PERSONAL POR BLOQUES
+# ============================================
+
+DIMENSIONES = ['Ciudad', 'Categoría del problema', 'Año', 'Mes']
+COLUMNAS_LECTURA = ['Ciudad', 'Categoría del problema', 'Nivel de urgencia', 'Fecha del reporte']
+# Niveles que generar_reporte_completo cuenta como críticos
+NIVELES_CRITICOS = ['critica', 'alta']
+
+
+def tabla_costos(generador):
+    """Presupuesto y personal escalado por (categoría, nivel), tomados de la tabla de planes compartida"""
+    cargos = generador._cargos()
+    filas = []
+    for (categoria, nivel), entrada in generador.tabla_planes.items():
+        personal = entrada['recursos']['personal']
+        filas.append({'Categoría del problema': categoria, 'nivel': nivel,
+                      'presupuesto': entrada['soluciones']['presupuesto'],
+                      **{f'personal_{cargo}': personal.get(cargo, 0) for cargo in cargos}})
+    return pd.DataFrame(filas).set_index(['Categoría del problema', 'nivel'])
+
+
+class RollupPresupuesto:
+    """Presupuesto, críticos y personal por Ciudad x Categoría x mes, acumulados bloque a bloque
+
+    Cada bloque solo aporta conteos por (dimensiones, nivel de prioridad): el costo de un
+    reporte depende únicamente de su categoría y su nivel, así que los montos se obtienen al
+    final multiplicando esos conteos por la tabla de costos, sin filas ni dicts por reporte.
+    """
+
+    def __init__(self, generador=None):
+        self.generador = generador or OSBRASolutionsGenerator()
+        # Conteos parciales por bloque; se combinan cada pocos bloques para acotar la memoria
+        self._parciales = []
+        self.filas = 0
+
+    def actualizar(self, bloque):
+        """Incorpora un bloque con Ciudad, Categoría, Nivel de urgencia y Año/Mes (o Fecha del reporte)"""
+        if 'Año' not in bloque:
+            fechas = pd.to_datetime(bloque['Fecha del reporte'], format='%Y-%m-%d', errors='coerce')
+            bloque = bloque.assign(Año=fechas.dt.year, Mes=fechas.dt.month)
+        _, nivel = self.generador.niveles_lote(bloque)
+        claves = [bloque[d].astype(object) if isinstance(bloque[d].dtype, pd.CategoricalDtype) else bloque[d]
+                  for d in DIMENSIONES]
+        conteo = pd.Series(1, index=bloque.index).groupby(claves + [nivel], dropna=False).size()
+        conteo.index.names = DIMENSIONES + ['nivel']
+        self._parciales.append(conteo.rename('reportes').reset_index())
+        if len(self._parciales) >= 16:
+            self._parciales = [self._combinar()]
+        self.filas += len(bloque)
+
+    def _combinar(self):
+        if not self._parciales:
+            return pd.DataFrame(columns=DIMENSIONES + ['nivel', 'reportes'])
+        return (pd.concat(self._parciales, ignore_index=True)
+                .groupby(DIMENSIONES + ['nivel'], dropna=False, sort=False)['reportes'].sum().reset_index())
+
+    def resultado(self):
+        """Una fila por Ciudad x Categoría x mes: reportes, críticos, presupuesto y personal por cargo"""
+        costos = tabla_costos(self.generador)
+        conteos = self._combinar().join(costos, on=['Categoría del problema', 'nivel'])
+        medidas = list(costos.columns)
+        # Categorías sin plan no suman presupuesto ni personal (igual que analizar_lote)
+        montos = conteos[medidas].fillna(0).to_numpy(dtype=np.int64) * conteos['reportes'].to_numpy()[:, None]
+        tabla = pd.DataFrame(montos, columns=medidas)
+        tabla['reportes'] = conteos['reportes']
+        tabla['criticos'] = np.where(conteos['nivel'].isin(NIVELES_CRITICOS), conteos['reportes'], 0)
+        for dimension in DIMENSIONES:
+            tabla[dimension] = conteos[dimension]
+        personal = [m for m in medidas if m.startswith('personal_')]
+        tabla['personal_total'] = tabla[personal].sum(axis=1)
+        return (tabla.groupby(DIMENSIONES, dropna=False, sort=True)
+                [['reportes', 'criticos', 'presupuesto', 'personal_total'] + personal].sum().reset_index())
+
+
+def resumen_por_categoria(rollup):
+    """Mismo resumen que generar_reporte_completo: {categoría: {'total', 'criticos', 'presupuesto'}}"""
+    totales = rollup.groupby('Categoría del problema', sort=False)[['reportes', 'criticos', 'presupuesto']].sum()
+    return {categoria: {'total': int(fila['reportes']), 'criticos': int(fila['criticos']),
+                        'presupuesto': int(fila['presupuesto'])}
+            for categoria, fila in totales.iterrows()}
+
+
+def rollup_archivo(ruta='dataset.csv', tamano_bloque=TAMANO_BLOQUE, generador=None):
+    """Consolidado del archivo leyendo solo las cuatro columnas necesarias, bloque a bloque"""
+    acumulador = RollupPresupuesto(generador)
+    for bloque in leer_bloques(ruta, tamano_bloque, usecols=COLUMNAS_LECTURA):
+        acumulador.actualizar(bloque)
+    return acumulador
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Presupuesto y personal por ciudad, categoría y mes')
+    parser.add_argument('archivo', nargs='?', default='dataset.csv')
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE)
+    parser.add_argument('--salida', default=None, help='CSV con el consolidado')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    acumulador = rollup_archivo(args.archivo, args.tamano_bloque)
+    rollup = acumulador.resultado()
+    segundos = time.perf_counter() - inicio
+    print(f"[OK] {acumulador.filas:,} reportes consolidados en {len(rollup):,} celdas "
+          f"en {segundos:.2f} s ({acumulador.filas / segundos:,.0f} reportes/s)")
+
+    print("\nRESUMEN POR CATEGORÍA:")
+    for categoria, datos in resumen_por_categoria(rollup).items():
+        print(f"  {categoria}: {datos['total']:,} problemas ({datos['criticos']:,} críticos)")
+        print(f"    Presupuesto estimado: ${datos['presupuesto']:,} COP")
+    print(f"\nPRESUPUESTO TOTAL ESTIMADO: ${int(rollup['presupuesto'].sum()):,} COP")
+
+    if args.salida:
+        rollup.to_csv(args.salida, index=False, encoding='utf-8')
+        print(f"[OK] Consolidado guardado: {args.salida}")
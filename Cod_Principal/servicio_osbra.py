@@ -0,0 +1,351 @@
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+# Antes de Python 3.11 no es el TimeoutError integrado
+from concurrent.futures import TimeoutError as EsperaAgotada
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from artefactos_modelo import DIRECTORIO_MODELOS, cargar_artefactos
+from gemini_simulado import GeminiSimulation
+from prototipo_soluciones_interactivo import OSBRASolutionsGenerator
+
+# ============================================
+# SERVICIO HTTP DE INFERENCIA CON MICRO-LOTES
+# ============================================
+
+
+class ServidorOSBRA(ThreadingHTTPServer):
+    daemon_threads = True
+    # La cola de conexiones del socket debe admitir ráfagas concurrentes
+    request_queue_size = 512
+
+
+# Campos opcionales de POST /clasificar: texto o ausentes
+CAMPOS_TEXTO = ('categoria', 'urgencia', 'ciudad')
+
+
+class ColaLlena(Exception):
+    """La cola de solicitudes alcanzó su capacidad máxima"""
+
+
+class MetricasLatencia:
+    """Ventana deslizante de latencias y contadores del servicio"""
+
+    def __init__(self, ventana=10_000):
+        self._latencias = deque(maxlen=ventana)
+        self._lock = threading.Lock()
+        self.atendidas = 0
+        self.rechazadas = 0
+        self.vencidas = 0
+        self.fallidas = 0
+        self.lotes = 0
+        self.items_en_lotes = 0
+
+    def registrar(self, segundos):
+        with self._lock:
+            self._latencias.append(segundos)
+            self.atendidas += 1
+
+    def registrar_lote(self, tamano):
+        with self._lock:
+            self.lotes += 1
+            self.items_en_lotes += tamano
+
+    def registrar_rechazo(self):
+        with self._lock:
+            self.rechazadas += 1
+
+    def registrar_vencida(self):
+        with self._lock:
+            self.vencidas += 1
+
+    def registrar_fallo(self):
+        with self._lock:
+            self.fallidas += 1
+
+    def resumen(self):
+        """Percentiles de latencia (ms) y contadores acumulados"""
+        with self._lock:
+            latencias = sorted(self._latencias)
+            resumen = {
+                'atendidas': self.atendidas,
+                'rechazadas': self.rechazadas,
+                'vencidas': self.vencidas,
+                'fallidas': self.fallidas,
+                'lotes': self.lotes,
+                'tamano_lote_promedio': self.items_en_lotes / self.lotes if self.lotes else 0.0
+            }
+        for p in (50, 90, 95, 99):
+            if latencias:
+                indice = min(len(latencias) - 1, int(round(p / 100 * (len(latencias) - 1))))
+                resumen[f'p{p}_ms'] = latencias[indice] * 1000
+            else:
+                resumen[f'p{p}_ms'] = None
+        return resumen
+
+
+class MicroLoteador:
+    """Agrupa solicitudes concurrentes para procesarlas en una sola llamada
+
+    procesar_lote retorna un resultado por item; un item puede ser una excepción, que se
+    entrega solo a la solicitud correspondiente.
+    """
+
+    def __init__(self, procesar_lote, tamano_max=64, espera_max=0.005, capacidad=1024, metricas=None):
+        self.procesar_lote = procesar_lote
+        self.tamano_max = tamano_max
+        self.espera_max = espera_max
+        self.metricas = metricas or MetricasLatencia()
+        # Cola acotada: cuando se llena, las solicitudes se rechazan de inmediato
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._hilo = threading.Thread(target=self._bucle, name='micro-loteador', daemon=True)
+        self._hilo.start()
+
+    def enviar(self, item, timeout=30.0):
+        """Encola un item y espera su resultado
+
+        Lanza ColaLlena si no hay cupo, EsperaAgotada si el resultado no llega a tiempo y la
+        excepción de procesar_lote si el lote o este item fallan.
+        """
+        futuro = Future()
+        try:
+            self._cola.put_nowait((item, futuro))
+        except queue.Full:
+            self.metricas.registrar_rechazo()
+            raise ColaLlena(f"Cola llena ({self._cola.maxsize} solicitudes pendientes)")
+        try:
+            return futuro.result(timeout=timeout)
+        except EsperaAgotada:
+            # Si aún no entró en un lote, se cancela para no procesarla en vano
+            futuro.cancel()
+            self.metricas.registrar_vencida()
+            raise
+        except Exception:
+            self.metricas.registrar_fallo()
+            raise
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def _bucle(self):
+        while True:
+            lote = [self._cola.get()]
+            limite = time.perf_counter() + self.espera_max
+            # Reunir más solicitudes hasta llenar el lote o agotar la espera
+            while len(lote) < self.tamano_max:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+
+            # Las solicitudes que vencieron mientras esperaban en la cola ya no se procesan
+            lote = [(item, futuro) for item, futuro in lote if futuro.set_running_or_notify_cancel()]
+            if not lote:
+                continue
+            items = [item for item, _ in lote]
+            try:
+                resultados = self.procesar_lote(items)
+            except Exception as error:
+                for _, futuro in lote:
+                    futuro.set_exception(error)
+                continue
+            self.metricas.registrar_lote(len(lote))
+            for (_, futuro), resultado in zip(lote, resultados):
+                if isinstance(resultado, Exception):
+                    futuro.set_exception(resultado)
+                else:
+                    futuro.set_result(resultado)
+
+
+class MotorInferencia:
+    """Clasifica lotes de comentarios y genera el plan de cada problema"""
+
+    def __init__(self, directorio_modelos=DIRECTORIO_MODELOS, usar_gemini=False):
+        self.generador = OSBRASolutionsGenerator()
+        self.paquete = None
+        if not usar_gemini:
+            try:
+                self.paquete = cargar_artefactos(directorio_modelos, modelos='principal')
+            except FileNotFoundError as error:
+                print(f"[AVISO] {error}; se usará Gemini simulado")
+        if self.paquete is not None:
+            manifiesto = self.paquete['manifiesto']
+            self.nombre_modelo = manifiesto['modelo_principal']
+            self._modelo = self.paquete['modelos'][self.nombre_modelo]
+            print(f"[OK] Modelo {self.nombre_modelo} cargado (paquete {manifiesto['version']})")
+        else:
+            self.nombre_modelo = 'gemini_simulado'
+            self._gemini = GeminiSimulation()
+
+    def clasificar(self, comentarios):
+        """Una sola llamada a transform/predict para todo el lote"""
+        if self.paquete is not None:
+            X = self.paquete['vectorizer'].transform(comentarios)
+            return [str(c) for c in self._modelo.predict(X)]
+        return [self._gemini.classify_with_gemini(c) for c in comentarios]
+
+    def procesar_lote(self, solicitudes):
+        categorias = self.clasificar([s['comentario'] for s in solicitudes])
+        resultados = []
+        for solicitud, categoria in zip(solicitudes, categorias):
+            categoria = solicitud.get('categoria') or categoria
+            # Un error en una solicitud se entrega solo a ella, no al resto del lote
+            try:
+                analisis = self.generador.analizar_problema(
+                    solicitud['comentario'], categoria, solicitud['urgencia'], solicitud['ciudad'], mostrar=False
+                )
+            except Exception as error:
+                resultados.append(error)
+                continue
+            resultados.append({'categoria': categoria, 'modelo': self.nombre_modelo, **analisis})
+        return resultados
+
+
+def crear_servidor(motor, host='127.0.0.1', puerto=8080, tamano_lote=64, espera_ms=5.0, capacidad=1024,
+                   timeout_s=30.0):
+    """Crea el servidor HTTP con su micro-loteador
+
+    Cada solicitud espera su lote hasta timeout_s: si no llega responde 504, si el lote falla 500.
+    """
+    loteador = MicroLoteador(motor.procesar_lote, tamano_lote, espera_ms / 1000, capacidad)
+
+    class ManejadorOSBRA(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _responder(self, estado, cuerpo, encabezados=None):
+            # Los planes compartidos son MappingProxyType: se serializan como dict
+            datos = json.dumps(cuerpo, ensure_ascii=False, default=dict).encode('utf-8')
+            self.send_response(estado)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(datos)))
+            for nombre, valor in (encabezados or {}).items():
+                self.send_header(nombre, valor)
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            if self.path == '/salud':
+                self._responder(200, {'estado': 'ok', 'modelo': motor.nombre_modelo})
+            elif self.path == '/metricas':
+                self._responder(200, {**loteador.metricas.resumen(), 'pendientes': loteador.pendientes()})
+            else:
+                self._responder(404, {'error': 'Ruta no encontrada'})
+
+        def do_POST(self):
+            if self.path != '/clasificar':
+                self._responder(404, {'error': 'Ruta no encontrada'})
+                return
+            inicio = time.perf_counter()
+            try:
+                longitud = int(self.headers.get('Content-Length', 0))
+                cuerpo = json.loads(self.rfile.read(longitud) or b'{}')
+                solicitud = {
+                    'comentario': str(cuerpo['comentario']),
+                    'urgencia': cuerpo.get('urgencia') or 'No urgente',
+                    'ciudad': cuerpo.get('ciudad') or '',
+                    'categoria': cuerpo.get('categoria')
+                }
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._responder(400, {'error': "Se esperaba JSON con el campo 'comentario'"})
+                return
+            invalidos = [campo for campo in CAMPOS_TEXTO if not isinstance(cuerpo.get(campo), (str, type(None)))]
+            if invalidos:
+                self._responder(400, {'error': f"Los campos {', '.join(invalidos)} deben ser texto"})
+                return
+            try:
+                resultado = loteador.enviar(solicitud, timeout_s)
+            except ColaLlena as error:
+                self._responder(503, {'error': str(error)}, {'Retry-After': '1'})
+                return
+            except EsperaAgotada:
+                self._responder(504, {'error': f"Sin resultado después de {timeout_s:g} s"})
+                return
+            except Exception as error:
+                self._responder(500, {'error': f"Error al procesar el lote: {type(error).__name__}: {error}"})
+                return
+            latencia = time.perf_counter() - inicio
+            loteador.metricas.registrar(latencia)
+            self._responder(200, {**resultado, 'latencia_ms': latencia * 1000})
+
+        def log_message(self, formato, *args):
+            pass
+
+    servidor = ServidorOSBRA((host, puerto), ManejadorOSBRA)
+    servidor.loteador = loteador
+    return servidor
+
+
+def prueba_carga(url, solicitudes=2000, concurrencia=32):
+    """Genera carga concurrente contra el servicio y retorna su resumen de métricas"""
+    ejemplos = [
+        {'comentario': 'necesitamos más médicos en el hospital', 'urgencia': 'Urgente', 'ciudad': 'Bogotá'},
+        {'comentario': 'las calles están muy sucias y llenas de basura', 'urgencia': 'No urgente', 'ciudad': 'Cali'},
+        {'comentario': 'no hay suficientes profesores en la escuela', 'urgencia': 'No urgente', 'ciudad': 'Medellín'},
+        {'comentario': 'hay mucha delincuencia en el barrio', 'urgencia': 'Urgente', 'ciudad': 'Manizales'}
+    ]
+
+    def enviar(i):
+        datos = json.dumps(ejemplos[i % len(ejemplos)]).encode('utf-8')
+        peticion = urllib.request.Request(url + '/clasificar', data=datos,
+                                          headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(peticion, timeout=30) as respuesta:
+                respuesta.read()
+            return True
+        except (urllib.error.URLError, ConnectionError):
+            return False
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        exitosas = sum(ejecutor.map(enviar, range(solicitudes)))
+    duracion = time.perf_counter() - inicio
+
+    with urllib.request.urlopen(url + '/metricas') as respuesta:
+        metricas = json.loads(respuesta.read())
+    metricas.update({'exitosas': exitosas, 'duracion_s': duracion,
+                     'solicitudes_por_segundo': solicitudes / duracion})
+    return metricas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Servicio HTTP local de clasificación y planes OSBRA')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    parser.add_argument('--modelos', default=DIRECTORIO_MODELOS, help='Directorio de paquetes de modelos')
+    parser.add_argument('--gemini', action='store_true', help='Clasificar con Gemini simulado')
+    parser.add_argument('--tamano-lote', type=int, default=64)
+    parser.add_argument('--espera-ms', type=float, default=5.0, help='Espera máxima para completar un lote')
+    parser.add_argument('--capacidad', type=int, default=1024, help='Solicitudes pendientes máximas')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Espera máxima por solicitud (s) antes de 504')
+    parser.add_argument('--prueba-carga', type=int, default=0, metavar='N',
+                        help='Enviar N solicitudes concurrentes, mostrar métricas y salir')
+    parser.add_argument('--concurrencia', type=int, default=32)
+    args = parser.parse_args()
+
+    motor = MotorInferencia(args.modelos, usar_gemini=args.gemini)
+    servidor = crear_servidor(motor, args.host, args.puerto, args.tamano_lote, args.espera_ms, args.capacidad,
+                              args.timeout)
+    url = f"http://{args.host}:{servidor.server_address[1]}"
+
+    if args.prueba_carga:
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        metricas = prueba_carga(url, args.prueba_carga, args.concurrencia)
+        servidor.shutdown()
+        print("\nRESULTADOS DE LA PRUEBA DE CARGA:")
+        for clave, valor in metricas.items():
+            print(f"  {clave}: {valor:.2f}" if isinstance(valor, float) else f"  {clave}: {valor}")
+    else:
+        print(f"[OK] Servicio OSBRA escuchando en {url} (POST /clasificar, GET /metricas)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            servidor.shutdown()
@@ -0,0 +1,11 @@
+from artefactos_modelo import ARCHIVO_MANIFIESTO, listar_versiones
+
+
+def test_versiones_con_sufijo_en_orden_numerico(tmp_path):
+    versiones = ['20261018-120000', '20261018-120000-2', '20261018-120000-10', '20261018-120001',
+                 '20261017-235959-3']
+    for version in versiones:
+        (tmp_path / version).mkdir()
+        (tmp_path / version / ARCHIVO_MANIFIESTO).write_text('{}', encoding='utf-8')
+    assert listar_versiones(str(tmp_path)) == ['20261017-235959-3', '20261018-120000', '20261018-120000-2',
+                                               '20261018-120000-10', '20261018-120001']
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from benchmark_osbra import generar_dataset_sintetico
+from cubo_agregados import cargar_cubo
+from limpieza import limpiar_datos
+
+
+def _escribir(df, ruta):
+    df.to_csv(ruta, index=False, encoding='utf-8')
+    return ruta
+
+
+def test_agregar_filas_con_otra_mediana_igual_a_reconstruir(tmp_path):
+    """Las filas nuevas mueven la mediana de edad: el cubo incremental rellena como limpieza"""
+    df = generar_dataset_sintetico(3_000, semilla=1)
+    # Los reportes nuevos son de personas mayores: la mediana del archivo sube
+    nuevos = generar_dataset_sintetico(2_000, semilla=2)
+    nuevos['Edad'] = np.where(nuevos['Edad'].isna(), np.nan, nuevos['Edad'] + 30)
+    ruta = _escribir(df, tmp_path / 'reportes.csv')
+    cargar_cubo(str(ruta))
+    with open(ruta, 'a', encoding='utf-8', newline='') as f:
+        nuevos.to_csv(f, index=False, header=False)
+
+    cubo, info = cargar_cubo(str(ruta))
+    completo, _ = limpiar_datos(pd.read_csv(ruta, sep=',', encoding='utf-8'))
+    assert info['origen'] == 'incremental'
+    assert info['edad_mediana'] != info['mediana_anterior']
+    assert info['edad_mediana'] == completo['Edad'].median()
+    esperado = completo.groupby('Categoría del problema')['Edad'].mean()
+    pd.testing.assert_series_equal(cubo.edad_promedio('Categoría del problema'), esperado,
+                                   check_names=False, rtol=1e-12)
+    assert cubo.total == len(completo)
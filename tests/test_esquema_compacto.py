@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from benchmark_osbra import generar_dataset_sintetico
+from esquema_compacto import compactar, concatenar_compactos, etiquetas_si_no
+from limpieza import limpiar_datos
+
+
+def _limpio(**columnas):
+    df = generar_dataset_sintetico(len(next(iter(columnas.values()))), semilla=5)
+    for columna, valores in columnas.items():
+        df[columna] = valores
+    return limpiar_datos(df)[0]
+
+
+def test_fecha_invalida_queda_faltante():
+    """limpiar_datos deja NaT en las fechas que no entiende: Año y Mes quedan faltantes"""
+    compacto = compactar(_limpio(**{'Fecha del reporte': ['no-fecha', '2024-03-15']}))
+    assert compacto['Año'].isna().tolist() == [True, False]
+    assert compacto.loc[1, 'Año'] == 2024 and compacto.loc[1, 'Mes'] == 3
+
+
+def test_edades_fuera_de_rango_quedan_faltantes():
+    compacto = compactar(_limpio(Edad=[300.0, -3.0, 255.4, 0.0, 40.0]))
+    assert compacto['Edad'].isna().tolist() == [True, True, False, False, False]
+    assert compacto['Edad'].iloc[2:].tolist() == [255, 0, 40]
+
+
+def test_indicador_invalido_no_es_verdadero():
+    limpio = _limpio(**{'Acceso a internet': [1, 'x', 0]})
+    vista = etiquetas_si_no(compactar(limpio))
+    assert vista['Tiene_Internet'].tolist()[0] == 'Si' and pd.isna(vista['Tiene_Internet'].iloc[1])
+
+
+def test_concatenar_conserva_tipos_nulables():
+    bloque = compactar(_limpio(**{'Fecha del reporte': ['no-fecha', '2024-03-15']}))
+    unido = concatenar_compactos([bloque, bloque])
+    assert unido['Año'].dtype == 'Int16' and unido['Edad'].dtype == 'UInt8'
+    assert unido['Año'].isna().sum() == 2 and np.array_equal(unido.index, np.arange(4))
@@ -0,0 +1,77 @@
+import itertools
+import random
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from deduplicacion import factorizar, normalizar_comentarios
+from incidentes import BANDAS, UMBRAL_SIMILITUD, _hashes_bandas, agrupar_incidentes, firmas_minhash
+
+FRASES = [
+    'Hay un hueco enorme en la vía principal frente al colegio del barrio',
+    'No hay agua potable en el sector desde hace varios días',
+    'Los semáforos de la avenida central no funcionan y hay accidentes'
+]
+
+
+def _variantes(n, semilla=7):
+    """Reportes que difieren de una de las frases en a lo sumo 3 caracteres"""
+    aleatorio = random.Random(semilla)
+    textos = []
+    for _ in range(n):
+        texto = list(aleatorio.choice(FRASES))
+        for _ in range(aleatorio.randint(0, 3)):
+            texto[aleatorio.randrange(len(texto))] = aleatorio.choice('abcdefghijklmnopqrstuvwxyz ')
+        textos.append(''.join(texto))
+    return textos
+
+
+def _particion(etiquetas):
+    return sorted(sorted(g) for g in pd.Series(range(len(etiquetas))).groupby(np.asarray(etiquetas)).apply(list))
+
+
+def _fuerza_bruta(df):
+    """Componentes conexas verificando todos los pares de textos que comparten ciudad, ventana y banda"""
+    textos = normalizar_comentarios(df['Comentario']).tolist()
+    firmas = firmas_minhash(textos)
+    hashes = _hashes_bandas(firmas, BANDAS)
+    ventana = pd.to_datetime(df['Fecha del reporte']).to_numpy().astype('datetime64[D]').astype(np.int64) // 7
+    ciudad = df['Ciudad'].to_numpy()
+    origen, destino = [], []
+    for i, j in itertools.combinations(range(len(textos)), 2):
+        if ciudad[i] != ciudad[j] or ventana[i] != ventana[j]:
+            continue
+        if textos[i] == textos[j] or ((hashes[i] == hashes[j]).any()
+                                      and (firmas[i] == firmas[j]).mean() >= UMBRAL_SIMILITUD):
+            origen.append(i)
+            destino.append(j)
+    grafo = coo_matrix((np.ones(len(origen)), (origen, destino)), shape=(len(textos), len(textos)))
+    return connected_components(grafo, directed=False)[1]
+
+
+def test_incidentes_igual_a_fuerza_bruta():
+    rng = np.random.default_rng(3)
+    n = 400
+    df = pd.DataFrame({
+        'Comentario': _variantes(n),
+        'Ciudad': rng.choice(['Bogotá', 'Cali'], n),
+        'Fecha del reporte': pd.Timestamp('2024-03-04') + pd.to_timedelta(rng.integers(0, 14, n), unit='D')
+    })
+    incidentes = agrupar_incidentes(df)
+    assert _particion(incidentes) == _particion(_fuerza_bruta(df))
+
+
+def test_cubetas_grandes_igual_a_fuerza_bruta():
+    """3000 variantes de tres frases en una sola ciudad y ventana: cubetas de más de TOPE_CUBETA textos"""
+    df = pd.DataFrame({'Comentario': _variantes(3000), 'Ciudad': 'Bogotá', 'Fecha del reporte': '2024-03-05'})
+    codigos, unicos = factorizar(df['Comentario'])
+    firmas = firmas_minhash(unicos)
+    hashes = _hashes_bandas(firmas, BANDAS)
+    candidatos = (hashes[:, None, :] == hashes[None, :, :]).any(axis=2)
+    similares = (firmas[:, None, :] == firmas[None, :, :]).mean(axis=2) >= UMBRAL_SIMILITUD
+    origen, destino = np.nonzero(np.triu(candidatos & similares, 1))
+    grafo = coo_matrix((np.ones(len(origen)), (origen, destino)), shape=(len(unicos), len(unicos)))
+    componente = connected_components(grafo, directed=False)[1]
+    assert _particion(agrupar_incidentes(df)) == _particion(componente[codigos])
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from indice_similitud import IndiceSimilitud, reportes_sinteticos
+
+
+@pytest.fixture(scope='module')
+def reportes():
+    df = reportes_sinteticos(4000, semilla=3)
+    # Textos sin relación entre sí: cotas flojas y listas largas para la poda
+    rng = np.random.default_rng(5)
+    palabras = np.array(['de', 'la', 'el', 'agua', 'vía', 'luz', 'basura', 'hueco', 'parque', 'ruido', 'no', 'hay'])
+    df.loc[df.index[::3], 'Comentario'] = [' '.join(rng.choice(palabras, rng.integers(2, 8)))
+                                           for _ in range(len(df.index[::3]))]
+    # Reportes sin fecha: ningún filtro de fechas los admite
+    df.loc[df.index[::11], 'Fecha del reporte'] = None
+    return df
+
+
+@pytest.fixture(scope='module')
+def vectorizer(reportes):
+    return TfidfVectorizer(max_features=1000, ngram_range=(1, 2)).fit(reportes['Comentario'])
+
+
+def _fuerza_bruta(df, vectorizer, comentario, k, ciudad=None, desde=None, hasta=None):
+    similitud = (vectorizer.transform(df['Comentario']) @ vectorizer.transform([comentario]).T).toarray().ravel()
+    mascara = similitud > 0
+    if ciudad is not None:
+        mascara &= (df['Ciudad'] == ciudad).to_numpy()
+    if desde is not None:
+        mascara &= (pd.to_datetime(df['Fecha del reporte']) >= desde).to_numpy()
+    if hasta is not None:
+        mascara &= (pd.to_datetime(df['Fecha del reporte']) <= hasta).to_numpy()
+    return np.sort(similitud[mascara])[::-1][:k]
+
+
+def test_top_k_igual_a_fuerza_bruta(reportes, vectorizer):
+    indice = IndiceSimilitud.construir(reportes, vectorizer)
+    consultas = reportes['Comentario'].sample(60, random_state=1).tolist() + ['agua de la vía', 'ruido']
+    for i, consulta in enumerate(consultas):
+        filtros = [{}, {'ciudad': 'Cali', 'desde': '2024-01-01'}, {'hasta': '2023-06-30'}][i % 3]
+        esperado = _fuerza_bruta(reportes, vectorizer, consulta, 7, filtros.get('ciudad'), filtros.get('desde'),
+                                 filtros.get('hasta'))
+        exacto = indice.top_k(consulta, 7, filtros, exacto=True)
+        np.testing.assert_allclose(exacto['similitud'], esperado, atol=1e-6)
+        rapido = indice.top_k(consulta, 7, filtros)
+        if rapido.attrs['exacto']:
+            np.testing.assert_allclose(rapido['similitud'], esperado, atol=1e-6)
+
+
+def test_reporte_sin_fecha_fuera_de_hasta(vectorizer):
+    reportes = pd.DataFrame({'ID': [1, 2, 3], 'Comentario': ['falta agua potable'] * 3,
+                             'Ciudad': ['Cali'] * 3, 'Categoría del problema': ['Salud'] * 3,
+                             'Fecha del reporte': [None, '2023-05-01', '2024-06-01']})
+    indice = IndiceSimilitud.construir(reportes, vectorizer)
+    for exacto in (True, False):
+        assert indice.top_k('falta agua potable', 5, {'hasta': '2024-01-01'}, exacto=exacto)['ID'].tolist() == [2]
+
+
+def test_guardar_reemplaza_sin_tocar_el_indice_abierto(reportes, vectorizer, tmp_path):
+    directorio = str(tmp_path / 'indice')
+    IndiceSimilitud.construir(reportes.iloc[:2000], vectorizer).guardar(directorio)
+    anterior = IndiceSimilitud.cargar(directorio)
+    esperado = anterior.top_k('falta agua potable', 5)
+
+    IndiceSimilitud.construir(reportes, vectorizer).guardar(directorio)
+    # El índice abierto con mmap sigue leyendo sus arreglos; el nuevo ve todos los reportes
+    pd.testing.assert_frame_equal(anterior.top_k('falta agua potable', 5), esperado)
+    assert IndiceSimilitud.cargar(directorio).metadatos['filas'] == len(reportes)
+    assert len([n for n in os.listdir(directorio) if n.startswith('datos-')]) == 1
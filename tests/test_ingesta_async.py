@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from benchmark_osbra import generar_dataset_sintetico
+from ingesta_async import ProcesadorReportes, ingerir_jsonl
+
+
+def _escribir_jsonl(ruta, df):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for registro in df.to_dict(orient='records'):
+            f.write(json.dumps({k: (None if v != v else v) for k, v in registro.items()}, ensure_ascii=False) + '\n')
+
+
+def _ingerir(fuente, salida):
+    return asyncio.run(ingerir_jsonl(str(fuente), str(salida), tamano_lote=50, espera_max=0.01,
+                                     edad_mediana=40.0, una_pasada=True))
+
+
+def test_corte_entre_salida_y_estado_no_duplica(tmp_path, monkeypatch):
+    """Un corte después de escribir un lote y antes de guardar su estado no deja filas repetidas"""
+    fuente = tmp_path / 'reportes.jsonl'
+    _escribir_jsonl(fuente, generar_dataset_sintetico(300, semilla=3))
+    _ingerir(fuente, tmp_path / 'esperado.csv')
+
+    guardar_estado = ProcesadorReportes._guardar_estado
+    llamadas = []
+
+    def cortar_en_el_tercero(self, estado):
+        llamadas.append(estado)
+        if len(llamadas) == 3:
+            raise KeyboardInterrupt('corte simulado')
+        guardar_estado(self, estado)
+
+    monkeypatch.setattr(ProcesadorReportes, '_guardar_estado', cortar_en_el_tercero)
+    with pytest.raises(KeyboardInterrupt):
+        _ingerir(fuente, tmp_path / 'salida.csv')
+    monkeypatch.undo()
+    _ingerir(fuente, tmp_path / 'salida.csv')
+
+    esperado = pd.read_csv(tmp_path / 'esperado.csv')
+    obtenido = pd.read_csv(tmp_path / 'salida.csv')
+    assert obtenido['ID'].is_unique
+    pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def test_tipos_impuestos(tmp_path):
+    """Los valores que no corresponden al tipo de la columna no llegan a la salida"""
+    fuente = tmp_path / 'reportes.jsonl'
+    df = generar_dataset_sintetico(3, semilla=4)
+    df['Edad'] = df['Edad'].astype(object)
+    df.loc[0, 'Edad'] = 'abc'
+    df.loc[1, 'Comentario'] = 123
+    _escribir_jsonl(fuente, df)
+    _ingerir(fuente, tmp_path / 'salida.csv')
+    salida = pd.read_csv(tmp_path / 'salida.csv')
+    assert pd.api.types.is_float_dtype(salida['Edad'])
+    assert salida.loc[0, 'Edad'] == 40.0
+    assert salida.loc[1, 'Comentario'] == '123'
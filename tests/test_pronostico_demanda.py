@@ -0,0 +1,29 @@
+import numpy as np
+
+from pronostico_demanda import PronosticadorDemanda, huellas_periodos, series_sinteticas
+
+
+def test_actualizar_con_periodo_parcial_igual_a_reajustar():
+    completa = series_sinteticas(300, periodos=60, frecuencia='M')
+    # El último periodo del primer ajuste llega con solo parte de sus reportes
+    parcial = completa.iloc[:, :40].copy()
+    parcial.iloc[:, -1] = np.floor(parcial.iloc[:, -1] / 2)
+    # Series que aparecen después: sin reportes en la parte ya ajustada
+    parcial.iloc[:20] = 0
+    completa.iloc[:20, :40] = 0
+    incremental = PronosticadorDemanda.ajustar(parcial.iloc[20:], 'M')
+    incremental.actualizar(completa.iloc[:, :50]).actualizar(completa).actualizar(completa)
+
+    referencia = PronosticadorDemanda.ajustar(completa, 'M').pronosticar(6)
+    pronostico = incremental.pronosticar(6).reindex(referencia.index)
+    np.testing.assert_allclose(pronostico.to_numpy(), referencia.to_numpy())
+
+
+def test_huellas_detectan_cambios_en_la_historia():
+    matriz = series_sinteticas(50, periodos=24, frecuencia='M')
+    huellas = huellas_periodos(matriz)
+    assert huellas == huellas_periodos(matriz.sample(frac=1, random_state=0))
+    modificada = matriz.copy()
+    modificada.iloc[3, 5] += 1
+    cambios = [p for p, h in huellas_periodos(modificada).items() if h != huellas[p]]
+    assert cambios == [str(matriz.columns[5])]
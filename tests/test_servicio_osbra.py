@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from servicio_osbra import crear_servidor
+
+
+class MotorPrueba:
+    """Motor sin modelos: 'lento' tarda más que el timeout y 'falla' rompe el lote"""
+    nombre_modelo = 'prueba'
+
+    def procesar_lote(self, solicitudes):
+        comentarios = [s['comentario'] for s in solicitudes]
+        if 'falla' in comentarios:
+            raise RuntimeError('modelo no disponible')
+        if 'lento' in comentarios:
+            time.sleep(0.5)
+        return [{'categoria': 'Salud'} for _ in solicitudes]
+
+
+@pytest.fixture
+def url():
+    servidor = crear_servidor(MotorPrueba(), puerto=0, espera_ms=1, timeout_s=0.2)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+
+
+def _post(url, comentario):
+    peticion = urllib.request.Request(url + '/clasificar', data=json.dumps({'comentario': comentario}).encode(),
+                                      headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(peticion, timeout=5) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_codigos_de_error(url):
+    assert _post(url, 'faltan médicos')[0] == 200
+    estado, cuerpo = _post(url, 'falla')
+    assert estado == 500 and 'modelo no disponible' in cuerpo['error']
+    assert _post(url, 'lento')[0] == 504
+    # El servicio sigue atendiendo después de los errores
+    time.sleep(0.5)
+    assert _post(url, 'faltan médicos')[0] == 200
+    with urllib.request.urlopen(url + '/metricas') as respuesta:
+        metricas = json.loads(respuesta.read())
+    assert (metricas['atendidas'], metricas['fallidas'], metricas['vencidas']) == (2, 1, 1)
+
+
+def test_solicitud_invalida_no_afecta_su_lote():
+    """Una solicitud inválida en el mismo micro-lote solo falla ella"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from servicio_osbra import MicroLoteador, MotorInferencia
+
+    motor = MotorInferencia(usar_gemini=True)
+    buena = {'comentario': 'faltan médicos en el hospital', 'urgencia': 'Urgente', 'ciudad': 'Cali',
+             'categoria': None}
+    # Llega a procesar_lote (sin pasar por la validación HTTP) y rompe la priorización
+    mala = {**buena, 'categoria': ['a']}
+    loteador = MicroLoteador(motor.procesar_lote, tamano_max=8, espera_max=0.2)
+    with ThreadPoolExecutor(max_workers=4) as ejecutor:
+        futuros = [ejecutor.submit(loteador.enviar, solicitud, 10) for solicitud in (buena, mala, buena, buena)]
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except TypeError:
+                resultados.append(None)
+    assert loteador.metricas.lotes == 1
+    assert resultados[1] is None
+    assert all(r is not None and r['categoria'] == 'Salud' for i, r in enumerate(resultados) if i != 1)
+
+
+def test_campos_que_no_son_texto_responden_400(url):
+    peticion = urllib.request.Request(url + '/clasificar',
+                                      data=json.dumps({'comentario': 'x', 'categoria': ['a']}).encode(),
+                                      headers={'Content-Type': 'application/json'})
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(peticion, timeout=5)
+    assert error.value.code == 400
+    assert _post(url, 'faltan médicos')[0] == 200
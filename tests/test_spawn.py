@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+CODIGO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Cod_Principal')
+
+# Script de entrada como los del proyecto: los pools solo se crean dentro del guard de __main__
+SCRIPT = textwrap.dedent("""
+    import multiprocessing
+
+    import numpy as np
+    import pandas as pd
+
+    from instrumentacion import traza
+
+
+    def main():
+        from sklearn.naive_bayes import MultinomialNB
+
+        from clasificacion_paralela import procesar_corpus
+        from comparacion_modelos import comparar_modelos
+
+        with traza.seccion('clasificacion'):
+            comentarios = pd.Series([f'falta agua potable en la casa {i}' for i in range(60)])
+            etiquetas, _, estadisticas = procesar_corpus(comentarios, n_procesos=2, tamano_bloque=20)
+        assert estadisticas['procesos'] == 2 and len(etiquetas) == 60
+        X = np.random.default_rng(0).integers(0, 3, (40, 5))
+        y = np.arange(40) % 2
+        resultados = comparar_modelos({'nb': MultinomialNB(), 'nb2': MultinomialNB()}, X, y, X, y, max_procesos=2)
+        assert list(resultados) == ['nb', 'nb2']
+        print('[OK] spawn')
+
+
+    if __name__ == "__main__":
+        multiprocessing.set_start_method('spawn')
+        main()
+""")
+
+
+def test_pools_con_spawn(tmp_path):
+    """Los pools funcionan con spawn (Windows, macOS) y solo el proceso principal exporta la traza"""
+    script = tmp_path / 'principal.py'
+    script.write_text(SCRIPT, encoding='utf-8')
+    ruta_traza = tmp_path / 'traza.json'
+    entorno = {**os.environ, 'PYTHONPATH': CODIGO, 'OSBRA_TRAZA': str(ruta_traza)}
+    salida = subprocess.run([sys.executable, str(script)], cwd=tmp_path, env=entorno,
+                            capture_output=True, text=True, timeout=300)
+    assert salida.returncode == 0, salida.stderr
+    assert '[OK] spawn' in salida.stdout
+    assert salida.stdout.count('Traza exportada') == 1
+    eventos = json.loads(ruta_traza.read_text(encoding='utf-8'))['traceEvents']
+    assert any(e.get('name') == 'clasificacion' for e in eventos)